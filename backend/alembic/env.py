@@ -20,6 +20,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from app.db.base import Base
+from app.db.online_migrations import DryRunRecorder, is_dry_run
 from app import models
 
 # 读取 alembic.ini 中的配置
@@ -59,6 +60,20 @@ def do_run_migrations(connection: Connection) -> None:
         compare_type=True,
     )
 
+    if is_dry_run():
+        # dry-run：拦截所有写语句，只输出锁影响报告
+        recorder = DryRunRecorder(connection)
+        recorder.install()
+        try:
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            # 迁移中途出错时事务已中止，先回滚才能查询表大小，原始异常照常抛出
+            connection.rollback()
+            recorder.report()
+            connection.rollback()
+        return
+
     with context.begin_transaction():
         context.run_migrations()
 
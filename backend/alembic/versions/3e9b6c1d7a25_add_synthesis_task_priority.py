@@ -0,0 +1,46 @@
+"""add synthesis task priority and dispatch marker
+
+Revision ID: 3e9b6c1d7a25
+Revises: 8d27f4b0c6e1
+Create Date: 2026-10-19 16:40:12.208815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.online_migrations import create_partitioned_index_concurrently, set_lock_timeout
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9b6c1d7a25'
+down_revision: Union[str, None] = '8d27f4b0c6e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_PRIORITY = postgresql.ENUM('INTERACTIVE', 'BULK', name='synthesis_task_priority')
+
+
+def upgrade() -> None:
+    _PRIORITY.create(op.get_bind(), checkfirst=True)
+    set_lock_timeout()
+    # 常量默认值只写入目录，不重写表
+    op.add_column('synthesis_tasks', sa.Column('priority', postgresql.ENUM(name='synthesis_task_priority', create_type=False), server_default='BULK', nullable=False, comment='调度优先级：交互式单条重生成 / 批量'))
+    op.add_column('synthesis_tasks', sa.Column('dispatched_at', sa.DateTime(timezone=True), nullable=True, comment='投递到队列的时间，为空表示仍在等待调度'))
+    create_partitioned_index_concurrently(
+        'ix_synthesis_tasks_pending',
+        'synthesis_tasks',
+        ['priority', 'created_at'],
+        where="status = 'QUEUED'",
+    )
+
+
+def downgrade() -> None:
+    set_lock_timeout()
+    # 分区父表上的索引不支持 CONCURRENTLY 删除，删除父表索引会一并删除各分区的索引
+    op.drop_index('ix_synthesis_tasks_pending', table_name='synthesis_tasks')
+    op.drop_column('synthesis_tasks', 'dispatched_at')
+    op.drop_column('synthesis_tasks', 'priority')
+    _PRIORITY.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,47 @@
+"""add jsonb metadata indexes
+
+Revision ID: 5c1e9a7d3b42
+Revises: 20ab50782f05
+Create Date: 2026-10-19 10:12:03.517204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.online_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e9a7d3b42'
+down_revision: Union[str, None] = '20ab50782f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_GIN_INDEXES = (
+    ('ix_shots_metadata', 'shots'),
+    ('ix_assets_metadata', 'assets'),
+    ('ix_synthesis_tasks_metadata', 'synthesis_tasks'),
+)
+_SHOT_KEY_INDEXES = ('shot_size', 'shot_type')
+
+
+def upgrade() -> None:
+    for name, table in _GIN_INDEXES:
+        create_index_concurrently(
+            name,
+            table,
+            ['metadata'],
+            postgresql_using='gin',
+            postgresql_ops={'metadata': 'jsonb_path_ops'},
+        )
+    for key in _SHOT_KEY_INDEXES:
+        create_index_concurrently(f'ix_shots_metadata_{key}', 'shots', [sa.text(f"(metadata ->> '{key}')")])
+
+
+def downgrade() -> None:
+    for key in reversed(_SHOT_KEY_INDEXES):
+        drop_index_concurrently(f'ix_shots_metadata_{key}', 'shots')
+    for name, table in reversed(_GIN_INDEXES):
+        drop_index_concurrently(name, table)
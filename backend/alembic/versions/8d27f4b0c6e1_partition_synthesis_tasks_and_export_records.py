@@ -0,0 +1,144 @@
+"""partition synthesis_tasks and export_records by created_at
+
+Revision ID: 8d27f4b0c6e1
+Revises: 5c1e9a7d3b42
+Create Date: 2026-10-19 14:03:51.902318
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.online_migrations import is_dry_run
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d27f4b0c6e1'
+down_revision: Union[str, None] = '5c1e9a7d3b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 迁移时额外预建的未来月份数，之后由 maintenance.partitions 定时任务接管
+_MONTHS_AHEAD = 3
+
+_SYNTHESIS_COLUMNS = (
+    'id, project_id, shot_id, voice_preset_id, payload, status, result_path, '
+    'error_message, metadata, created_at, updated_at'
+)
+_EXPORT_COLUMNS = 'id, project_id, format, status, output_path, metadata, created_at, updated_at'
+
+
+def _month_start(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + (value.month - 1) + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _create_monthly_partitions(table: str, source: str) -> None:
+    """为 source 中已有数据的月份以及未来若干月建分区。"""
+
+    bind = op.get_bind()
+    earliest = bind.execute(sa.text(f'SELECT min(created_at) FROM {source}')).scalar()
+    current = _month_start(datetime.now(timezone.utc))
+    start = _month_start(earliest) if earliest is not None else current
+    end = _add_months(current, _MONTHS_AHEAD)
+    while start <= end:
+        upper = _add_months(start, 1)
+        op.execute(
+            f'CREATE TABLE {table}_p{start.year:04d}_{start.month:02d} PARTITION OF {table} '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        start = upper
+
+
+def _create_synthesis_tasks(partitioned: bool) -> None:
+    op.create_table('synthesis_tasks',
+    sa.Column('id', sa.UUID(), nullable=False, comment='任务 ID'),
+    sa.Column('project_id', sa.UUID(), nullable=False, comment='所属项目'),
+    sa.Column('shot_id', sa.UUID(), nullable=True, comment='关联镜头，可选'),
+    sa.Column('voice_preset_id', sa.String(length=64), nullable=True, comment='使用的音色预设 ID'),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False, comment='任务参数快照，方便重跑'),
+    sa.Column('status', postgresql.ENUM(name='synthesis_task_status', create_type=False), nullable=False, comment='任务状态'),
+    sa.Column('result_path', sa.String(length=512), nullable=True, comment='生成文件在本地的路径'),
+    sa.Column('error_message', sa.String(length=512), nullable=True, comment='失败原因，最多 512 字符'),
+    sa.Column('metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True, comment='运行日志、用时等信息'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='记录创建时间，同时作为分区键'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='记录更新时间'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['shot_id'], ['shots.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', 'created_at', name='synthesis_tasks_pkey') if partitioned
+    else sa.PrimaryKeyConstraint('id', name='synthesis_tasks_pkey'),
+    **({'postgresql_partition_by': 'RANGE (created_at)'} if partitioned else {}),
+    )
+    if partitioned:
+        op.create_index('ix_synthesis_tasks_project_id_created_at', 'synthesis_tasks', ['project_id', 'created_at'], unique=False)
+    else:
+        op.create_index(op.f('ix_synthesis_tasks_project_id'), 'synthesis_tasks', ['project_id'], unique=False)
+    op.create_index(op.f('ix_synthesis_tasks_shot_id'), 'synthesis_tasks', ['shot_id'], unique=False)
+    op.create_index(
+        'ix_synthesis_tasks_metadata',
+        'synthesis_tasks',
+        ['metadata'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'metadata': 'jsonb_path_ops'},
+    )
+
+
+def _create_export_records(partitioned: bool) -> None:
+    op.create_table('export_records',
+    sa.Column('id', sa.UUID(), nullable=False, comment='导出记录 ID'),
+    sa.Column('project_id', sa.UUID(), nullable=False, comment='关联项目'),
+    sa.Column('format', postgresql.ENUM(name='export_format', create_type=False), nullable=False, comment='导出格式'),
+    sa.Column('status', postgresql.ENUM(name='export_status', create_type=False), nullable=False, comment='执行状态'),
+    sa.Column('output_path', sa.String(length=512), nullable=True, comment='生成文件在存储中的路径'),
+    sa.Column('metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True, comment='导出配置、版本信息等'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='记录创建时间，同时作为分区键'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='记录更新时间'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'created_at', name='export_records_pkey') if partitioned
+    else sa.PrimaryKeyConstraint('id', name='export_records_pkey'),
+    **({'postgresql_partition_by': 'RANGE (created_at)'} if partitioned else {}),
+    )
+    if partitioned:
+        op.create_index('ix_export_records_project_id_created_at', 'export_records', ['project_id', 'created_at'], unique=False)
+    else:
+        op.create_index(op.f('ix_export_records_project_id'), 'export_records', ['project_id'], unique=False)
+
+
+def _swap(table: str, columns: str, create, *, partitioned: bool) -> None:
+    """把现有表改名为 *_legacy，按新结构重建并迁移数据。"""
+
+    legacy = f'{table}_legacy'
+    op.rename_table(table, legacy)
+    # 主键与索引名在 schema 内全局唯一，旧表的需先让位
+    op.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey')
+    op.execute(f'DROP INDEX IF EXISTS ix_{table}_project_id')
+    op.execute(f'DROP INDEX IF EXISTS ix_{table}_project_id_created_at')
+    op.execute(f'DROP INDEX IF EXISTS ix_{table}_shot_id')
+    op.execute(f'DROP INDEX IF EXISTS ix_{table}_metadata')
+
+    create(partitioned)
+    if partitioned:
+        # dry-run 时改名只被记录、没有执行，数据仍在原表中
+        _create_monthly_partitions(table, table if is_dry_run() else legacy)
+    op.execute(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {legacy}')
+    op.drop_table(legacy)
+
+
+def upgrade() -> None:
+    _swap('synthesis_tasks', _SYNTHESIS_COLUMNS, _create_synthesis_tasks, partitioned=True)
+    _swap('export_records', _EXPORT_COLUMNS, _create_export_records, partitioned=True)
+
+
+def downgrade() -> None:
+    # 已归档（DETACH 到 archive schema）的分区不会被迁回
+    _swap('export_records', _EXPORT_COLUMNS, _create_export_records, partitioned=False)
+    _swap('synthesis_tasks', _SYNTHESIS_COLUMNS, _create_synthesis_tasks, partitioned=False)
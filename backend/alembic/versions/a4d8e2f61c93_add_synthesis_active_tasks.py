@@ -0,0 +1,55 @@
+"""add synthesis active tasks for enqueue dedup
+
+Revision ID: a4d8e2f61c93
+Revises: 3e9b6c1d7a25
+Create Date: 2026-10-19 18:05:47.631920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.db.online_migrations import set_lock_timeout
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8e2f61c93'
+down_revision: Union[str, None] = '3e9b6c1d7a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    set_lock_timeout()
+    op.create_table(
+        'synthesis_active_tasks',
+        sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=False, comment='活跃任务 ID'),
+        sa.Column('task_created_at', sa.DateTime(timezone=True), nullable=False, comment='任务创建时间，用于定位任务所在分区'),
+        sa.Column('project_id', postgresql.UUID(as_uuid=True), nullable=False, comment='所属项目'),
+        sa.Column('shot_id', postgresql.UUID(as_uuid=True), nullable=True, comment='关联镜头'),
+        sa.Column('payload_hash', sa.String(length=64), nullable=False, comment='合成内容指纹（文本、音色、采样率、引擎参数）'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='登记时间'),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['shot_id'], ['shots.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('task_id'),
+        sa.UniqueConstraint('project_id', 'shot_id', 'payload_hash', name='uq_synthesis_active_tasks_dedup', postgresql_nulls_not_distinct=True),
+    )
+    # 登记现有的活跃任务；已经重复的活跃任务只登记最早的一条，其余照常执行完
+    op.execute(
+        """
+        INSERT INTO synthesis_active_tasks (task_id, task_created_at, project_id, shot_id, payload_hash)
+        SELECT DISTINCT ON (project_id, shot_id, payload->>'fingerprint')
+               id, created_at, project_id, shot_id, payload->>'fingerprint'
+        FROM synthesis_tasks
+        WHERE status IN ('QUEUED', 'RUNNING') AND payload->>'fingerprint' IS NOT NULL
+        ORDER BY project_id, shot_id, payload->>'fingerprint', created_at
+        ON CONFLICT DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    set_lock_timeout()
+    op.drop_table('synthesis_active_tasks')
@@ -0,0 +1,43 @@
+"""add synthesis task retry bookkeeping and dead letter index
+
+Revision ID: c7f1a9e3d5b8
+Revises: a4d8e2f61c93
+Create Date: 2026-10-19 19:32:08.114503
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.online_migrations import create_partitioned_index_concurrently, set_lock_timeout
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7f1a9e3d5b8'
+down_revision: Union[str, None] = 'a4d8e2f61c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    set_lock_timeout()
+    # 常量默认值只写入目录，不重写表
+    op.add_column('synthesis_tasks', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False, comment='已认领执行的次数，包括中途退出的执行'))
+    op.add_column('synthesis_tasks', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True, comment='失败后下一次允许调度的时间（指数退避），为空表示可立即调度'))
+    op.add_column('synthesis_tasks', sa.Column('dead_lettered_at', sa.DateTime(timezone=True), nullable=True, comment='用尽重试次数进入死信队列的时间'))
+    create_partitioned_index_concurrently(
+        'ix_synthesis_tasks_dead_letter',
+        'synthesis_tasks',
+        ['project_id', 'dead_lettered_at'],
+        where='dead_lettered_at IS NOT NULL',
+    )
+
+
+def downgrade() -> None:
+    set_lock_timeout()
+    # 分区父表上的索引不支持 CONCURRENTLY 删除，删除父表索引会一并删除各分区的索引
+    op.drop_index('ix_synthesis_tasks_dead_letter', table_name='synthesis_tasks')
+    op.drop_column('synthesis_tasks', 'dead_lettered_at')
+    op.drop_column('synthesis_tasks', 'next_attempt_at')
+    op.drop_column('synthesis_tasks', 'attempts')
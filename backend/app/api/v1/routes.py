@@ -1,10 +1,16 @@
 """v1 API 路由汇总。"""
 from fastapi import APIRouter
 
-from app.api.v1.views import projects, scripts, shots
+from app.api.v1.views import assets, imports, projects, scripts, shots, synthesis, system
 
 router = APIRouter()
 
 router.include_router(projects.router, prefix="/projects", tags=["projects"])
 router.include_router(scripts.router, prefix="/projects/{project_id}/scripts", tags=["scripts"])
 router.include_router(shots.router, prefix="/projects/{project_id}/shots", tags=["shots"])
+router.include_router(assets.router, prefix="/projects/{project_id}/assets", tags=["assets"])
+router.include_router(imports.router, prefix="/projects/{project_id}/imports", tags=["imports"])
+router.include_router(
+    synthesis.router, prefix="/projects/{project_id}/synthesis-tasks", tags=["synthesis"]
+)
+router.include_router(system.router, prefix="/system", tags=["system"])
@@ -1,5 +1,5 @@
 """v1 视图模块导出。"""
 
-from . import projects, scripts, shots
+from . import assets, imports, projects, scripts, shots, synthesis, system
 
-__all__ = ("projects", "scripts", "shots")
+__all__ = ("assets", "imports", "projects", "scripts", "shots", "synthesis", "system")
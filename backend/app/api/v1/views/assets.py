@@ -0,0 +1,40 @@
+"""素材查询接口。"""
+
+from __future__ import annotations
+
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.middleware import TimedAPIRoute
+from app.db.session import get_session
+from app.schemas.assets import AssetRead
+from app.services.asset_service import AssetService
+from app.utils.metadata_filter import parse_metadata_filters
+
+router = APIRouter(route_class=TimedAPIRoute)
+
+
+def get_asset_service(session: AsyncSession = Depends(get_session)) -> AssetService:
+    return AssetService(session)
+
+
+@router.get("", response_model=list[AssetRead])
+async def list_assets(
+    project_id: UUID,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    shot_id: Optional[UUID] = Query(None, description="按镜头过滤"),
+    meta: Optional[list[str]] = Query(None, description="元数据过滤，格式 key:value，可重复"),
+    service: AssetService = Depends(get_asset_service),
+) -> list[AssetRead]:
+    assets = await service.list_assets(
+        project_id,
+        skip=skip,
+        limit=limit,
+        shot_id=shot_id,
+        metadata=parse_metadata_filters(meta),
+    )
+    return [AssetRead.model_validate(item) for item in assets]
@@ -0,0 +1,34 @@
+"""镜头/素材批量导入接口。"""
+
+from __future__ import annotations
+
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.middleware import TimedAPIRoute
+from app.db.session import get_session
+from app.schemas.imports import ImportFormat, ImportKind, ImportReport
+from app.services.import_service import BulkImportService, detect_format
+
+router = APIRouter(route_class=TimedAPIRoute)
+
+
+def get_import_service(session: AsyncSession = Depends(get_session)) -> BulkImportService:
+    return BulkImportService(session)
+
+
+@router.post("/{kind}", response_model=ImportReport)
+async def import_records(
+    project_id: UUID,
+    kind: ImportKind,
+    file: UploadFile = File(..., description="CSV / JSON / JSON Lines 文件"),
+    format: Optional[ImportFormat] = Query(None, description="文件格式，缺省时按扩展名推断"),
+    service: BulkImportService = Depends(get_import_service),
+) -> ImportReport:
+    """流式导入镜头或素材，逐行返回校验与冲突错误。"""
+
+    fmt = format or detect_format(file.filename)
+    return await service.import_file(project_id, kind, file.file, fmt)
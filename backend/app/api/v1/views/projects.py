@@ -7,11 +7,17 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_session
+from app.api.v1.views.scripts import invalidate_script_cache
+from app.core.cache import get_cache
+from app.core.middleware import TimedAPIRoute
+from app.core.redis import RedisKeys
+from app.db.session import AsyncSessionLocal, get_session
 from app.schemas.projects import ProjectCreate, ProjectRead, ProjectUpdate
 from app.services.project_service import ProjectService
 
-router = APIRouter()
+router = APIRouter(route_class=TimedAPIRoute)
+
+_CACHE_NAMESPACE = "project"
 
 
 def get_project_service(session: AsyncSession = Depends(get_session)) -> ProjectService:
@@ -44,14 +50,17 @@ async def list_projects(
 
 
 @router.get("/{project_id}", response_model=ProjectRead)
-async def get_project(
-    project_id: UUID,
-    service: ProjectService = Depends(get_project_service),
-) -> ProjectRead:
-    """查询单个项目。"""
+async def get_project(project_id: UUID) -> ProjectRead:
+    """查询单个项目，结果经两级缓存。"""
 
-    project = await service.get_project(project_id)
-    return ProjectRead.model_validate(project)
+    async def load() -> dict:
+        # 后台刷新可能晚于请求结束，回源使用独立会话而不是请求注入的会话
+        async with AsyncSessionLocal() as session:
+            project = await ProjectService(session).get_project(project_id)
+            return ProjectRead.model_validate(project).model_dump(mode="json")
+
+    data = await get_cache().get_or_load(_CACHE_NAMESPACE, RedisKeys.project_scoped(project_id), load)
+    return ProjectRead.model_validate(data)
 
 
 @router.patch("/{project_id}", response_model=ProjectRead)
@@ -63,6 +72,7 @@ async def update_project(
     """局部更新项目。"""
 
     project = await service.update_project(project_id, payload)
+    await get_cache().invalidate(_CACHE_NAMESPACE, RedisKeys.project_scoped(project_id))
     return ProjectRead.model_validate(project)
 
 
@@ -71,6 +81,8 @@ async def delete_project(
     project_id: UUID,
     service: ProjectService = Depends(get_project_service),
 ) -> None:
-    """删除项目。"""
+    """删除项目，并清理随之删除的锁定脚本的缓存。"""
 
-    await service.delete_project(project_id)
+    locked_script_ids = await service.delete_project(project_id)
+    await get_cache().invalidate(_CACHE_NAMESPACE, RedisKeys.project_scoped(project_id))
+    await invalidate_script_cache(project_id, locked_script_ids)
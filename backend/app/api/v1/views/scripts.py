@@ -2,16 +2,33 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Iterable
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import MISSING, get_cache
+from app.core.config.settings import settings
+from app.core.middleware import TimedAPIRoute
+from app.core.redis import RedisKeys
 from app.db.session import get_session
 from app.schemas.scripts import ScriptCreate, ScriptRead, ScriptUpdate
 from app.services.script_service import ScriptService
 
-router = APIRouter()
+router = APIRouter(route_class=TimedAPIRoute)
+
+_CACHE_NAMESPACE = "script"
+
+
+async def invalidate_script_cache(project_id: UUID, script_ids: Iterable[UUID]) -> None:
+    """清理脚本缓存；项目删除时由项目接口调用，避免已删除的锁定脚本继续命中缓存。"""
+
+    cache = get_cache()
+    await asyncio.gather(
+        *(cache.invalidate(_CACHE_NAMESPACE, RedisKeys.project_scoped(project_id, script_id)) for script_id in script_ids)
+    )
 
 
 def get_script_service(session: AsyncSession = Depends(get_session)) -> ScriptService:
@@ -45,8 +62,24 @@ async def get_script(
     script_id: UUID,
     service: ScriptService = Depends(get_script_service),
 ) -> ScriptRead:
+    # 只缓存已锁定的版本：内容不再变化，长 TTL 也不会读到旧数据
+    cache = get_cache()
+    cache_key = RedisKeys.project_scoped(project_id, script_id)
+    cached = await cache.get(_CACHE_NAMESPACE, cache_key, local_ttl=settings.cache_locked_script_local_ttl_seconds)
+    if cached is not MISSING:
+        return ScriptRead.model_validate(cached)
+
     script = await service.get_script(project_id, script_id)
-    return ScriptRead.model_validate(script)
+    result = ScriptRead.model_validate(script)
+    if result.is_locked:
+        await cache.set(
+            _CACHE_NAMESPACE,
+            cache_key,
+            result.model_dump(mode="json"),
+            ttl=settings.cache_locked_script_ttl_seconds,
+            local_ttl=settings.cache_locked_script_local_ttl_seconds,
+        )
+    return result
 
 
 @router.patch("/{script_id}", response_model=ScriptRead)
@@ -57,6 +90,7 @@ async def update_script(
     service: ScriptService = Depends(get_script_service),
 ) -> ScriptRead:
     script = await service.update_script(project_id, script_id, payload)
+    await invalidate_script_cache(project_id, [script_id])
     return ScriptRead.model_validate(script)
 
 
@@ -67,3 +101,4 @@ async def delete_script(
     service: ScriptService = Depends(get_script_service),
 ) -> None:
     await service.delete_script(project_id, script_id)
+    await invalidate_script_cache(project_id, [script_id])
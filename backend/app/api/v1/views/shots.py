@@ -2,16 +2,19 @@
 
 from __future__ import annotations
 
+from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.middleware import TimedAPIRoute
 from app.db.session import get_session
 from app.schemas.shots import ShotCreate, ShotRead, ShotUpdate
 from app.services.shot_service import ShotService
+from app.utils.metadata_filter import parse_metadata_filters
 
-router = APIRouter()
+router = APIRouter(route_class=TimedAPIRoute)
 
 
 def get_shot_service(session: AsyncSession = Depends(get_session)) -> ShotService:
@@ -33,9 +36,15 @@ async def list_shots(
     project_id: UUID,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    meta: Optional[list[str]] = Query(None, description="元数据过滤，格式 key:value，可重复"),
     service: ShotService = Depends(get_shot_service),
 ) -> list[ShotRead]:
-    shots = await service.list_shots(project_id, skip=skip, limit=limit)
+    shots = await service.list_shots(
+        project_id,
+        skip=skip,
+        limit=limit,
+        metadata=parse_metadata_filters(meta),
+    )
     return [ShotRead.model_validate(item) for item in shots]
 
 
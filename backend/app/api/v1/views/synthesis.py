@@ -0,0 +1,150 @@
+"""合成任务接口：创建后异步执行，通过查询接口获取状态与产物路径。"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.settings import settings
+from app.core.middleware import TimedAPIRoute
+from app.db.session import AsyncSessionLocal, get_session
+from app.models.synthesis_task import TaskStatus
+from app.schemas.synthesis import SynthesisSummaryRead, SynthesisTaskCreate, SynthesisTaskRead
+from app.services.synthesis_service import SynthesisService
+from app.synthesis.progress import RESYNC, ProgressSubscription, get_progress_hub
+from app.utils.metadata_filter import parse_metadata_filters
+
+router = APIRouter(route_class=TimedAPIRoute)
+
+
+def get_synthesis_service(session: AsyncSession = Depends(get_session)) -> SynthesisService:
+    return SynthesisService(session)
+
+
+@router.post("", response_model=SynthesisTaskRead, status_code=status.HTTP_202_ACCEPTED)
+async def create_synthesis_task(
+    project_id: UUID,
+    payload: SynthesisTaskCreate,
+    service: SynthesisService = Depends(get_synthesis_service),
+) -> SynthesisTaskRead:
+    task = await service.create_task(project_id, payload)
+    return SynthesisTaskRead.model_validate(task)
+
+
+@router.get("", response_model=list[SynthesisTaskRead])
+async def list_synthesis_tasks(
+    project_id: UUID,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    task_status: Optional[TaskStatus] = Query(None, alias="status", description="按任务状态过滤"),
+    shot_id: Optional[UUID] = Query(None, description="按镜头过滤"),
+    meta: Optional[list[str]] = Query(None, description="元数据过滤，格式 key:value，可重复"),
+    service: SynthesisService = Depends(get_synthesis_service),
+) -> list[SynthesisTaskRead]:
+    tasks = await service.list_tasks(
+        project_id,
+        skip=skip,
+        limit=limit,
+        status=task_status,
+        shot_id=shot_id,
+        metadata=parse_metadata_filters(meta),
+    )
+    return [SynthesisTaskRead.model_validate(item) for item in tasks]
+
+
+@router.get("/dead-letter", response_model=list[SynthesisTaskRead])
+async def list_dead_letter_tasks(
+    project_id: UUID,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    service: SynthesisService = Depends(get_synthesis_service),
+) -> list[SynthesisTaskRead]:
+    """死信队列：用尽重试次数的任务，error_message 为最后一次失败原因。"""
+
+    tasks = await service.list_dead_letter(project_id, skip=skip, limit=limit)
+    return [SynthesisTaskRead.model_validate(item) for item in tasks]
+
+
+@router.get("/summary", response_model=SynthesisSummaryRead)
+async def get_synthesis_summary(
+    project_id: UUID,
+    shot_id: Optional[UUID] = Query(None, description="只返回该镜头的计数"),
+    service: SynthesisService = Depends(get_synthesis_service),
+) -> SynthesisSummaryRead:
+    """按状态汇总的任务数，供看板展示，不必逐条列出任务。"""
+
+    return SynthesisSummaryRead.model_validate(await service.summary(project_id, shot_id=shot_id))
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _progress_stream(snapshot: list[dict], subscription: ProgressSubscription) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        yield _sse("snapshot", json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")))
+        while True:
+            data = await subscription.get(settings.synthesis_progress_keepalive_seconds)
+            if data is None:
+                # 注释行保活，避免代理因空闲断开连接
+                yield ": keepalive\n\n"
+            elif data == RESYNC:
+                yield _sse("resync", "{}")
+            else:
+                yield _sse("progress", data)
+    finally:
+        subscription.close()
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_synthesis_progress(project_id: UUID) -> StreamingResponse:
+    """以 SSE 推送项目内合成任务的进度。
+
+    连接建立时先下发 ``snapshot``（排队中与执行中的任务），之后推送 ``progress`` 事件；
+    收到 ``resync`` 表示有事件丢失，客户端应重新拉取任务列表。
+    """
+
+    # 先订阅再查快照，两者之间发生的变化不会漏掉；
+    # 快照使用独立会话并在返回前关闭，长连接不占用数据库连接
+    subscription = get_progress_hub().subscribe(project_id)
+    try:
+        async with AsyncSessionLocal() as session:
+            tasks = await SynthesisService(session).list_active_tasks(project_id)
+        snapshot = [SynthesisTaskRead.model_validate(task).model_dump(mode="json") for task in tasks]
+    except BaseException:
+        subscription.close()
+        raise
+    return StreamingResponse(
+        _progress_stream(snapshot, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{task_id}", response_model=SynthesisTaskRead)
+async def get_synthesis_task(
+    project_id: UUID,
+    task_id: UUID,
+    service: SynthesisService = Depends(get_synthesis_service),
+) -> SynthesisTaskRead:
+    task = await service.get_task(project_id, task_id)
+    return SynthesisTaskRead.model_validate(task)
+
+
+@router.post("/{task_id}/requeue", response_model=SynthesisTaskRead, status_code=status.HTTP_202_ACCEPTED)
+async def requeue_synthesis_task(
+    project_id: UUID,
+    task_id: UUID,
+    service: SynthesisService = Depends(get_synthesis_service),
+) -> SynthesisTaskRead:
+    """把死信队列中的任务重新排队，执行次数清零。"""
+
+    task = await service.requeue_task(project_id, task_id)
+    return SynthesisTaskRead.model_validate(task)
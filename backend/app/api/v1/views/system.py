@@ -0,0 +1,64 @@
+"""运行状态接口，供运维查看缓存、Redis 等进程内指标。"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Query
+
+from app.core.cache import get_cache
+from app.core.config.settings import settings
+from app.core.logging import get_log_throttle
+from app.core.middleware import TimedAPIRoute
+from app.core.redis import get_auto_pipeline, get_redis_breaker
+from app.synthesis.progress import get_progress_hub
+from app.workers.result_backend import result_backend_stats
+
+router = APIRouter(route_class=TimedAPIRoute)
+
+
+@router.get("/cache/stats")
+async def cache_stats() -> dict[str, Any]:
+    """返回当前进程两级缓存的分层命中率。"""
+
+    return get_cache().stats()
+
+
+@router.get("/redis/auto-pipeline")
+async def auto_pipeline_stats() -> dict[str, Any]:
+    """返回自动 Pipeline 的批次统计，未开启时 enabled 为 false。"""
+
+    if not settings.redis_auto_pipeline:
+        return {"enabled": False}
+    return {"enabled": True, **get_auto_pipeline().stats()}
+
+
+@router.get("/redis/breaker")
+async def redis_breaker_state() -> dict[str, Any]:
+    """返回 Redis 熔断器当前状态与累计拒绝次数。"""
+
+    return get_redis_breaker().stats()
+
+
+@router.get("/logging/throttle")
+async def log_throttle_stats() -> dict[str, Any]:
+    """返回日志限流的累计省略条数，未开启时 enabled 为 false。"""
+
+    throttle = get_log_throttle()
+    if throttle is None:
+        return {"enabled": False}
+    return {"enabled": True, **throttle.stats()}
+
+
+@router.get("/synthesis/progress")
+async def synthesis_progress_stats() -> dict[str, Any]:
+    """返回本进程进度推送的订阅连接数与转发计数。"""
+
+    return get_progress_hub().stats()
+
+
+@router.get("/celery/result-backend")
+async def celery_result_backend_stats(sample: int = Query(200, ge=1, le=5000)) -> dict[str, Any]:
+    """返回 Celery 结果后端的内存占用与结果 Key 的抽样大小。"""
+
+    return await result_backend_stats(sample=sample)
@@ -0,0 +1 @@
+"""命令行工具集合，使用 `python -m app.cli.<name>` 运行。"""
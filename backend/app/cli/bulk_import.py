@@ -0,0 +1,61 @@
+"""批量导入命令行工具。
+
+示例::
+
+    python -m app.cli.bulk_import shots --project-id <uuid> storyboard.csv
+    python -m app.cli.bulk_import assets --project-id <uuid> assets.jsonl --format jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from uuid import UUID
+
+from app.db.session import AsyncSessionLocal, engine
+from app.schemas.imports import ImportFormat, ImportKind, ImportReport
+from app.services.exceptions import ServiceError
+from app.services.import_service import BulkImportService, detect_format
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="从 CSV/JSON 文件批量导入镜头或素材")
+    parser.add_argument("kind", choices=[item.value for item in ImportKind], help="导入的实体类型")
+    parser.add_argument("path", type=Path, help="待导入的文件路径")
+    parser.add_argument("--project-id", type=UUID, required=True, help="目标项目 ID")
+    parser.add_argument(
+        "--format",
+        choices=[item.value for item in ImportFormat],
+        default=None,
+        help="文件格式，缺省时按扩展名推断",
+    )
+    parser.add_argument("--batch-size", type=int, default=None, help="每批 COPY 的行数")
+    return parser.parse_args(argv)
+
+
+async def _run(args: argparse.Namespace) -> ImportReport:
+    fmt = ImportFormat(args.format) if args.format else detect_format(args.path.name)
+    try:
+        async with AsyncSessionLocal() as session:
+            service = BulkImportService(session, batch_size=args.batch_size)
+            with args.path.open("rb") as stream:
+                return await service.import_file(args.project_id, ImportKind(args.kind), stream, fmt)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    try:
+        report = asyncio.run(_run(args))
+    except ServiceError as exc:
+        print(f"导入失败：{exc}", file=sys.stderr)
+        return 2
+    print(report.model_dump_json(indent=2))
+    return 0 if report.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""缓存工具模块对外导出。"""
+
+from .codec import JSON, MSGPACK, CodecError, CodecMetrics, Serializer, ValueCodec, register_serializer
+from .local import MISSING, LocalCache
+from .tiered import Loader, TieredCache, close_cache, get_cache, should_refresh_early
+
+__all__ = (
+    "JSON",
+    "MISSING",
+    "MSGPACK",
+    "CodecError",
+    "CodecMetrics",
+    "Loader",
+    "LocalCache",
+    "Serializer",
+    "TieredCache",
+    "ValueCodec",
+    "close_cache",
+    "get_cache",
+    "register_serializer",
+    "should_refresh_early",
+)
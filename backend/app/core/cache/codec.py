@@ -0,0 +1,232 @@
+"""缓存值编解码：可插拔的序列化格式 + 可选 zstd 压缩 + 版本头。
+
+编码结果为两字节头加正文：
+
+* 第 1 字节：格式版本，目前为 1，解码遇到未知版本时按未命中处理；
+* 第 2 字节：低 4 位为序列化格式 ID（1=JSON，2=msgpack），最高位表示正文经过 zstd 压缩。
+
+解码只依赖头部，与当前配置的编码格式无关，切换 ``cache_codec`` 后旧数据仍可读取；
+引入版本头之前写入的纯 JSON（以 ``{`` 开头）也按 JSON 兼容解析。
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import msgpack
+import zstandard
+
+from app.core.config.settings import settings
+
+FORMAT_VERSION = 1
+_COMPRESSED_FLAG = 0x80
+_CODEC_MASK = 0x0F
+_LEGACY_JSON_PREFIX = ord("{")
+
+
+class CodecError(ValueError):
+    """缓存数据无法解码（版本或格式未知、数据损坏）时抛出。"""
+
+
+@dataclass(frozen=True)
+class Serializer:
+    """一种序列化格式，codec_id 写入头部用于解码分发。"""
+
+    name: str
+    codec_id: int
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+JSON = Serializer(
+    name="json",
+    codec_id=1,
+    dumps=lambda value: json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode(),
+    loads=json.loads,
+)
+
+MSGPACK = Serializer(
+    name="msgpack",
+    codec_id=2,
+    dumps=lambda value: msgpack.packb(value, use_bin_type=True),
+    loads=lambda data: msgpack.unpackb(data, raw=False),
+)
+
+_SERIALIZERS: dict[int, Serializer] = {JSON.codec_id: JSON, MSGPACK.codec_id: MSGPACK}
+_BY_NAME: dict[str, Serializer] = {item.name: item for item in _SERIALIZERS.values()}
+
+
+def register_serializer(serializer: Serializer) -> None:
+    """注册自定义序列化格式，codec_id 取值 1-15 且不可重复。"""
+
+    if not 0 < serializer.codec_id <= _CODEC_MASK:
+        raise ValueError("codec_id must be between 1 and 15")
+    existing = _SERIALIZERS.get(serializer.codec_id)
+    if existing is not None and existing.name != serializer.name:
+        raise ValueError(f"codec_id {serializer.codec_id} already used by {existing.name}")
+    _SERIALIZERS[serializer.codec_id] = serializer
+    _BY_NAME[serializer.name] = serializer
+
+
+class _NamespaceStats:
+    __slots__ = (
+        "encoded",
+        "encoded_bytes",
+        "serialized_bytes",
+        "max_encoded_bytes",
+        "compressed",
+        "encode_seconds",
+        "decoded",
+        "decode_seconds",
+    )
+
+    def __init__(self) -> None:
+        self.encoded = 0
+        self.encoded_bytes = 0
+        self.serialized_bytes = 0
+        self.max_encoded_bytes = 0
+        self.compressed = 0
+        self.encode_seconds = 0.0
+        self.decoded = 0
+        self.decode_seconds = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "encoded": self.encoded,
+            "avg_encoded_bytes": self.encoded_bytes / self.encoded if self.encoded else 0.0,
+            "max_encoded_bytes": self.max_encoded_bytes,
+            "compression_ratio": self.encoded_bytes / self.serialized_bytes if self.serialized_bytes else 1.0,
+            "compressed": self.compressed,
+            "avg_encode_us": self.encode_seconds / self.encoded * 1e6 if self.encoded else 0.0,
+            "decoded": self.decoded,
+            "avg_decode_us": self.decode_seconds / self.decoded * 1e6 if self.decoded else 0.0,
+        }
+
+
+class CodecMetrics:
+    """按业务命名空间汇总编码体积与编解码耗时，用于估算 Redis 内存。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._namespaces: dict[str, _NamespaceStats] = {}
+
+    def _get(self, namespace: str) -> _NamespaceStats:
+        stats = self._namespaces.get(namespace)
+        if stats is None:
+            stats = self._namespaces.setdefault(namespace, _NamespaceStats())
+        return stats
+
+    def record_encode(
+        self, namespace: str, *, serialized: int, encoded: int, compressed: bool, seconds: float
+    ) -> None:
+        with self._lock:
+            stats = self._get(namespace)
+            stats.encoded += 1
+            stats.serialized_bytes += serialized
+            stats.encoded_bytes += encoded
+            stats.max_encoded_bytes = max(stats.max_encoded_bytes, encoded)
+            stats.compressed += int(compressed)
+            stats.encode_seconds += seconds
+
+    def record_decode(self, namespace: str, *, seconds: float) -> None:
+        with self._lock:
+            stats = self._get(namespace)
+            stats.decoded += 1
+            stats.decode_seconds += seconds
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self._namespaces.items())}
+
+
+class ValueCodec:
+    """按配置的格式编码缓存值，正文超过阈值时使用 zstd 压缩。"""
+
+    def __init__(
+        self,
+        serializer: Serializer | str | None = None,
+        *,
+        compress_threshold: int | None = None,
+        compress_level: int | None = None,
+        metrics: CodecMetrics | None = None,
+    ) -> None:
+        if serializer is None:
+            serializer = settings.cache_codec
+        if isinstance(serializer, str):
+            try:
+                serializer = _BY_NAME[serializer]
+            except KeyError as exc:
+                raise ValueError(f"unknown cache codec: {serializer}") from exc
+        self.serializer = serializer
+        self.compress_threshold = (
+            settings.cache_compress_threshold_bytes if compress_threshold is None else compress_threshold
+        )
+        level = settings.cache_compress_level if compress_level is None else compress_level
+        # ZstdCompressor 不能跨线程并发使用，缓存只在事件循环线程中编解码
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+        self.metrics = metrics or CodecMetrics()
+
+    def encode(self, value: Any, *, namespace: str = "default") -> bytes:
+        started = time.perf_counter()
+        body = self.serializer.dumps(value)
+        serialized = len(body)
+        flags = self.serializer.codec_id
+        if 0 < self.compress_threshold <= serialized:
+            compressed = self._compressor.compress(body)
+            # 压缩收益不明显（如已是高熵数据）时保留原文，省去解压开销
+            if len(compressed) < serialized:
+                body = compressed
+                flags |= _COMPRESSED_FLAG
+        data = bytes((FORMAT_VERSION, flags)) + body
+        self.metrics.record_encode(
+            namespace,
+            serialized=serialized,
+            encoded=len(data),
+            compressed=bool(flags & _COMPRESSED_FLAG),
+            seconds=time.perf_counter() - started,
+        )
+        return data
+
+    def decode(self, data: bytes, *, namespace: str = "default") -> Any:
+        started = time.perf_counter()
+        if not data:
+            raise CodecError("empty cache payload")
+        if data[0] == _LEGACY_JSON_PREFIX:
+            try:
+                value = json.loads(data)
+            except ValueError as exc:
+                raise CodecError(f"corrupted cache payload: {exc}") from exc
+        else:
+            if len(data) < 2 or data[0] != FORMAT_VERSION:
+                raise CodecError(f"unsupported cache format version: {data[0]}")
+            flags = data[1]
+            serializer = _SERIALIZERS.get(flags & _CODEC_MASK)
+            if serializer is None:
+                raise CodecError(f"unknown cache codec id: {flags & _CODEC_MASK}")
+            body = data[2:]
+            try:
+                if flags & _COMPRESSED_FLAG:
+                    body = self._decompressor.decompress(body)
+                value = serializer.loads(body)
+            except (zstandard.ZstdError, ValueError, msgpack.UnpackException) as exc:
+                raise CodecError(f"corrupted cache payload: {exc}") from exc
+        self.metrics.record_decode(namespace, seconds=time.perf_counter() - started)
+        return value
+
+
+__all__ = (
+    "FORMAT_VERSION",
+    "JSON",
+    "MSGPACK",
+    "CodecError",
+    "CodecMetrics",
+    "Serializer",
+    "ValueCodec",
+    "register_serializer",
+)
@@ -0,0 +1,88 @@
+"""进程内 TTL + LRU 缓存，按条目数与估算字节数双重限容。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+_MISSING = object()
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int) -> None:
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class LocalCache:
+    """线程安全的 LRU 缓存，条目过期或超出容量时淘汰最久未使用的条目。"""
+
+    def __init__(self, *, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = _MISSING) -> Any:
+        """读取未过期的值并刷新其 LRU 位置，未命中返回 default。"""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return default
+            self._entries.move_to_end(key)
+            return entry.value
+
+    def set(self, key: str, value: Any, *, ttl: float, size: int) -> None:
+        """写入条目；单条超过总字节预算时直接放弃缓存。"""
+
+        if ttl <= 0 or size > self.max_bytes:
+            self.delete(key)
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+MISSING = _MISSING
+
+__all__ = ("MISSING", "LocalCache")
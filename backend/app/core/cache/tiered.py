@@ -0,0 +1,450 @@
+"""两级缓存：进程内 LRU 在前，Redis 在后，通过 Pub/Sub 广播失效。
+
+缓存值以信封 ``{"v": 值, "exp": 逻辑过期时间戳, "d": 上次回源耗时}`` 存储，
+Redis Key 的物理 TTL 比逻辑过期多出 ``cache_stale_ttl_seconds``，用于：
+
+* 单飞：同一 Key 未命中时，进程内用 asyncio.Lock、跨进程用 Redis SET NX 锁，
+  保证每次过期只有一个调用方回源，其余等待回填结果；
+* 提前刷新（XFetch）：临近过期时按回源耗时以一定概率提前在后台刷新；
+* 过期仍可用（stale-while-revalidate）：逻辑过期但仍在宽限期内时先返回旧值，
+  同时在后台刷新。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+import uuid
+import weakref
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from redis.exceptions import RedisError
+
+from app.core.cache.codec import CodecError, ValueCodec
+from app.core.cache.local import MISSING, LocalCache
+from app.core.config.settings import settings
+from app.core.logging import logger
+from app.core.redis import (
+    AsyncRedisClient,
+    RedisKeys,
+    RedisUnavailableError,
+    get_async_redis_bytes,
+    get_async_redis_pubsub,
+)
+from app.core.redis.scripts import RELEASE_LOCK
+
+Loader = Callable[[], Awaitable[Any]]
+
+_LOCK_POLL_INTERVAL = 0.05
+
+
+def should_refresh_early(expires_at: float, delta: float, *, beta: float, now: float | None = None) -> bool:
+    """XFetch 判定：回源越慢、越接近过期，越可能提前刷新。"""
+
+    now = time.time() if now is None else now
+    if delta <= 0 or beta <= 0:
+        return now >= expires_at
+    # 1 - random() 落在 (0, 1]，避免 log(0)
+    return now - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+class TieredCache:
+    """读路径依次查询本地层与 Redis 层，写入与失效会广播给所有 API 进程。
+
+    只有在失效订阅处于连接状态时才使用本地层，订阅中断期间直接回源 Redis，
+    以免错过其他进程的失效消息而返回过期数据。
+    """
+
+    def __init__(
+        self,
+        *,
+        redis: AsyncRedisClient | None = None,
+        local: LocalCache | None = None,
+        channel: str | None = None,
+        codec: ValueCodec | None = None,
+    ) -> None:
+        self._redis = redis
+        self.codec = codec or ValueCodec()
+        self.local = local or LocalCache(
+            max_entries=settings.cache_local_max_entries,
+            max_bytes=settings.cache_local_max_bytes,
+        )
+        self.channel = channel or RedisKeys.cache_invalidation_channel()
+        self.origin = uuid.uuid4().hex
+        self._listener: asyncio.Task[None] | None = None
+        self._subscribed = False
+        self._key_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        self._refreshing: set[str] = set()
+        self._background: set[asyncio.Task[None]] = set()
+        self._counters = {
+            "local_hits": 0,
+            "local_misses": 0,
+            "redis_hits": 0,
+            "redis_misses": 0,
+            "loads": 0,
+            "invalidations_received": 0,
+            "lock_waits": 0,
+            "early_refreshes": 0,
+            "stale_served": 0,
+            "degraded": 0,
+        }
+
+    @property
+    def redis(self) -> AsyncRedisClient:
+        if self._redis is None:
+            # 缓存值为编码后的二进制，需使用不解码响应的连接池
+            self._redis = AsyncRedisClient(get_async_redis_bytes())
+        return self._redis
+
+    @property
+    def local_enabled(self) -> bool:
+        return self._subscribed
+
+    async def _read(self, namespace: str, full_key: str, local_ttl: float | None) -> dict[str, Any] | None:
+        """依次读取本地层与 Redis 层的信封，不判断逻辑过期。"""
+
+        if self.local_enabled:
+            envelope = self.local.get(full_key)
+            if envelope is not MISSING:
+                self._counters["local_hits"] += 1
+                return envelope
+            self._counters["local_misses"] += 1
+
+        raw = await self.redis.get(full_key)
+        if raw is None:
+            self._counters["redis_misses"] += 1
+            return None
+        self._counters["redis_hits"] += 1
+        try:
+            envelope = self.codec.decode(raw, namespace=namespace)
+        except CodecError as exc:
+            # 未知版本或损坏的数据按未命中处理，随后的回源会覆盖它
+            logger.bind(component="cache", key=full_key).warning(f"缓存数据无法解码: {exc}")
+            return None
+        if self.local_enabled:
+            self._fill_local(full_key, envelope, local_ttl, size=len(raw))
+        return envelope
+
+    def _fill_local(self, full_key: str, envelope: dict[str, Any], local_ttl: float | None, *, size: int) -> None:
+        # 本地副本不能活得比逻辑过期更久，否则会绕过提前刷新与宽限期判断
+        remaining = envelope["exp"] - time.time()
+        ttl = min(local_ttl or settings.cache_local_ttl_seconds, remaining)
+        self.local.set(full_key, envelope, ttl=ttl, size=size)
+
+    async def get(self, namespace: str, key: str, *, local_ttl: float | None = None) -> Any:
+        """读取未逻辑过期的缓存值，未命中或 Redis 不可用时返回 MISSING。"""
+
+        try:
+            envelope = await self._read(namespace, RedisKeys.cache(namespace, key), local_ttl)
+        except RedisUnavailableError:
+            self._counters["degraded"] += 1
+            return MISSING
+        if envelope is None or time.time() >= envelope["exp"]:
+            return MISSING
+        return envelope["v"]
+
+    async def set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        *,
+        ttl: int | None = None,
+        local_ttl: float | None = None,
+        compute_seconds: float = 0.0,
+    ) -> None:
+        """写入两级缓存，并通知其他进程丢弃本地旧值。
+
+        compute_seconds 为本次回源耗时，供 XFetch 估算提前刷新的时机。
+        """
+
+        full_key = RedisKeys.cache(namespace, key)
+        ttl = ttl or settings.cache_default_ttl_seconds
+        envelope = {"v": value, "exp": time.time() + ttl, "d": compute_seconds}
+        raw = self.codec.encode(envelope, namespace=namespace)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(full_key, raw, ex=ttl + settings.cache_stale_ttl_seconds)
+                pipe.publish(self.channel, f"{self.origin}|{full_key}")
+        except RedisUnavailableError:
+            # 降级模式：Redis 不可用时放弃回填，调用方照常拿到回源结果
+            self._counters["degraded"] += 1
+            return
+        if self.local_enabled:
+            self._fill_local(full_key, envelope, local_ttl, size=len(raw))
+
+    async def invalidate(self, namespace: str, key: str) -> None:
+        """删除两级缓存中的值并广播失效。"""
+
+        full_key = RedisKeys.cache(namespace, key)
+        self.local.delete(full_key)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(full_key)
+                pipe.publish(self.channel, f"{self.origin}|{full_key}")
+        except RedisUnavailableError:
+            # 数据库写入已提交，不能因为缓存失败让请求报错；旧值最多存活到 TTL 到期
+            self._counters["degraded"] += 1
+            logger.bind(component="cache", key=full_key, throttle_key="cache:invalidate:degraded").error(
+                "Redis 不可用，缓存失效未能生效"
+            )
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Loader,
+        *,
+        ttl: int | None = None,
+        local_ttl: float | None = None,
+    ) -> Any:
+        """命中缓存直接返回，否则单飞回源并回填两级缓存。
+
+        提前刷新与过期旧值的后台刷新会在请求结束后继续执行，loader 不能依赖
+        请求作用域内的资源（例如依赖注入的数据库会话）。Redis 不可用（包括熔断打开）
+        时进入降级模式，直接调用 loader 回源。
+        """
+
+        try:
+            return await self._get_or_load(namespace, key, loader, ttl=ttl, local_ttl=local_ttl)
+        except RedisUnavailableError:
+            self._counters["degraded"] += 1
+            return await loader()
+
+    async def _get_or_load(
+        self, namespace: str, key: str, loader: Loader, *, ttl: int | None, local_ttl: float | None
+    ) -> Any:
+        full_key = RedisKeys.cache(namespace, key)
+        envelope = await self._read(namespace, full_key, local_ttl)
+        if envelope is not None:
+            now = time.time()
+            if now < envelope["exp"]:
+                if should_refresh_early(
+                    envelope["exp"], envelope["d"], beta=settings.cache_early_refresh_beta, now=now
+                ):
+                    self._counters["early_refreshes"] += 1
+                    self._schedule_refresh(namespace, key, loader, ttl=ttl, local_ttl=local_ttl)
+                return envelope["v"]
+            self._counters["stale_served"] += 1
+            self._schedule_refresh(namespace, key, loader, ttl=ttl, local_ttl=local_ttl)
+            return envelope["v"]
+
+        lock = self._key_locks.get(full_key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._key_locks[full_key] = lock
+        async with lock:
+            # 排队期间同进程的其他协程可能已经回填
+            envelope = await self._read(namespace, full_key, local_ttl)
+            if envelope is not None and time.time() < envelope["exp"]:
+                return envelope["v"]
+            return await self._load_exclusive(namespace, key, loader, ttl=ttl, local_ttl=local_ttl)
+
+    async def _compute(
+        self, namespace: str, key: str, loader: Loader, *, ttl: int | None, local_ttl: float | None
+    ) -> Any:
+        self._counters["loads"] += 1
+        started = time.perf_counter()
+        value = await loader()
+        await self.set(
+            namespace, key, value, ttl=ttl, local_ttl=local_ttl, compute_seconds=time.perf_counter() - started
+        )
+        return value
+
+    async def _try_lock(self, lock_key: str) -> str | None:
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(
+            lock_key, token, expire_seconds=settings.cache_lock_ttl_seconds, only_if_absent=True
+        )
+        return token if acquired else None
+
+    async def _release_lock(self, lock_key: str, token: str) -> None:
+        try:
+            await self.redis.run_script(RELEASE_LOCK, [lock_key], [token])
+        except RedisUnavailableError:
+            # 释放失败时锁会在 cache_lock_ttl_seconds 后自动过期
+            self._counters["degraded"] += 1
+
+    async def _load_exclusive(
+        self, namespace: str, key: str, loader: Loader, *, ttl: int | None, local_ttl: float | None
+    ) -> Any:
+        """跨进程单飞：拿到 Redis 锁的调用方回源，其余轮询等待回填结果。"""
+
+        full_key = RedisKeys.cache(namespace, key)
+        lock_key = RedisKeys.cache_lock(namespace, key)
+        deadline = time.monotonic() + settings.cache_lock_wait_seconds
+        waited = False
+        while True:
+            token = await self._try_lock(lock_key)
+            if token is not None:
+                try:
+                    return await self._compute(namespace, key, loader, ttl=ttl, local_ttl=local_ttl)
+                finally:
+                    await self._release_lock(lock_key, token)
+
+            if not waited:
+                self._counters["lock_waits"] += 1
+                waited = True
+            await asyncio.sleep(_LOCK_POLL_INTERVAL)
+            envelope = await self._read(namespace, full_key, local_ttl)
+            if envelope is not None and time.time() < envelope["exp"]:
+                return envelope["v"]
+            if time.monotonic() >= deadline:
+                break
+
+        # 持锁方迟迟未回填（可能已崩溃），不再等待，直接回源兜底
+        logger.bind(component="cache", key=full_key, throttle_key="cache:lock_wait:timeout").warning(
+            "等待缓存回源锁超时，直接回源"
+        )
+        return await self._compute(namespace, key, loader, ttl=ttl, local_ttl=local_ttl)
+
+    def _schedule_refresh(
+        self, namespace: str, key: str, loader: Loader, *, ttl: int | None, local_ttl: float | None
+    ) -> None:
+        """在后台刷新，同一进程内同一 Key 同时只保留一个刷新任务。"""
+
+        full_key = RedisKeys.cache(namespace, key)
+        if full_key in self._refreshing:
+            return
+        self._refreshing.add(full_key)
+        task = asyncio.create_task(self._refresh(namespace, key, loader, ttl=ttl, local_ttl=local_ttl))
+        self._background.add(task)
+
+        def _done(finished: asyncio.Task[None]) -> None:
+            self._background.discard(finished)
+            self._refreshing.discard(full_key)
+
+        task.add_done_callback(_done)
+
+    async def _refresh(
+        self, namespace: str, key: str, loader: Loader, *, ttl: int | None, local_ttl: float | None
+    ) -> None:
+        lock_key = RedisKeys.cache_lock(namespace, key)
+        try:
+            token = await self._try_lock(lock_key)
+            if token is None:
+                # 其他进程正在刷新，继续提供旧值即可
+                return
+            try:
+                await self._compute(namespace, key, loader, ttl=ttl, local_ttl=local_ttl)
+            finally:
+                await self._release_lock(lock_key, token)
+        except Exception as exc:  # noqa: BLE001 - 后台刷新失败不影响已返回的旧值
+            logger.bind(
+                component="cache", key=RedisKeys.cache(namespace, key), throttle_key="cache:refresh:failed"
+            ).warning(f"缓存后台刷新失败: {exc!r}")
+
+    def _handle_invalidation(self, data: str) -> None:
+        origin, _, full_key = data.partition("|")
+        if origin == self.origin:
+            return
+        self._counters["invalidations_received"] += 1
+        self.local.delete(full_key)
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = get_async_redis_pubsub().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                # 订阅建立之前的失效消息可能已经错过，保守地清空本地层
+                self.local.clear()
+                self._subscribed = True
+                backoff = 1.0
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None and message.get("type") == "message":
+                        self._handle_invalidation(message["data"])
+            except RedisError as exc:
+                self._subscribed = False
+                logger.bind(component="cache", error=str(exc)).warning("缓存失效订阅中断，稍后重连")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                self._subscribed = False
+                await pubsub.aclose()
+
+    async def join_background(self) -> None:
+        """等待当前所有后台刷新完成。"""
+
+        if self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+
+    async def start(self) -> None:
+        """启动失效订阅协程。"""
+
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen(), name="cache-invalidation")
+
+    async def stop(self) -> None:
+        """停止失效订阅并清空本地层。"""
+
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        for task in list(self._background):
+            task.cancel()
+        await self.join_background()
+        self.local.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """按层汇总命中率与本地层容量。"""
+
+        counters = dict(self._counters)
+        local_lookups = counters["local_hits"] + counters["local_misses"]
+        redis_lookups = counters["redis_hits"] + counters["redis_misses"]
+        return {
+            "local": {
+                "enabled": self.local_enabled,
+                "hits": counters["local_hits"],
+                "misses": counters["local_misses"],
+                "hit_ratio": counters["local_hits"] / local_lookups if local_lookups else 0.0,
+                "entries": len(self.local),
+                "bytes": self.local.size_bytes,
+                "evictions": self.local.evictions,
+                "invalidations_received": counters["invalidations_received"],
+            },
+            "redis": {
+                "hits": counters["redis_hits"],
+                "misses": counters["redis_misses"],
+                "hit_ratio": counters["redis_hits"] / redis_lookups if redis_lookups else 0.0,
+            },
+            "loads": counters["loads"],
+            "lock_waits": counters["lock_waits"],
+            "early_refreshes": counters["early_refreshes"],
+            "stale_served": counters["stale_served"],
+            "degraded": counters["degraded"],
+            "codec": {"name": self.codec.serializer.name, "namespaces": self.codec.metrics.snapshot()},
+        }
+
+
+_cache: TieredCache | None = None
+
+
+def get_cache() -> TieredCache:
+    """返回进程级两级缓存实例。"""
+
+    global _cache
+    if _cache is None:
+        _cache = TieredCache()
+    return _cache
+
+
+async def close_cache() -> None:
+    """停止失效订阅并释放进程级缓存。"""
+
+    global _cache
+    if _cache is None:
+        return
+    await _cache.stop()
+    _cache = None
+
+
+__all__ = ("Loader", "TieredCache", "close_cache", "get_cache", "should_refresh_early")
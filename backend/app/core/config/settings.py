@@ -1,6 +1,6 @@
 """全局配置与环境变量加载。"""
 from functools import lru_cache
-from typing import List
+from typing import List, Literal
 
 from pydantic import AnyUrl, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -23,6 +23,20 @@ class Settings(BaseSettings):
 
     # 日志与监控
     log_level: str = "INFO"
+    # text：人读的单行格式；json：每行一个 JSON 对象，供日志采集端直接解析
+    log_format: str = "text"
+    # 日志写入交给后台写线程，事件循环只负责格式化与入队
+    log_enqueue: bool = True
+    log_timezone: str = "Asia/Shanghai"
+    # 热点错误日志限流：每个 throttle_key 在窗口内先输出 burst 条，之后每 sample_every 条输出 1 条
+    log_throttle_enabled: bool = True
+    log_throttle_window_seconds: float = 60.0
+    log_throttle_burst: int = 5
+    log_throttle_sample_every: int = 100
+    # 请求 ID 的请求/响应头名称，上游网关已生成时沿用
+    request_id_header: str = "X-Request-ID"
+    # 响应头附加 Server-Timing，拆分 DB、Redis 与序列化耗时
+    server_timing_enabled: bool = True
 
     # 数据库
     database_url: str = "postgresql+asyncpg://lizy:Lzy142857@db:5432/clipfusion"
@@ -30,10 +44,126 @@ class Settings(BaseSettings):
     database_max_overflow: int = 10
     database_echo: bool = False
 
+    # 批量导入
+    bulk_import_batch_size: int = 5000
+    bulk_import_max_errors: int = 1000
+
+    # 分区表维护（synthesis_tasks / export_records 按月分区）
+    partition_months_ahead: int = 3
+    partition_retention_months: int = 12
+    partition_archive_schema: str = "archive"
+    partition_lock_timeout_ms: int = 5000
+    partition_hot_window_months: int = 3
+
+    # 在线迁移
+    migration_lock_timeout_ms: int = 3000
+    migration_backfill_batch_size: int = 1000
+    migration_backfill_pause_seconds: float = 0.1
+
+    # 合成任务：TTS 引擎名称、产物存储目录与输出采样率
+    synthesis_engine: str = "local"
+    synthesis_storage_dir: str = "storage/synthesis"
+    synthesis_sample_rate: int = 22050
+    # 状态回写：Worker 内的状态更新合并成批写库，批次间隔与单批上限
+    synthesis_status_flush_interval_seconds: float = 0.2
+    synthesis_status_batch_size: int = 200
+    # 结果缓存：按内容指纹复用产物，超出总字节数或条目数时按最近访问淘汰
+    synthesis_cache_enabled: bool = True
+    synthesis_cache_max_bytes: int = 10 * 1024**3
+    synthesis_cache_max_entries: int = 100_000
+    # 相同内容并发合成时的占位锁 TTL，以及等待方的最长等待与轮询间隔
+    synthesis_cache_lock_ttl_seconds: int = 120
+    synthesis_cache_wait_seconds: float = 60.0
+    synthesis_cache_poll_seconds: float = 0.5
+    # 微批合成：单批最多句数（1 表示关闭）与首句最长等待时间；
+    # Worker 处理一条消息时最多顺带认领 max_size - 1 个排队任务
+    synthesis_batch_max_size: int = 16
+    synthesis_batch_max_wait_seconds: float = 0.05
+    # RUNNING 任务超过该时间没有任何状态更新，视为执行方已退出，允许重新认领
+    synthesis_claim_lease_seconds: int = 600
+    # 失败重试：最多执行次数（含首次），第 n 次失败后等待 base * 2^(n-1) 秒（上限 max）再调度，
+    # 实际等待在该值的一半到全部之间随机；用尽次数的任务进入死信队列
+    synthesis_max_attempts: int = 3
+    synthesis_retry_base_seconds: float = 10.0
+    synthesis_retry_max_seconds: float = 600.0
+    # 调度：交互式与批量任务分别进入两个 Celery 队列
+    synthesis_interactive_queue: str = "synthesis.interactive"
+    synthesis_bulk_queue: str = "synthesis.bulk"
+    # 公平调度：按 project 或 owner 轮转，限制每个主体同时在队列/执行中的任务数与全局在途总数
+    synthesis_fair_share_key: Literal["project", "owner"] = "project"
+    synthesis_interactive_cap_per_key: int = 4
+    synthesis_bulk_cap_per_key: int = 32
+    synthesis_dispatch_max_inflight: int = 64
+    # 定时调度的间隔；Worker 每完成一条消息也会立即调度一次，空出的名额不必等下一个 tick
+    synthesis_dispatch_interval_seconds: float = 1.0
+    synthesis_dispatch_on_complete: bool = True
+    # 已投递但超过该时间仍未被认领的任务视为消息丢失，重新参与调度
+    synthesis_dispatch_timeout_seconds: int = 900
+    # 进度推送：Worker 经 Redis Pub/Sub 广播，API 以 SSE 按项目推送；
+    # 无事件时的心跳间隔，以及单个连接积压的事件上限（超出时清空积压并提示客户端重新拉取）
+    synthesis_progress_enabled: bool = True
+    synthesis_progress_keepalive_seconds: float = 15.0
+    synthesis_progress_queue_size: int = 256
+    # 创建去重：同一镜头、同一内容已有排队或执行中的任务时直接返回该任务；
+    # Redis 标记的有效期只影响快速路径，唯一性由活跃任务登记表保证
+    synthesis_dedup_enabled: bool = True
+    synthesis_dedup_ttl_seconds: int = 600
+    # 状态计数：按项目与镜头在 Redis Hash 中增量维护，供看板汇总；
+    # 定时按数据库聚合结果校准，长期无变化的项目计数随 TTL 过期，下次读取时重建
+    synthesis_counters_enabled: bool = True
+    synthesis_counters_ttl_seconds: int = 30 * 24 * 3600
+    synthesis_counters_reconcile_interval_seconds: float = 600.0
+    # http 引擎：模型服务地址、单次调用超时与连接池上限
+    synthesis_http_engine_url: str = "http://localhost:9880/tts"
+    synthesis_http_engine_timeout_seconds: float = 120.0
+    synthesis_http_engine_max_connections: int = 64
+    # 每个 Worker 进程内同一后端同时进行中的调用数上限，按引擎名称配置，未配置的使用默认值
+    synthesis_backend_concurrency: dict[str, int] = {}
+    synthesis_backend_default_concurrency: int = 16
+    # 每个 Worker 进程常驻的数据库连接池大小，任务之间复用连接
+    worker_database_pool_size: int = 2
+    # Worker 执行模式：prefork 每个进程同时执行一个任务；asyncio 使用线程池接收消息，
+    # 任务协程在进程内的事件循环上并发执行，适合等待模型或 HTTP 后端的 I/O 密集任务
+    worker_execution_mode: Literal["prefork", "asyncio"] = "prefork"
+    worker_async_concurrency: int = 64
+    worker_async_database_pool_size: int = 10
+
     # 消息队列 / 缓存
     redis_url: AnyUrl = "redis://localhost:6379/0"
     broker_url: AnyUrl = "redis://localhost:6379/0"
     result_backend: AnyUrl = "redis://localhost:6379/1"
+    # 结果后端只存小引用（任务 ID 与最终状态），产物与元数据在任务表中；引用的保留时间
+    celery_result_expires_seconds: int = 3600
+    # 集群模式下 redis_url 指向任一节点，redis_max_connections 为每个节点的上限
+    redis_cluster: bool = False
+    redis_max_connections: int = 50
+    redis_pool_timeout_seconds: float = 5.0
+    # 自动 Pipeline：合并同一窗口内的并发命令，窗口为 0 时只合并同一轮事件循环
+    redis_auto_pipeline: bool = False
+    redis_auto_pipeline_window_ms: float = 0.0
+    redis_auto_pipeline_max_batch: int = 512
+    # 熔断：连续连接失败次数阈值、打开后多久进入半开、半开时放行的探测调用数
+    redis_breaker_failure_threshold: int = 5
+    redis_breaker_recovery_seconds: float = 5.0
+    redis_breaker_half_open_max_calls: int = 1
+
+    # 缓存（进程内 LRU + Redis 两级）
+    cache_default_ttl_seconds: int = 300
+    cache_local_ttl_seconds: float = 30.0
+    cache_local_max_entries: int = 10_000
+    cache_local_max_bytes: int = 64 * 1024 * 1024
+    # 锁定的脚本版本不会再变化，可以缓存得更久
+    cache_locked_script_ttl_seconds: int = 3600
+    cache_locked_script_local_ttl_seconds: float = 600.0
+    # 防击穿：逻辑过期后仍保留旧值的时长、回源锁 TTL 与等待上限、提前刷新系数
+    cache_stale_ttl_seconds: int = 60
+    cache_lock_ttl_seconds: int = 10
+    cache_lock_wait_seconds: float = 5.0
+    cache_early_refresh_beta: float = 1.0
+    # 缓存值编码：json 或 msgpack，序列化后超过阈值的正文使用 zstd 压缩（阈值为 0 表示不压缩）
+    cache_codec: str = "msgpack"
+    cache_compress_threshold_bytes: int = 1024
+    cache_compress_level: int = 3
 
 
 @lru_cache
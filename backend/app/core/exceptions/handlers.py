@@ -7,12 +7,19 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 
 from app.api.v1.api_error import ApiError
-from app.core.redis import RedisBackendError
+from app.core.redis import RedisBackendError, RedisCircuitOpenError, RedisUnavailableError
 from app.schemas.common import ErrorResponse, ValidationErrorResponse, FieldError
 from app.services.exceptions import ServiceError
 from app.core.logging import logger
 
 
+def _throttle_key(request: Request, kind: str) -> str:
+    """按路由模板而非实际路径聚合，避免路径中的 ID 让每个请求各占一个限流 key。"""
+
+    route = request.scope.get("route")
+    return f"http:{kind}:{getattr(route, 'path', request.url.path)}"
+
+
 def service_error_handler(request: Request, exc: ServiceError) -> JSONResponse:
     logger.bind(
         component="server_error",
@@ -36,20 +43,38 @@ def generic_error_handler(request: Request, exc: Exception) -> JSONResponse:
         component="generic_error",
         path=str(request.url.path), 
         status=str(status.HTTP_500_INTERNAL_SERVER_ERROR),
-        error=str(exc)
+        error=str(exc),
+        throttle_key=_throttle_key(request, type(exc).__name__),
     ).exception("未捕获异常")
     payload = ErrorResponse(message="Internal server error", code="internal_error")
     return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=payload.model_dump())
 
 def redis_error_handler(request: Request, exc: RedisBackendError) -> JSONResponse:
-    logger.bind(
+    # Redis 不可达属于依赖暂时不可用，返回 503 让调用方重试；其余 Redis 错误仍按 500 处理
+    if isinstance(exc, RedisUnavailableError):
+        status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        retry_after = getattr(exc, "retry_after", None)
+        headers = {"Retry-After": str(max(1, round(retry_after)))} if retry_after is not None else None
+        code = "redis_unavailable"
+    else:
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        headers = None
+        code = "redis_error"
+
+    log = logger.bind(
         component="redis_error",
-        path=str(request.url.path), 
-        status=str(status.HTTP_500_INTERNAL_SERVER_ERROR),
-        error=str(exc)
-    ).exception("Redis 异常")
-    payload = ErrorResponse(message=str(exc), code="redis_error")
-    return JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=payload.model_dump())
+        path=str(request.url.path),
+        status=str(status_code),
+        error=str(exc),
+        throttle_key=_throttle_key(request, type(exc).__name__),
+    )
+    if isinstance(exc, RedisCircuitOpenError):
+        # 熔断期间每个请求都会走到这里，不再输出堆栈
+        log.warning("Redis 熔断中，请求被快速拒绝")
+    else:
+        log.exception("Redis 异常")
+    payload = ErrorResponse(message=str(exc), code=code)
+    return JSONResponse(status_code=status_code, content=payload.model_dump(), headers=headers)
 
 def request_validation_error_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
     """处理请求体验证错误，输出中文友好提示。"""
@@ -1,11 +1,13 @@
 """日志模块导出。"""
 
 from .context import get_log_context, reset_log_context, set_log_context
-from .logger import configure_logging, logger
+from .logger import configure_logging, flush_logging, get_log_throttle, logger
 
 __all__ = (
     "configure_logging",
+    "flush_logging",
     "get_log_context",
+    "get_log_throttle",
     "logger",
     "reset_log_context",
     "set_log_context",
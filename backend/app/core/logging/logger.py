@@ -1,24 +1,100 @@
-"""统一的 Loguru 日志配置。"""
+"""统一的 Loguru 日志配置。
+
+日志写入默认交给后台写线程（``QueuedSink``），事件循环中只做格式化和入队，
+不会因为 stdout 被管道或采集端阻塞而卡住请求。输出格式支持两种：
+
+* text：人读的单行格式，开发环境彩色输出；
+* json：每行一个 JSON 对象（JSON Lines），上下文字段平铺在顶层，供日志采集端直接解析。
+
+格式化函数只返回少数几个固定模板，Loguru 会缓存模板的解析结果；
+消息正文与附加字段通过占位符填充，不再逐条拼接进模板。
+"""
 
 from __future__ import annotations
 
+import json
 import sys
-from typing import Any, Dict
+import traceback
+from datetime import datetime, timezone, tzinfo
+from typing import Any, Dict, TextIO
 from zoneinfo import ZoneInfo
 
 from loguru import logger as loguru_logger
 
 from app.core.config.settings import settings
 from app.core.logging.context import get_log_context
+from app.core.logging.sink import QueuedSink
+from app.core.logging.throttle import LogThrottle
 
 _DEFAULT_EXTRAS: dict[str, Any] = {}
 
+# text 格式展示的附加字段：(字段名, 前缀, 后缀)，按顺序输出
+_TEXT_FIELDS: tuple[tuple[str, str, str], ...] = (
+    ("tenant_id", "tenant=", ""),
+    ("user_id", "user=", ""),
+    ("request_id", "req=", ""),
+    ("component", "", ""),
+    ("method", "", ""),
+    ("path", "", ""),
+    ("status", "", ""),
+    ("error", "", ""),
+    ("params", "params=", ""),
+    ("duration_ms", "duration=", "ms"),
+    ("suppressed", "suppressed ", " similar"),
+)
+_EMPTY_VALUES = (None, "", "-", [])
+# 访问日志类组件的代码位置没有排查价值，省略以缩短单行长度
+_NO_LOCATION_COMPONENTS = frozenset({"api", "http", "server_error"})
+
+# 日志格式中追加时区信息，方便排查跨时区问题
+_TEXT_HEAD = "<green>{extra[_time]}</green> | <level>{level: <2}</level>{extra[_summary]}"
+_TEXT_TAIL = " - <level>{message}</level>\n{exception}"
+_TEXT_WITH_LOCATION = (
+    _TEXT_HEAD + " | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan>" + _TEXT_TAIL
+)
+_TEXT_WITHOUT_LOCATION = _TEXT_HEAD + _TEXT_TAIL
+_JSON_TEMPLATE = "{extra[_json]}\n"
+# JSON 输出中由记录本身提供的字段，附加字段同名时不覆盖
+_JSON_RESERVED = frozenset({"time", "level", "message", "logger", "function", "line", "exception"})
+
+
+def resolve_timezone(name: str) -> tzinfo:
+    """解析日志时区；没有夏令时的时区换成固定偏移，逐条转换时省去 ZoneInfo 的规则查找。"""
+
+    zone = ZoneInfo(name)
+    year = datetime.now(zone).year
+    winter = datetime(year, 1, 1, tzinfo=zone).utcoffset()
+    summer = datetime(year, 7, 1, tzinfo=zone).utcoffset()
+    if winter == summer and winter is not None:
+        return timezone(winter, name)
+    return zone
+
+
+class _SecondCache:
+    """按秒缓存时间戳的日期时间与时区部分，同一秒内的记录只需拼接毫秒。"""
+
+    __slots__ = ("_entry",)
+
+    def __init__(self) -> None:
+        self._entry: tuple[tuple[int, ...], str] = ((), "")
+
+    def format(self, moment: datetime) -> str:
+        key = (moment.second, moment.minute, moment.hour, moment.day, moment.month, moment.year)
+        cached_key, prefix = self._entry
+        if key != cached_key:
+            prefix = moment.strftime("%Y-%m-%d %H:%M:%S.{} %z")
+            self._entry = (key, prefix)
+        return prefix.format(f"{moment.microsecond // 1000:03d}")
+
+
+_timestamps = _SecondCache()
+
 
 class ContextInjector:
     """在日志记录时注入上下文变量，并统一时区。"""
 
-    def __init__(self, timezone: ZoneInfo | None = None) -> None:
-        self.timezone = timezone or ZoneInfo("Asia/Shanghai")
+    def __init__(self, timezone: tzinfo | None = None) -> None:
+        self.timezone = timezone or resolve_timezone("Asia/Shanghai")
 
     def __call__(self, record: Dict[str, Any]) -> Dict[str, Any]:
         """在日志 extra 字段中合并上下文并转换时区。"""
@@ -29,71 +105,108 @@ class ContextInjector:
         return record
 
 
-def configure_logging() -> None:
-    """初始化日志输出，开发环境启用彩色格式。"""
+def text_formatter(record: Dict[str, Any]) -> str:
+    """人读格式：附加字段预先拼成一段文本，模板本身保持不变。"""
+
+    extra = record["extra"]
+    extra["_time"] = _timestamps.format(record["time"])
+    parts = []
+    for field, prefix, suffix in _TEXT_FIELDS:
+        value = extra.get(field)
+        if value not in _EMPTY_VALUES:
+            parts.append(f"{prefix}{value}{suffix}")
+    extra["_summary"] = " | " + " ".join(parts) if parts else ""
+    if extra.get("component") in _NO_LOCATION_COMPONENTS:
+        return _TEXT_WITHOUT_LOCATION
+    return _TEXT_WITH_LOCATION
+
+
+def json_formatter(record: Dict[str, Any]) -> str:
+    """JSON Lines 格式：每条记录序列化为一行紧凑 JSON。"""
+
+    payload: dict[str, Any] = {
+        "time": record["time"].isoformat(timespec="milliseconds"),
+        "level": record["level"].name,
+        "message": record["message"],
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+    }
+    extra = record["extra"]
+    for key, value in extra.items():
+        if key[0] != "_" and key not in _JSON_RESERVED:
+            payload[key] = value
+    exception = record["exception"]
+    if exception:
+        payload["exception"] = "".join(
+            traceback.format_exception(exception.type, exception.value, exception.traceback)
+        )
+    extra["_json"] = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str)
+    return _JSON_TEMPLATE
 
-    global logger
 
-    loguru_logger.remove()
+_FORMATTERS = {"text": text_formatter, "json": json_formatter}
+_throttle: LogThrottle | None = None
+
+
+def configure_logging(
+    *,
+    sink: TextIO | None = None,
+    log_format: str | None = None,
+    enqueue: bool | None = None,
+) -> None:
+    """初始化日志输出，开发环境的 text 格式启用彩色输出。
+
+    参数缺省时读取配置，显式传入主要用于基准测试。
+    """
 
-    level = settings.log_level.upper()
-    colorize = settings.environment.lower() == "development"
+    log_format = (log_format or settings.log_format).lower()
+    try:
+        formatter = _FORMATTERS[log_format]
+    except KeyError as exc:
+        raise ValueError(f"unknown log format: {log_format}") from exc
 
-    loguru_logger.configure(extra=_DEFAULT_EXTRAS)
-    # 日志格式中追加时区信息，方便排查跨时区问题
-    def formatter(record: Dict[str, Any]) -> str:
-        time_part = (
-            f"<green>{record['time'].strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} "
-            f"{record['time'].strftime('%z')}</green>"
+    global _throttle
+    _throttle = (
+        LogThrottle(
+            window_seconds=settings.log_throttle_window_seconds,
+            burst=settings.log_throttle_burst,
+            sample_every=settings.log_throttle_sample_every,
         )
-        level_part = f"<level>{record['level'].name: <2}</level>"
-        base = f"{time_part} | {level_part}"
-
-        extra = record.get("extra", {})
-        extras_to_show = []
-        for label, field in [
-            ("tenant", "tenant_id"),
-            ("user", "user_id"),
-            ("req", "request_id"),
-            ("component", "component"),
-            ("method", "method"),
-            ("path", "path"),
-            ("status", "status"),
-            ("error", "error"),
-            ("params", "params"),
-            ("duration", "duration_ms"),
-        ]:
-            value = extra.get(field)
-            if value not in (None, "", "-", []):
-                if field in {"component", "method", "path", "error", "status"}:
-                    extras_to_show.append(str(value))
-                elif field == "duration_ms":
-                    extras_to_show.append(f"{label}={value}ms")
-                else:
-                    extras_to_show.append(f"{label}={value}")
-
-        if extras_to_show:
-            base += " | " + " ".join(extras_to_show)
-
-        component = extra.get("component")
-        include_location = component not in {"api", "http", "server_error"}
-
-        message = record.get("message", "")
-        if include_location:
-            location = f"<cyan>{record['name']}</cyan>:<cyan>{record['function']}</cyan>:<cyan>{record['line']}</cyan>"
-            return f"{base} | {location} - <level>{message}</level>\n"
-        return f"{base} - <level>{message}</level>\n"
+        if settings.log_throttle_enabled
+        else None
+    )
 
+    loguru_logger.remove()
+    # patcher 对全局 logger 生效，无论各模块在配置前还是配置后导入 logger
+    loguru_logger.configure(
+        extra=_DEFAULT_EXTRAS,
+        patcher=ContextInjector(resolve_timezone(settings.log_timezone)),
+    )
+    stream = sink or sys.stdout
+    if settings.log_enqueue if enqueue is None else enqueue:
+        stream = QueuedSink(stream)
     loguru_logger.add(
-        sys.stdout,
-        level=level,
-        colorize=colorize,
+        stream,
+        level=settings.log_level.upper(),
+        colorize=log_format == "text" and settings.environment.lower() == "development",
         backtrace=settings.debug,
         diagnose=settings.debug,
         format=formatter,
+        filter=_throttle,
     )
-    shanghai_tz = ZoneInfo("Asia/Shanghai")
-    logger = loguru_logger.patch(ContextInjector(shanghai_tz))
+
+
+def get_log_throttle() -> LogThrottle | None:
+    """返回当前生效的日志限流器，未启用时为 None。"""
+
+    return _throttle
+
+
+async def flush_logging() -> None:
+    """等待写线程写完队列中的日志，应用退出前调用。"""
+
+    await loguru_logger.complete()
 
 
 logger = loguru_logger
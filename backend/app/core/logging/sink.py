@@ -0,0 +1,115 @@
+"""后台线程日志输出：调用方只把格式化好的日志放入队列，由写线程批量写入流。
+
+Loguru 自带的 ``enqueue`` 基于 multiprocessing 管道，每条记录都要连同整个 record
+一起 pickle，调用线程的开销反而比直接写 stdout 更高；这里的队列只在线程间传递字符串。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import threading
+import weakref
+from typing import TextIO
+
+_STOP = object()
+_live_sinks: weakref.WeakSet[QueuedSink] = weakref.WeakSet()
+
+
+class QueuedSink:
+    """Loguru 的流式 sink：write 只入队，写线程每次取出一批日志合并写入并 flush。
+
+    积压超过 max_pending 条时丢弃新日志并计数，避免采集端长时间阻塞时内存无限增长。
+    """
+
+    def __init__(self, stream: TextIO, *, batch_size: int = 512, max_pending: int = 100_000) -> None:
+        self.stream = stream
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._stopped = False
+        self._start()
+        _live_sinks.add(self)
+
+    def _start(self) -> None:
+        self._queue: queue.SimpleQueue[object] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        if self._queue.qsize() >= self.max_pending:
+            self.dropped += 1
+            return
+        self._queue.put(message)
+
+    def _run(self) -> None:
+        pending = self._queue
+        while True:
+            item = pending.get()
+            batch: list[str] = []
+            markers: list[threading.Event] = []
+            stop = False
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)  # type: ignore[arg-type]
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = pending.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self.stream.write("".join(batch))
+                    self.stream.flush()
+                except Exception:  # noqa: BLE001 - 写日志失败不能让写线程退出
+                    pass
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """阻塞直到当前已入队的日志全部写出。"""
+
+        if not self._thread.is_alive():
+            return True
+        marker = threading.Event()
+        self._queue.put(marker)
+        return marker.wait(timeout)
+
+    async def complete(self) -> None:
+        """供 ``logger.complete()`` 等待，不阻塞事件循环。"""
+
+        await asyncio.to_thread(self.drain)
+
+    def stop(self) -> None:
+        """移除 sink 时调用：写完剩余日志后结束写线程。"""
+
+        self._stopped = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _after_fork(self) -> None:
+        # fork 出的子进程（如 Celery prefork worker）不会继承写线程，需要重新启动
+        if not self._stopped:
+            self._start()
+
+
+def _restart_sinks_in_child() -> None:
+    for sink in list(_live_sinks):
+        sink._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_sinks_in_child)
+
+
+__all__ = ("QueuedSink",)
@@ -0,0 +1,96 @@
+"""热点错误日志的限流与采样。
+
+Redis、数据库抖动时，同一类错误会在每次调用、每个请求上重复输出，日志本身的
+格式化与写入反而加重系统负担。绑定了 ``throttle_key`` 的日志按 key 分窗口限流：
+
+* 每个窗口内前 burst 条照常输出；
+* 之后每 sample_every 条输出 1 条，其余丢弃（sample_every 为 0 时全部丢弃）；
+* 丢弃后输出的第一条日志附带 ``suppressed=N``，说明期间省略了多少条相似日志。
+
+未绑定 ``throttle_key`` 的日志不受影响。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict
+
+
+class _KeyState:
+    __slots__ = ("window_start", "seen", "suppressed")
+
+    def __init__(self, now: float) -> None:
+        self.window_start = now
+        self.seen = 0
+        self.suppressed = 0
+
+
+class LogThrottle:
+    """Loguru 过滤器：按 ``extra["throttle_key"]`` 限流，线程安全。"""
+
+    def __init__(
+        self,
+        *,
+        window_seconds: float,
+        burst: int,
+        sample_every: int,
+        max_keys: int = 1024,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.burst = burst
+        self.sample_every = sample_every
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._states: dict[str, _KeyState] = {}
+        self.total_suppressed = 0
+
+    def __call__(self, record: Dict[str, Any]) -> bool:
+        key = record["extra"].get("throttle_key")
+        if key is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                if len(self._states) >= self.max_keys:
+                    self._evict(now)
+                state = self._states[key] = _KeyState(now)
+            elif now - state.window_start >= self.window_seconds:
+                # 新窗口重新计数，上一窗口省略的条数由本条日志带出
+                state.window_start = now
+                state.seen = 0
+            state.seen += 1
+            over = state.seen - self.burst
+            if over > 0 and (self.sample_every <= 0 or over % self.sample_every):
+                state.suppressed += 1
+                self.total_suppressed += 1
+                return False
+            suppressed, state.suppressed = state.suppressed, 0
+        if suppressed:
+            record["extra"]["suppressed"] = suppressed
+        return True
+
+    def _evict(self, now: float) -> None:
+        # key 数量超限时清理已过窗口且没有待汇报条数的 key；仍然超限则整体清空
+        for key in [
+            key
+            for key, state in self._states.items()
+            if now - state.window_start >= self.window_seconds and not state.suppressed
+        ]:
+            del self._states[key]
+        if len(self._states) >= self.max_keys:
+            self._states.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "keys": len(self._states),
+                "total_suppressed": self.total_suppressed,
+                "pending_suppressed": {
+                    key: state.suppressed for key, state in self._states.items() if state.suppressed
+                },
+            }
+
+
+__all__ = ("LogThrottle",)
@@ -0,0 +1,104 @@
+"""请求范围的耗时统计，按 DB、Redis、序列化等环节累加，用于 Server-Timing 响应头。
+
+统计对象保存在 ContextVar 中，由请求中间件在每个请求开始时创建；请求之外
+（Celery 任务、启动脚本等）没有统计对象，记录调用直接忽略，开销只有一次 ContextVar 读取。
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+
+DB = "db"
+REDIS = "redis"
+SERIALIZE = "serialize"
+
+
+class RequestTimings:
+    """一个请求内各环节的累计耗时（秒）与调用次数。"""
+
+    __slots__ = ("started", "endpoint_done", "seconds", "counts")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        # 路由函数返回的时间点，之后到响应头发出之间的耗时计为序列化耗时
+        self.endpoint_done: float | None = None
+        self.seconds: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, kind: str, seconds: float) -> None:
+        self.seconds[kind] = self.seconds.get(kind, 0.0) + seconds
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """生成 Server-Timing 响应头，``total`` 为截至响应头发出时的总耗时。"""
+
+        parts = []
+        for kind, seconds in self.seconds.items():
+            count = self.counts[kind]
+            desc = f';desc="{count} calls"' if count > 1 else ""
+            parts.append(f"{kind};dur={seconds * 1000:.2f}{desc}")
+        parts.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_timings_var: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> tuple[RequestTimings, Token[RequestTimings | None]]:
+    """为当前请求创建统计对象，返回值中的 token 用于请求结束时恢复。"""
+
+    timings = RequestTimings()
+    return timings, _timings_var.set(timings)
+
+
+def finish_request_timings(token: Token[RequestTimings | None]) -> None:
+    _timings_var.reset(token)
+
+
+def current_timings() -> RequestTimings | None:
+    return _timings_var.get()
+
+
+def mark_endpoint_done() -> None:
+    timings = _timings_var.get()
+    if timings is not None:
+        timings.endpoint_done = time.perf_counter()
+
+
+def record_timing(kind: str, seconds: float) -> None:
+    """把一次调用的耗时累加到当前请求，请求之外调用时忽略。"""
+
+    timings = _timings_var.get()
+    if timings is not None:
+        timings.add(kind, seconds)
+
+
+@contextmanager
+def timed(kind: str) -> Iterator[None]:
+    """统计 with 块的耗时，异常同样计入。"""
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(kind, time.perf_counter() - started)
+
+
+__all__ = (
+    "DB",
+    "REDIS",
+    "SERIALIZE",
+    "RequestTimings",
+    "current_timings",
+    "finish_request_timings",
+    "mark_endpoint_done",
+    "record_timing",
+    "start_request_timings",
+    "timed",
+)
@@ -0,0 +1,9 @@
+"""HTTP 中间件与路由扩展对外导出。"""
+
+from .request_context import RequestContextMiddleware
+from .routing import TimedAPIRoute
+
+__all__ = (
+    "RequestContextMiddleware",
+    "TimedAPIRoute",
+)
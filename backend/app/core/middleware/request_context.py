@@ -0,0 +1,94 @@
+"""请求生命周期中间件：请求 ID、日志上下文、访问日志与 Server-Timing。
+
+直接实现 ASGI 接口而不是继承 ``BaseHTTPMiddleware``，后者会为每个请求额外创建
+任务和内存流来转发响应体，高并发下开销明显，且会打断流式响应。
+"""
+
+from __future__ import annotations
+
+import re
+import time
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config.settings import settings
+from app.core.logging import logger, reset_log_context, set_log_context
+from app.core.logging.timing import SERIALIZE, finish_request_timings, start_request_timings
+
+# 只接受常见追踪 ID 字符，防止客户端借请求头向日志注入换行或超长内容
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:\-]{1,128}$")
+
+
+class RequestContextMiddleware:
+    """为每个 HTTP 请求生成或透传请求 ID，并在结束时输出一条访问日志。
+
+    * 请求头带有合法的请求 ID 时沿用，否则生成新的 ID，并写回响应头；
+    * 请求 ID 写入日志上下文，请求内的所有日志都带有 ``req=...``；
+    * 响应头发出时附加 Server-Timing，拆分 DB、Redis 与序列化耗时。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        header_name: str | None = None,
+        server_timing: bool | None = None,
+    ) -> None:
+        self.app = app
+        self.header_name = (header_name or settings.request_id_header).lower()
+        self._header_key = self.header_name.encode("latin-1")
+        self.server_timing = settings.server_timing_enabled if server_timing is None else server_timing
+
+    def _request_id(self, scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == self._header_key:
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_PATTERN.match(candidate):
+                    return candidate
+                break
+        return uuid.uuid4().hex
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._request_id(scope)
+        set_log_context(request_id=request_id)
+        timings, token = start_request_timings()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(self.header_name, request_id)
+                if self.server_timing:
+                    if timings.endpoint_done is not None:
+                        timings.add(SERIALIZE, time.perf_counter() - timings.endpoint_done)
+                    headers.append("server-timing", timings.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = round(timings.elapsed() * 1000, 2)
+            log = logger.bind(
+                component="http",
+                method=scope["method"],
+                path=scope["path"],
+                status=status_code,
+                duration_ms=duration_ms,
+            )
+            if status_code >= 500:
+                log.error("请求完成")
+            else:
+                log.info("请求完成")
+            finish_request_timings(token)
+            reset_log_context()
+
+
+__all__ = ("RequestContextMiddleware",)
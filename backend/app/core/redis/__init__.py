@@ -1,7 +1,20 @@
 """Redis 工具模块对外导出。"""
 
+from .async_client import (
+    AsyncRedisClient,
+    AsyncRedisLike,
+    close_async_redis,
+    get_async_redis,
+    get_async_redis_bytes,
+    get_async_redis_pubsub,
+    get_auto_pipeline,
+    ping_async_redis,
+)
+from .auto_pipeline import AutoPipeline
+from .breaker import CircuitBreaker, CircuitOpenError, get_redis_breaker
 from .client import (
     RedisBackendError,
+    RedisCircuitOpenError,
     RedisClient,
     RedisOperationError,
     RedisUnavailableError,
@@ -10,14 +23,41 @@ from .client import (
     ping_redis,
 )
 from .keys import RedisKeys
+from .scripts import (
+    LuaScript,
+    RefreshRotationStatus,
+    ScriptRegistry,
+    VerificationResult,
+    VerificationStatus,
+    scripts,
+)
 
 __all__ = (
+    "AsyncRedisClient",
+    "AsyncRedisLike",
+    "AutoPipeline",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "LuaScript",
     "RedisBackendError",
+    "RedisCircuitOpenError",
     "RedisClient",
     "RedisKeys",
     "RedisOperationError",
     "RedisUnavailableError",
+    "RefreshRotationStatus",
+    "ScriptRegistry",
+    "VerificationResult",
+    "VerificationStatus",
+    "close_async_redis",
     "close_redis",
+    "get_async_redis",
+    "get_async_redis_bytes",
+    "get_async_redis_pubsub",
+    "get_auto_pipeline",
     "get_redis",
+    "get_redis_breaker",
+    "ping_async_redis",
     "ping_redis",
+    "scripts",
 )
@@ -0,0 +1,411 @@
+"""基于 redis.asyncio 的异步 Redis 客户端，供 async 视图使用，避免阻塞事件循环。"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncGenerator, Callable, Iterable, Sequence
+from contextlib import asynccontextmanager
+from typing import Any, cast
+
+from redis.asyncio import BlockingConnectionPool, ConnectionPool
+from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.cluster import RedisCluster as AsyncRedisCluster
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import NoScriptError
+from redis.exceptions import RedisError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.core.config.settings import settings
+from app.core.logging import logger
+from app.core.logging.timing import REDIS, record_timing, timed
+from app.core.redis.auto_pipeline import AutoPipeline
+from app.core.redis.breaker import CircuitBreaker, get_redis_breaker
+from app.core.redis.client import RedisOperationError, RedisUnavailableError, guard_call
+from app.core.redis.keys import RedisKeys
+from app.core.redis.scripts import (
+    ROTATE_REFRESH_SESSION,
+    VERIFY_CODE,
+    LuaScript,
+    RefreshRotationStatus,
+    VerificationResult,
+    parse_rotation_result,
+    parse_verification_result,
+)
+
+AsyncRedisLike = AsyncRedis | AsyncRedisCluster
+
+_pool: ConnectionPool | None = None
+_client: AsyncRedisLike | None = None
+_bytes_pool: ConnectionPool | None = None
+_bytes_client: AsyncRedisLike | None = None
+_pubsub_client: AsyncRedis | None = None
+_auto_pipeline: AutoPipeline | None = None
+
+# 不能放进 Pipeline 的方法，开启自动 Pipeline 时也直接执行
+_DIRECT_METHODS = frozenset({"mget_nonatomic"})
+
+
+def _create_pool(*, decode_responses: bool = True) -> ConnectionPool:
+    """按配置初始化进程共享的异步连接池。
+
+    连接数达到上限时排队等待空闲连接，而不是立即抛出 MaxConnectionsError。
+    """
+
+    return BlockingConnectionPool.from_url(
+        str(settings.redis_url),
+        decode_responses=decode_responses,
+        health_check_interval=30,
+        socket_connect_timeout=2,
+        socket_timeout=2,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout_seconds,
+    )
+
+
+def _create_client(*, decode_responses: bool) -> tuple[AsyncRedisLike, ConnectionPool | None]:
+    """单机模式返回共享连接池的客户端；集群模式下每个节点各自维护连接池。"""
+
+    if settings.redis_cluster:
+        cluster = AsyncRedisCluster.from_url(
+            str(settings.redis_url),
+            decode_responses=decode_responses,
+            health_check_interval=30,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+            max_connections=settings.redis_max_connections,
+        )
+        return cluster, None
+    pool = _create_pool(decode_responses=decode_responses)
+    return AsyncRedis(connection_pool=pool), pool
+
+
+def get_async_redis() -> AsyncRedisLike:
+    """返回进程级异步 Redis 客户端，所有调用共享同一个连接池。"""
+
+    global _pool, _client
+    if _client is None:
+        _client, _pool = _create_client(decode_responses=True)
+    return _client
+
+
+def get_async_redis_bytes() -> AsyncRedisLike:
+    """返回不做响应解码的异步客户端，供缓存等存放二进制值的场景使用。"""
+
+    global _bytes_pool, _bytes_client
+    if _bytes_client is None:
+        _bytes_client, _bytes_pool = _create_client(decode_responses=False)
+    return _bytes_client
+
+
+def get_async_redis_pubsub() -> AsyncRedis:
+    """返回用于 Pub/Sub 订阅的客户端。
+
+    集群中 PUBLISH 会广播到所有节点，订阅任一节点即可，因此集群模式下直接连接
+    redis_url 指向的节点。
+    """
+
+    global _pubsub_client
+    if not settings.redis_cluster:
+        return cast(AsyncRedis, get_async_redis())
+    if _pubsub_client is None:
+        _pubsub_client = AsyncRedis.from_url(
+            str(settings.redis_url),
+            decode_responses=True,
+            health_check_interval=30,
+            socket_connect_timeout=2,
+        )
+    return _pubsub_client
+
+
+def get_auto_pipeline() -> AutoPipeline:
+    """返回进程级自动 Pipeline，所有开启自动合并的客户端共享同一个批次。"""
+
+    global _auto_pipeline
+    if _auto_pipeline is None:
+        _auto_pipeline = AutoPipeline(
+            get_async_redis(),
+            window=settings.redis_auto_pipeline_window_ms / 1000,
+            max_batch=settings.redis_auto_pipeline_max_batch,
+        )
+    return _auto_pipeline
+
+
+async def close_async_redis() -> None:
+    """关闭异步客户端并断开连接池中的所有连接。"""
+
+    global _pool, _client, _bytes_pool, _bytes_client, _pubsub_client, _auto_pipeline
+    _auto_pipeline = None
+    for client, pool in ((_client, _pool), (_bytes_client, _bytes_pool), (_pubsub_client, None)):
+        if client is None:
+            continue
+        try:
+            await client.aclose()
+            if pool is not None:
+                await pool.disconnect()
+        except RedisError as exc:
+            logger.bind(component="redis").warning("关闭异步 Redis 连接失败", error=str(exc))
+    _client = _pool = None
+    _bytes_client = _bytes_pool = None
+    _pubsub_client = None
+
+
+async def ping_async_redis() -> bool:
+    """异步执行 PING 检查 Redis 是否存活。"""
+
+    try:
+        return bool(await get_async_redis().ping())
+    except RedisConnectionError:
+        logger.bind(component="redis").error("Redis 连接不可用")
+        return False
+    except RedisError as exc:
+        logger.bind(component="redis").warning("Redis PING 失败", error=str(exc))
+        return False
+
+
+class AsyncRedisClient:
+    """redis.asyncio 的轻量包装，异常映射、日志与熔断与 RedisClient 保持一致。"""
+
+    def __init__(
+        self,
+        client: AsyncRedisLike | None = None,
+        *,
+        auto_pipeline: bool | None = None,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        self._client = client or get_async_redis()
+        self._breaker = breaker or get_redis_breaker()
+        if auto_pipeline is None:
+            auto_pipeline = settings.redis_auto_pipeline
+        if not auto_pipeline:
+            self._auto_pipeline = None
+        elif client is None:
+            self._auto_pipeline = get_auto_pipeline()
+        else:
+            self._auto_pipeline = AutoPipeline(
+                client,
+                window=settings.redis_auto_pipeline_window_ms / 1000,
+                max_batch=settings.redis_auto_pipeline_max_batch,
+            )
+
+    @property
+    def auto_pipeline(self) -> AutoPipeline | None:
+        """当前客户端使用的自动 Pipeline，未开启时为 None。"""
+
+        return self._auto_pipeline
+
+    async def _execute(
+        self,
+        command: str,
+        method: str | Callable[..., Any],
+        *args: Any,
+        log_fields: dict[str, Any],
+        **kwargs: Any,
+    ) -> Any:
+        """执行单条命令并把 redis-py 异常映射为 RedisBackendError 子类。
+
+        method 为客户端方法名，或需要多次调用客户端的协程函数（例如带重试的 EVALSHA）。
+        开启自动 Pipeline 时，按方法名发出的命令交给批处理器与其他并发命令合并发送。
+        """
+
+        guard_call(self._breaker)
+        started = time.perf_counter()
+        try:
+            if callable(method):
+                result = await method(*args, **kwargs)
+            elif self._auto_pipeline is not None and method not in _DIRECT_METHODS:
+                result = await self._auto_pipeline.execute(method, *args, **kwargs)
+            else:
+                result = await getattr(self._client, method)(*args, **kwargs)
+        except (RedisConnectionError, RedisTimeoutError) as exc:
+            self._breaker.record_failure()
+            logger.bind(
+                component="redis", throttle_key=f"redis:{command}:unavailable", **log_fields
+            ).error(f"Redis {command} 连接失败")
+            raise RedisUnavailableError("Redis connection failed") from exc
+        except RedisError as exc:
+            self._breaker.record_success()
+            logger.bind(component="redis", throttle_key=f"redis:{command}:error", **log_fields).error(
+                f"Redis {command} 异常", error=str(exc)
+            )
+            raise RedisOperationError(f"Redis {command.lower()} operation failed") from exc
+        finally:
+            record_timing(REDIS, time.perf_counter() - started)
+        self._breaker.record_success()
+        return result
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        *,
+        expire_seconds: int | None = None,
+        only_if_absent: bool = False,
+        only_if_exists: bool = False,
+    ) -> bool:
+        """写入 Key，支持 TTL 及 NX/XX 语义。"""
+
+        result = await self._execute(
+            "SET",
+            "set",
+            name=key,
+            value=value,
+            ex=expire_seconds,
+            nx=only_if_absent,
+            xx=only_if_exists,
+            log_fields={"key": key},
+        )
+        return bool(result)
+
+    async def get(self, key: str) -> Any:
+        """读取指定 Key 的值。"""
+
+        return await self._execute("GET", "get", key, log_fields={"key": key})
+
+    async def delete(self, *keys: str) -> int:
+        """删除一个或多个 Key。"""
+
+        return int(await self._execute("DELETE", "delete", *keys, log_fields={"keys": list(keys)}))
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        """自增指定 Key 的数值，默认增量为 1。"""
+
+        return int(await self._execute("INCR", "incr", key, amount, log_fields={"key": key}))
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        """为 Key 设置过期时间。"""
+
+        return bool(await self._execute("EXPIRE", "expire", key, seconds, log_fields={"key": key}))
+
+    async def ttl(self, key: str) -> int:
+        """获取 Key 剩余 TTL（秒）。"""
+
+        return int(await self._execute("TTL", "ttl", key, log_fields={"key": key}))
+
+    async def mget(self, keys: Iterable[str]) -> list[Any]:
+        """批量读取多个 Key。
+
+        集群模式下按槽位拆分成多条 MGET，并行发往各节点后按原顺序合并；
+        希望单次往返时应让 Key 共享同一个 hash tag。
+        """
+
+        keys_list = list(keys)
+        method = "mget_nonatomic" if isinstance(self._client, AsyncRedisCluster) else "mget"
+        return list(await self._execute("MGET", method, keys_list, log_fields={"keys": keys_list}))
+
+    async def hset(self, key: str, mapping: dict[str, Any]) -> int:
+        """批量写入 Hash 字段。"""
+
+        return int(await self._execute("HSET", "hset", key, mapping=mapping, log_fields={"key": key}))
+
+    async def hgetall(self, key: str) -> dict[str, Any]:
+        """读取 Hash 的全部字段，Key 不存在时返回空字典。"""
+
+        return dict(await self._execute("HGETALL", "hgetall", key, log_fields={"key": key}))
+
+    async def zadd(self, key: str, mapping: dict[str, float], *, only_if_absent: bool = False) -> int:
+        """写入有序集合成员与分值。"""
+
+        return int(
+            await self._execute("ZADD", "zadd", key, mapping, nx=only_if_absent, log_fields={"key": key})
+        )
+
+    async def zrange(self, key: str, start: int, end: int) -> list[Any]:
+        """按分值从低到高读取有序集合的一段成员。"""
+
+        return list(await self._execute("ZRANGE", "zrange", key, start, end, log_fields={"key": key}))
+
+    async def zrem(self, key: str, *members: str) -> int:
+        """移除有序集合成员，返回实际移除的数量。"""
+
+        return int(await self._execute("ZREM", "zrem", key, *members, log_fields={"key": key}))
+
+    async def zcard(self, key: str) -> int:
+        """有序集合成员数。"""
+
+        return int(await self._execute("ZCARD", "zcard", key, log_fields={"key": key}))
+
+    async def publish(self, channel: str, message: str) -> int:
+        """向频道发布消息，返回收到消息的订阅者数量。"""
+
+        return int(await self._execute("PUBLISH", "publish", channel, message, log_fields={"channel": channel}))
+
+    async def run_script(self, script: LuaScript, keys: Sequence[str], args: Sequence[Any]) -> Any:
+        """按 SHA 执行已注册的 Lua 脚本，服务端缺少脚本时自动 SCRIPT LOAD 后重试一次。"""
+
+        keys_list = list(keys)
+
+        async def _call() -> Any:
+            try:
+                return await self._client.evalsha(script.sha, len(keys_list), *keys_list, *args)
+            except NoScriptError:
+                await self._client.script_load(script.source)
+                return await self._client.evalsha(script.sha, len(keys_list), *keys_list, *args)
+
+        return await self._execute("EVALSHA", _call, log_fields={"script": script.name, "keys": keys_list})
+
+    async def check_verification_code(
+        self, scene: str, target: str, code: str, *, max_attempts: int
+    ) -> VerificationResult:
+        """原子地校验验证码：通过即删除，失败累计次数，超限后作废验证码。"""
+
+        raw = await self.run_script(
+            VERIFY_CODE,
+            [RedisKeys.verification_code(scene, target), RedisKeys.verification_attempts(scene, target)],
+            [code, max_attempts],
+        )
+        return parse_verification_result(raw)
+
+    async def rotate_refresh_session(
+        self, user_id: str, old_jti: str, new_jti: str, *, expire_seconds: int
+    ) -> RefreshRotationStatus:
+        """原子地轮换 Refresh 会话；旧 jti 不符时视为重放并吊销会话。"""
+
+        raw = await self.run_script(
+            ROTATE_REFRESH_SESSION,
+            [RedisKeys.refresh_session(user_id)],
+            [old_jti, new_jti, expire_seconds],
+        )
+        return parse_rotation_result(raw)
+
+    @asynccontextmanager
+    async def pipeline(self, *, transaction: bool = True) -> AsyncGenerator[Any, None]:
+        """提供 Pipeline 上下文管理器，离开时自动执行。"""
+
+        guard_call(self._breaker)
+        pipe = self._client.pipeline(transaction=transaction)
+        try:
+            yield pipe
+            with timed(REDIS):
+                await pipe.execute()
+        except (RedisConnectionError, RedisTimeoutError) as exc:
+            await pipe.reset()
+            self._breaker.record_failure()
+            logger.bind(component="redis", throttle_key="redis:PIPELINE:unavailable").error(
+                "Redis PIPELINE 连接失败"
+            )
+            raise RedisUnavailableError("Redis connection failed") from exc
+        except RedisError as exc:
+            await pipe.reset()
+            self._breaker.record_success()
+            logger.bind(component="redis", throttle_key="redis:PIPELINE:error").error(
+                "Redis PIPELINE 异常", error=str(exc)
+            )
+            raise RedisOperationError("Redis pipeline execution failed") from exc
+        except BaseException:
+            # 调用方在 async with 块内抛出的非 Redis 异常或任务被取消：丢弃已排队的命令，归还半开探测名额
+            await pipe.reset()
+            self._breaker.release_probe()
+            raise
+        self._breaker.record_success()
+
+
+__all__ = (
+    "AsyncRedisClient",
+    "AsyncRedisLike",
+    "close_async_redis",
+    "get_async_redis",
+    "get_async_redis_bytes",
+    "get_async_redis_pubsub",
+    "get_auto_pipeline",
+    "ping_async_redis",
+)
@@ -0,0 +1,105 @@
+"""自动 Pipeline：把同一时间窗口内并发发出的命令合并成一次网络往返。"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.cluster import RedisCluster as AsyncRedisCluster
+
+from app.core.logging import logger
+
+
+class AutoPipeline:
+    """收集并发命令并批量执行，每个调用方各自拿到自己的结果或异常。
+
+    window 为 0 时在当前事件循环轮次结束后（call_soon）立即发送，只合并同一轮
+    中发出的命令，几乎不增加延迟；大于 0 时额外等待 window 秒以合并更多命令。
+    批次达到 max_batch 时不再等待窗口，立刻发送。集群模式下由集群 Pipeline
+    按节点拆分并行发送。
+    """
+
+    def __init__(self, client: AsyncRedis | AsyncRedisCluster, *, window: float = 0.0, max_batch: int = 512) -> None:
+        self._client = client
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: list[tuple[str, tuple[Any, ...], dict[str, Any], asyncio.Future[Any]]] = []
+        self._handle: asyncio.Handle | asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task[None]] = set()
+        self.batches = 0
+        self.commands = 0
+
+    async def execute(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """登记一条命令并等待其所在批次返回。"""
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Any] = loop.create_future()
+        self._pending.append((method, args, kwargs, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._handle is None:
+            if self.window > 0:
+                self._handle = loop.call_later(self.window, self._flush_now)
+            else:
+                self._handle = loop.call_soon(self._flush_now)
+        return await future
+
+    def _flush_now(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: list[tuple[str, tuple[Any, ...], dict[str, Any], asyncio.Future[Any]]]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        queued = []
+        for method, args, kwargs, future in batch:
+            try:
+                getattr(pipe, method)(*args, **kwargs)
+            except Exception as exc:  # noqa: BLE001 - 参数错误（如空 mapping）只影响该条命令
+                if not future.done():
+                    future.set_exception(exc)
+                continue
+            queued.append(future)
+        if not queued:
+            return
+        self.batches += 1
+        self.commands += len(queued)
+        try:
+            # 单条命令出错时以异常对象返回，只影响对应的调用方
+            results = await pipe.execute(raise_on_error=False)
+        except Exception as exc:  # noqa: BLE001 - 整批失败时逐个转交给调用方处理
+            logger.bind(component="redis", batch_size=len(queued)).debug("自动 Pipeline 整批执行失败")
+            for future in queued:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            await pipe.reset()
+
+        for future, result in zip(queued, results):
+            if future.done():
+                # 调用方已取消等待
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict[str, float]:
+        """累计批次数与平均批大小。"""
+
+        return {
+            "batches": self.batches,
+            "commands": self.commands,
+            "avg_batch_size": self.commands / self.batches if self.batches else 0.0,
+        }
+
+
+__all__ = ("AutoPipeline",)
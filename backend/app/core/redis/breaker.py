@@ -0,0 +1,154 @@
+"""Redis 熔断器：连续连接失败后短路调用，避免每个请求都等满 socket 超时。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from app.core.config.settings import settings
+from app.core.logging import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断器处于打开状态，调用被直接拒绝。"""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"circuit {name} is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """经典三态熔断器，线程安全，同步与异步客户端可共用同一个实例。
+
+    * closed：正常放行，连续失败达到 failure_threshold 次后打开；
+    * open：直接拒绝，经过 recovery_timeout 秒后进入半开；
+    * half_open：只放行 half_open_max_calls 个探测调用，成功则关闭，失败则重新打开。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int,
+        recovery_timeout: float,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_started = 0.0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """调用前检查状态，不允许放行时抛出 CircuitOpenError。"""
+
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            now = time.monotonic()
+            if self._state == OPEN:
+                elapsed = now - self._opened_at
+                if elapsed < self.recovery_timeout:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, self.recovery_timeout - elapsed)
+                self._state = HALF_OPEN
+                self._probes = 0
+            if self._probes >= self.half_open_max_calls:
+                # 探测调用迟迟没有回报结果（例如被取消）时，允许新的探测
+                if now - self._probe_started < self.recovery_timeout:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, self.recovery_timeout)
+                self._probes = 0
+            self._probes += 1
+            self._probe_started = now
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.bind(component="redis", circuit=self.name).info("Redis 熔断器探测成功，恢复放行")
+            self._state = CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self.opened += 1
+                logger.bind(component="redis", circuit=self.name).error(
+                    f"Redis 熔断器打开，{self.recovery_timeout:g} 秒后半开探测"
+                )
+
+    def release_probe(self) -> None:
+        """调用在得到 Redis 结果之前因其他原因中止（调用方异常、取消），归还探测名额，不计成败。"""
+
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def stats(self) -> dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+_breaker: CircuitBreaker | None = None
+
+
+def get_redis_breaker() -> CircuitBreaker:
+    """返回进程级 Redis 熔断器，同步与异步客户端共享同一份状态。"""
+
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            "redis",
+            failure_threshold=settings.redis_breaker_failure_threshold,
+            recovery_timeout=settings.redis_breaker_recovery_seconds,
+            half_open_max_calls=settings.redis_breaker_half_open_max_calls,
+        )
+    return _breaker
+
+
+__all__ = (
+    "CLOSED",
+    "HALF_OPEN",
+    "OPEN",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "get_redis_breaker",
+)
@@ -2,17 +2,33 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+import time
+from collections.abc import Callable, Iterable, Sequence
 from contextlib import contextmanager
 from typing import Any, Generator
 
 import redis
 from redis import Redis
+from redis.cluster import RedisCluster
 from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import NoScriptError
 from redis.exceptions import RedisError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
 from app.core.config.settings import settings
 from app.core.logging import logger
+from app.core.logging.timing import REDIS, record_timing, timed
+from app.core.redis.breaker import CircuitBreaker, CircuitOpenError, get_redis_breaker
+from app.core.redis.keys import RedisKeys
+from app.core.redis.scripts import (
+    ROTATE_REFRESH_SESSION,
+    VERIFY_CODE,
+    LuaScript,
+    RefreshRotationStatus,
+    VerificationResult,
+    parse_rotation_result,
+    parse_verification_result,
+)
 
 
 class RedisBackendError(RuntimeError):
@@ -23,16 +39,32 @@ class RedisUnavailableError(RedisBackendError):
     """Redis 服务不可达时抛出的异常。"""
 
 
+class RedisCircuitOpenError(RedisUnavailableError):
+    """熔断器打开期间直接拒绝调用时抛出，不会真正访问 Redis。"""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Redis circuit breaker is open")
+        self.retry_after = retry_after
+
+
 class RedisOperationError(RedisBackendError):
     """Redis 操作执行失败时抛出的异常。"""
 
 
-_client: Redis | None = None
+_client: Redis | RedisCluster | None = None
 
 
-def _create_client() -> Redis:
-    """按配置初始化 Redis 客户端。"""
+def _create_client() -> Redis | RedisCluster:
+    """按配置初始化 Redis 客户端；集群模式下 redis_url 指向任一集群节点即可。"""
 
+    if settings.redis_cluster:
+        return RedisCluster.from_url(
+            str(settings.redis_url),
+            decode_responses=True,
+            health_check_interval=30,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
     return redis.Redis.from_url(
         settings.redis_url,
         decode_responses=True,
@@ -42,7 +74,7 @@ def _create_client() -> Redis:
     )
 
 
-def get_redis() -> Redis:
+def get_redis() -> Redis | RedisCluster:
     """返回进程级 Redis 客户端，按需懒加载。"""
 
     global _client
@@ -80,10 +112,53 @@ def ping_redis() -> bool:
 
 
 class RedisClient:
-    """对 redis-py 的轻量包装，统一异常与日志。"""
+    """对 redis-py 的轻量包装，统一异常与日志。
 
-    def __init__(self, client: Redis | None = None) -> None:
+    所有命令经过进程级熔断器：Redis 连续连接失败后直接抛出 RedisCircuitOpenError，
+    不再等待 socket 超时。
+    """
+
+    def __init__(
+        self, client: Redis | RedisCluster | None = None, *, breaker: CircuitBreaker | None = None
+    ) -> None:
         self._client = client or get_redis()
+        self._breaker = breaker or get_redis_breaker()
+
+    def _execute(
+        self,
+        command: str,
+        method: str | Callable[..., Any],
+        *args: Any,
+        log_fields: dict[str, Any],
+        **kwargs: Any,
+    ) -> Any:
+        """执行单条命令并把 redis-py 异常映射为 RedisBackendError 子类。
+
+        method 为客户端方法名，或需要多次调用客户端的可调用对象（例如带重试的 EVALSHA）。
+        """
+
+        guard_call(self._breaker)
+        func = method if callable(method) else getattr(self._client, method)
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except (RedisConnectionError, RedisTimeoutError) as exc:
+            self._breaker.record_failure()
+            logger.bind(
+                component="redis", throttle_key=f"redis:{command}:unavailable", **log_fields
+            ).error(f"Redis {command} 连接失败")
+            raise RedisUnavailableError("Redis connection failed") from exc
+        except RedisError as exc:
+            # 命令级错误说明服务端可达，不计入熔断
+            self._breaker.record_success()
+            logger.bind(component="redis", throttle_key=f"redis:{command}:error", **log_fields).error(
+                f"Redis {command} 异常", error=str(exc)
+            )
+            raise RedisOperationError(f"Redis {command.lower()} operation failed") from exc
+        finally:
+            record_timing(REDIS, time.perf_counter() - started)
+        self._breaker.record_success()
+        return result
 
     def set(
         self,
@@ -96,120 +171,141 @@ class RedisClient:
     ) -> bool:
         """写入 Key，支持 TTL 及 NX/XX 语义。"""
 
-        try:
-            return bool(
-                self._client.set(
-                    name=key,
-                    value=value,
-                    ex=expire_seconds,
-                    nx=only_if_absent,
-                    xx=only_if_exists,
-                )
-            )
-        except RedisConnectionError as exc:
-            logger.bind(component="redis", key=key).error("Redis SET 连接失败")
-            raise RedisUnavailableError("Redis connection failed") from exc
-        except RedisError as exc:
-            logger.bind(component="redis", key=key).error("Redis SET 异常", error=str(exc))
-            raise RedisOperationError("Redis set operation failed") from exc
+        result = self._execute(
+            "SET",
+            "set",
+            name=key,
+            value=value,
+            ex=expire_seconds,
+            nx=only_if_absent,
+            xx=only_if_exists,
+            log_fields={"key": key},
+        )
+        return bool(result)
 
     def get(self, key: str) -> Any:
         """读取指定 Key 的值。"""
 
-        try:
-            return self._client.get(name=key)
-        except RedisConnectionError as exc:
-            logger.bind(component="redis", key=key).error("Redis GET 连接失败")
-            raise RedisUnavailableError("Redis connection failed") from exc
-        except RedisError as exc:
-            logger.bind(component="redis", key=key).error("Redis GET 异常", error=str(exc))
-            raise RedisOperationError("Redis get operation failed") from exc
+        return self._execute("GET", "get", name=key, log_fields={"key": key})
 
     def delete(self, *keys: str) -> int:
         """删除一个或多个 Key。"""
 
-        try:
-            return int(self._client.delete(*keys))
-        except RedisConnectionError as exc:
-            logger.bind(component="redis", keys=list(keys)).error("Redis DELETE 连接失败")
-            raise RedisUnavailableError("Redis connection failed") from exc
-        except RedisError as exc:
-            logger.bind(component="redis", keys=list(keys)).error("Redis DELETE 异常", error=str(exc))
-            raise RedisOperationError("Redis delete operation failed") from exc
+        return int(self._execute("DELETE", "delete", *keys, log_fields={"keys": list(keys)}))
 
     def incr(self, key: str, amount: int = 1) -> int:
         """自增指定 Key 的数值，默认增量为 1。"""
 
-        try:
-            return int(self._client.incr(name=key, amount=amount))
-        except RedisConnectionError as exc:
-            logger.bind(component="redis", key=key).error("Redis INCR 连接失败")
-            raise RedisUnavailableError("Redis connection failed") from exc
-        except RedisError as exc:
-            logger.bind(component="redis", key=key).error("Redis INCR 异常", error=str(exc))
-            raise RedisOperationError("Redis increment operation failed") from exc
+        return int(self._execute("INCR", "incr", name=key, amount=amount, log_fields={"key": key}))
 
     def expire(self, key: str, seconds: int) -> bool:
         """为 Key 设置过期时间。"""
 
-        try:
-            return bool(self._client.expire(name=key, time=seconds))
-        except RedisConnectionError as exc:
-            logger.bind(component="redis", key=key).error("Redis EXPIRE 连接失败")
-            raise RedisUnavailableError("Redis connection failed") from exc
-        except RedisError as exc:
-            logger.bind(component="redis", key=key).error("Redis EXPIRE 异常", error=str(exc))
-            raise RedisOperationError("Redis expire operation failed") from exc
+        return bool(self._execute("EXPIRE", "expire", name=key, time=seconds, log_fields={"key": key}))
 
     def ttl(self, key: str) -> int:
         """获取 Key 剩余 TTL（秒）。"""
 
-        try:
-            return int(self._client.ttl(name=key))
-        except RedisConnectionError as exc:
-            logger.bind(component="redis", key=key).error("Redis TTL 连接失败")
-            raise RedisUnavailableError("Redis connection failed") from exc
-        except RedisError as exc:
-            logger.bind(component="redis", key=key).error("Redis TTL 异常", error=str(exc))
-            raise RedisOperationError("Redis ttl operation failed") from exc
+        return int(self._execute("TTL", "ttl", name=key, log_fields={"key": key}))
 
     @contextmanager
     def pipeline(self, *, transaction: bool = True) -> Generator[Any, None, None]:
         """提供 Pipeline 上下文管理器，离开时自动执行。"""
 
+        guard_call(self._breaker)
         pipe = self._client.pipeline(transaction=transaction)
         try:
             yield pipe
-            pipe.execute()
-        except RedisConnectionError as exc:
+            with timed(REDIS):
+                pipe.execute()
+        except (RedisConnectionError, RedisTimeoutError) as exc:
             pipe.reset()
-            logger.bind(component="redis").error("Redis PIPELINE 连接失败")
+            self._breaker.record_failure()
+            logger.bind(component="redis", throttle_key="redis:PIPELINE:unavailable").error(
+                "Redis PIPELINE 连接失败"
+            )
             raise RedisUnavailableError("Redis connection failed") from exc
         except RedisError as exc:
             pipe.reset()
-            logger.bind(component="redis").error("Redis PIPELINE 异常", error=str(exc))
+            self._breaker.record_success()
+            logger.bind(component="redis", throttle_key="redis:PIPELINE:error").error(
+                "Redis PIPELINE 异常", error=str(exc)
+            )
             raise RedisOperationError("Redis pipeline execution failed") from exc
+        except BaseException:
+            # 调用方在 with 块内抛出的非 Redis 异常：丢弃已排队的命令，归还半开探测名额
+            pipe.reset()
+            self._breaker.release_probe()
+            raise
+        self._breaker.record_success()
 
     def mget(self, keys: Iterable[str]) -> list[Any]:
-        """批量读取多个 Key。"""
+        """批量读取多个 Key。
+
+        集群模式下按槽位拆分成多条 MGET，经集群 Pipeline 并行发往各节点后按原顺序合并；
+        希望单次往返时应让 Key 共享同一个 hash tag。
+        """
 
         keys_list = list(keys)
-        try:
-            return list(self._client.mget(keys_list))
-        except RedisConnectionError as exc:
-            logger.bind(component="redis", keys=keys_list).error("Redis MGET 连接失败")
-            raise RedisUnavailableError("Redis connection failed") from exc
-        except RedisError as exc:
-            logger.bind(component="redis", keys=keys_list).error("Redis MGET 异常", error=str(exc))
-            raise RedisOperationError("Redis mget operation failed") from exc
+        method = "mget_nonatomic" if isinstance(self._client, RedisCluster) else "mget"
+        return list(self._execute("MGET", method, keys_list, log_fields={"keys": keys_list}))
+
+    def run_script(self, script: LuaScript, keys: Sequence[str], args: Sequence[Any]) -> Any:
+        """按 SHA 执行已注册的 Lua 脚本，服务端缺少脚本时自动 SCRIPT LOAD 后重试一次。"""
+
+        keys_list = list(keys)
+
+        def _call() -> Any:
+            try:
+                return self._client.evalsha(script.sha, len(keys_list), *keys_list, *args)
+            except NoScriptError:
+                self._client.script_load(script.source)
+                return self._client.evalsha(script.sha, len(keys_list), *keys_list, *args)
+
+        return self._execute("EVALSHA", _call, log_fields={"script": script.name, "keys": keys_list})
+
+    def check_verification_code(
+        self, scene: str, target: str, code: str, *, max_attempts: int
+    ) -> VerificationResult:
+        """原子地校验验证码：通过即删除，失败累计次数，超限后作废验证码。"""
+
+        raw = self.run_script(
+            VERIFY_CODE,
+            [RedisKeys.verification_code(scene, target), RedisKeys.verification_attempts(scene, target)],
+            [code, max_attempts],
+        )
+        return parse_verification_result(raw)
+
+    def rotate_refresh_session(
+        self, user_id: str, old_jti: str, new_jti: str, *, expire_seconds: int
+    ) -> RefreshRotationStatus:
+        """原子地轮换 Refresh 会话；旧 jti 不符时视为重放并吊销会话。"""
+
+        raw = self.run_script(
+            ROTATE_REFRESH_SESSION,
+            [RedisKeys.refresh_session(user_id)],
+            [old_jti, new_jti, expire_seconds],
+        )
+        return parse_rotation_result(raw)
+
+
+def guard_call(breaker: CircuitBreaker) -> None:
+    """熔断器打开时把拒绝转换为 RedisCircuitOpenError。"""
+
+    try:
+        breaker.before_call()
+    except CircuitOpenError as exc:
+        raise RedisCircuitOpenError(exc.retry_after) from exc
 
 
 __all__ = (
     "RedisBackendError",
+    "RedisCircuitOpenError",
     "RedisClient",
     "RedisOperationError",
     "RedisUnavailableError",
     "close_redis",
     "get_redis",
+    "guard_call",
     "ping_redis",
 )
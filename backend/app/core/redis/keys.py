@@ -1,7 +1,14 @@
-"""统一 Redis Key 规范，避免跨服务命名分散。"""
+"""统一 Redis Key 规范，避免跨服务命名分散。
+
+Key 中的 ``{...}`` 是 Redis Cluster 的 hash tag：只有花括号内的部分参与槽位计算。
+同一用户、同一项目或同一验证码目标的 Key 使用相同的 tag，保证 MGET、Pipeline、
+Lua 脚本等多 Key 操作落在同一个槽位上；单机模式下 tag 只是普通字符。
+"""
 
 from __future__ import annotations
 
+from typing import Any
+
 
 class RedisKeys:
     """封装平台内常用的 Redis Key 生成逻辑。"""
@@ -11,6 +18,25 @@ class RedisKeys:
     _VERIFY_NS = "verify"
     _RATE_LIMIT_NS = "ratelimit"
     _CACHE_NS = "cache"
+    _SYNTHESIS_NS = "synthesis"
+
+    @staticmethod
+    def user_tag(user_id: Any) -> str:
+        """用户维度的 hash tag。"""
+
+        return f"{{u:{user_id}}}"
+
+    @staticmethod
+    def project_tag(project_id: Any) -> str:
+        """项目维度的 hash tag。"""
+
+        return f"{{p:{project_id}}}"
+
+    @staticmethod
+    def project_scoped(project_id: Any, *parts: Any) -> str:
+        """以项目 hash tag 开头的业务 Key 片段，用作缓存等 Key 的 key 部分。"""
+
+        return ":".join([RedisKeys.project_tag(project_id), *(str(part) for part in parts)])
 
     @staticmethod
     def jwt_blacklist(jti: str) -> str:
@@ -22,35 +48,102 @@ class RedisKeys:
     def refresh_session(user_id: str) -> str:
         """记录用户最新 Refresh Token 的 Key。"""
 
-        return f"{RedisKeys._AUTH_NS}:refresh_session:{user_id}"
+        return f"{RedisKeys._AUTH_NS}:refresh_session:{RedisKeys.user_tag(user_id)}"
+
+    @staticmethod
+    def _verification_tag(scene: str, target: str) -> str:
+        normalized_scene = scene.lower().replace(" ", "_")
+        return f"{{{normalized_scene}:{target}}}"
 
     @staticmethod
     def verification_code(scene: str, target: str) -> str:
         """验证码正文存储的 Key（支持邮箱、短信等场景）。"""
 
-        normalized_scene = scene.lower().replace(" ", "_")
-        return f"{RedisKeys._VERIFY_NS}:{normalized_scene}:{target}"
+        return f"{RedisKeys._VERIFY_NS}:{RedisKeys._verification_tag(scene, target)}"
 
     @staticmethod
     def verification_attempts(scene: str, target: str) -> str:
-        """验证码错误次数计数的 Key。"""
+        """验证码错误次数计数的 Key，与验证码正文位于同一槽位。"""
 
-        normalized_scene = scene.lower().replace(" ", "_")
-        return f"{RedisKeys._VERIFY_NS}:{normalized_scene}:{target}:attempts"
+        return f"{RedisKeys._VERIFY_NS}:{RedisKeys._verification_tag(scene, target)}:attempts"
 
     @staticmethod
     def rate_limit(scope: str, identifier: str, window: str) -> str:
-        """限流计数的 Key，window 需指定如 '1m'、'1h'。"""
+        """限流计数的 Key，window 需指定如 '1m'、'1h'；同一标识的各窗口位于同一槽位。"""
 
         normalized_scope = scope.lower().replace(" ", "_")
-        return f"{RedisKeys._RATE_LIMIT_NS}:{normalized_scope}:{identifier}:{window}"
+        return f"{RedisKeys._RATE_LIMIT_NS}:{normalized_scope}:{{{identifier}}}:{window}"
 
     @staticmethod
     def cache(namespace: str, key: str) -> str:
-        """通用缓存数据的 Key，需显式传入业务命名空间。"""
+        """通用缓存数据的 Key，需显式传入业务命名空间。
+
+        key 中带有 hash tag（例如 ``project_scoped`` 的结果）时，缓存按该 tag 分布。
+        """
 
         normalized_namespace = namespace.lower().replace(" ", "_")
         return f"{RedisKeys._CACHE_NS}:{normalized_namespace}:{key}"
 
+    @staticmethod
+    def cache_lock(namespace: str, key: str) -> str:
+        """缓存回源的单飞锁 Key，与数据 Key 一一对应。"""
+
+        return f"{RedisKeys.cache(namespace, key)}:lock"
+
+    @staticmethod
+    def synthesis_result(fingerprint: str) -> str:
+        """合成结果缓存条目（Hash），按内容指纹寻址。"""
+
+        return f"{RedisKeys._SYNTHESIS_NS}:result:{{{fingerprint}}}"
+
+    @staticmethod
+    def synthesis_inflight(fingerprint: str) -> str:
+        """同一指纹正在合成的占位锁，与缓存条目位于同一槽位。"""
+
+        return f"{RedisKeys._SYNTHESIS_NS}:result:{{{fingerprint}}}:inflight"
+
+    @staticmethod
+    def synthesis_result_lru() -> str:
+        """合成结果缓存的访问时间索引（ZSET），用于 LRU 淘汰。"""
+
+        return f"{RedisKeys._SYNTHESIS_NS}:result_lru"
+
+    @staticmethod
+    def synthesis_result_bytes() -> str:
+        """合成结果缓存的总字节数计数。"""
+
+        return f"{RedisKeys._SYNTHESIS_NS}:result_bytes"
+
+    @staticmethod
+    def synthesis_dedup(project_id: Any, shot_id: Any, fingerprint: str) -> str:
+        """同一镜头、同一内容的创建去重标记，值为已有任务的 ID 与创建时间。"""
+
+        shot = shot_id if shot_id is not None else "-"
+        return f"{RedisKeys._SYNTHESIS_NS}:dedup:{RedisKeys.project_scoped(project_id, shot, fingerprint)}"
+
+    @staticmethod
+    def synthesis_status_counters(project_id: Any) -> str:
+        """项目内合成任务按状态的计数（Hash），同时保存项目合计与各镜头计数。"""
+
+        return f"{RedisKeys._SYNTHESIS_NS}:status:{RedisKeys.project_tag(project_id)}"
+
+    @staticmethod
+    def synthesis_progress_channel(project_id: Any) -> str:
+        """项目内合成任务进度广播的 Pub/Sub 频道。"""
+
+        return f"{RedisKeys._SYNTHESIS_NS}:progress:{project_id}"
+
+    @staticmethod
+    def synthesis_progress_pattern() -> str:
+        """匹配所有项目进度频道的订阅模式，API 进程只需一条订阅连接。"""
+
+        return f"{RedisKeys._SYNTHESIS_NS}:progress:*"
+
+    @staticmethod
+    def cache_invalidation_channel() -> str:
+        """进程内缓存失效广播的 Pub/Sub 频道。"""
+
+        return f"{RedisKeys._CACHE_NS}:invalidate"
+
 
 __all__ = ("RedisKeys",)
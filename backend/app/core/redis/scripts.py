@@ -0,0 +1,179 @@
+"""Lua 脚本注册表：多步 Redis 操作在服务端原子执行，一次往返完成。
+
+脚本按名称注册，SHA1 在本地计算；调用时先 EVALSHA，服务端返回 NOSCRIPT
+（首次调用、Redis 重启或主从切换后脚本缓存丢失）时执行一次 SCRIPT LOAD 再重试。
+脚本访问的所有 Key 都通过 KEYS 传入，并共享同一个 hash tag，集群模式下同样可用。
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from enum import Enum
+
+
+@dataclass(frozen=True)
+class LuaScript:
+    """一个具名 Lua 脚本。"""
+
+    name: str
+    source: str
+
+    @property
+    def sha(self) -> str:
+        return hashlib.sha1(self.source.encode()).hexdigest()
+
+
+class ScriptRegistry:
+    """进程内的脚本注册表，名称唯一。"""
+
+    def __init__(self) -> None:
+        self._scripts: dict[str, LuaScript] = {}
+
+    def register(self, name: str, source: str) -> LuaScript:
+        existing = self._scripts.get(name)
+        if existing is not None and existing.source != source:
+            raise ValueError(f"Lua script {name} already registered with different source")
+        script = LuaScript(name=name, source=source)
+        self._scripts[name] = script
+        return script
+
+    def get(self, name: str) -> LuaScript:
+        try:
+            return self._scripts[name]
+        except KeyError as exc:
+            raise KeyError(f"Lua script {name} is not registered") from exc
+
+    def __iter__(self):
+        return iter(self._scripts.values())
+
+
+scripts = ScriptRegistry()
+
+
+class VerificationStatus(str, Enum):
+    """验证码校验结果。"""
+
+    OK = "ok"
+    MISMATCH = "mismatch"
+    EXPIRED = "expired"
+    LOCKED = "locked"
+
+
+@dataclass(frozen=True)
+class VerificationResult:
+    status: VerificationStatus
+    attempts: int
+
+    @property
+    def ok(self) -> bool:
+        return self.status is VerificationStatus.OK
+
+
+class RefreshRotationStatus(str, Enum):
+    """Refresh Token 轮换结果。"""
+
+    ROTATED = "rotated"
+    # 提交的旧 jti 与当前会话不符，视为令牌被重放，会话已被吊销
+    REUSED = "reused"
+    MISSING = "missing"
+
+
+# KEYS[1] 验证码正文，KEYS[2] 错误次数；ARGV[1] 提交的验证码，ARGV[2] 最大错误次数
+# 返回 {状态, 已错误次数}：1=通过，0=不匹配，-1=不存在或已过期，-2=错误次数超限
+VERIFY_CODE = scripts.register(
+    "verify_code",
+    """
+local code = redis.call('GET', KEYS[1])
+if not code then
+    return {-1, 0}
+end
+local max_attempts = tonumber(ARGV[2])
+local attempts = tonumber(redis.call('GET', KEYS[2]) or '0')
+if attempts >= max_attempts then
+    return {-2, attempts}
+end
+if code == ARGV[1] then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    return {1, attempts}
+end
+attempts = redis.call('INCR', KEYS[2])
+if attempts == 1 then
+    -- 错误次数与验证码同时过期
+    local ttl = redis.call('PTTL', KEYS[1])
+    if ttl > 0 then
+        redis.call('PEXPIRE', KEYS[2], ttl)
+    end
+end
+if attempts >= max_attempts then
+    redis.call('DEL', KEYS[1])
+    return {-2, attempts}
+end
+return {0, attempts}
+""",
+)
+
+# KEYS[1] 用户的 Refresh 会话；ARGV[1] 旧 jti，ARGV[2] 新 jti，ARGV[3] 新会话 TTL（秒）
+# 返回 1=已轮换，0=旧 jti 不符（会话已吊销），-1=会话不存在
+ROTATE_REFRESH_SESSION = scripts.register(
+    "rotate_refresh_session",
+    """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return -1
+end
+if current ~= ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', tonumber(ARGV[3]))
+return 1
+""",
+)
+
+# KEYS[1] 锁；ARGV[1] 持有者令牌。仅当锁仍归自己持有时才删除，避免误删他人在锁过期后重新获取的锁
+RELEASE_LOCK = scripts.register(
+    "release_lock",
+    """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+""",
+)
+
+_VERIFICATION_CODES = {
+    1: VerificationStatus.OK,
+    0: VerificationStatus.MISMATCH,
+    -1: VerificationStatus.EXPIRED,
+    -2: VerificationStatus.LOCKED,
+}
+_ROTATION_CODES = {
+    1: RefreshRotationStatus.ROTATED,
+    0: RefreshRotationStatus.REUSED,
+    -1: RefreshRotationStatus.MISSING,
+}
+
+
+def parse_verification_result(raw: list[int]) -> VerificationResult:
+    status, attempts = raw
+    return VerificationResult(status=_VERIFICATION_CODES[int(status)], attempts=int(attempts))
+
+
+def parse_rotation_result(raw: int) -> RefreshRotationStatus:
+    return _ROTATION_CODES[int(raw)]
+
+
+__all__ = (
+    "RELEASE_LOCK",
+    "ROTATE_REFRESH_SESSION",
+    "VERIFY_CODE",
+    "LuaScript",
+    "RefreshRotationStatus",
+    "ScriptRegistry",
+    "VerificationResult",
+    "VerificationStatus",
+    "parse_rotation_result",
+    "parse_verification_result",
+    "scripts",
+)
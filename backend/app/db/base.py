@@ -1,5 +1,7 @@
 """SQLAlchemy Base 定义与通用字段混入。"""
 
+from datetime import datetime, timezone
+
 from sqlalchemy import Column, DateTime, func
 from sqlalchemy.orm import declarative_base
 
@@ -25,6 +27,28 @@ class TimestampMixin:
     )
 
 
+def utcnow() -> datetime:
+    """返回带时区的当前 UTC 时间。"""
+
+    return datetime.now(timezone.utc)
+
+
+class PartitionedTimestampMixin(TimestampMixin):
+    """按 created_at 月度范围分区的表使用的时间戳混入。
+
+    分区表的主键必须包含分区键，因此 created_at 会进入主键，
+    需要在应用侧赋值，保证 ORM 插入后即可确定完整主键。
+    """
+
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=utcnow,
+        server_default=func.now(),
+        comment="记录创建时间，同时作为分区键",
+    )
+
+
 # 导入所有模型，以便 Alembic 自动识别 metadata
 try:  # pragma: no cover - 防止循环导入报错
     from app import models  # noqa: F401
@@ -0,0 +1,361 @@
+"""大表在线变更的 Alembic 辅助函数。
+
+- ``create_index_concurrently``：在事务外 ``CREATE INDEX CONCURRENTLY``，不阻塞写入；
+- ``backfill_column``：按批回填列值，每批独立提交并可限速；
+- ``add_check_constraint_not_valid`` / ``add_foreign_key_not_valid`` + ``validate_constraint``：
+  先以 NOT VALID 快速加约束，再在单独事务中校验存量数据；
+- dry-run：``alembic -x dry_run=true upgrade head`` 只记录将执行的 SQL，
+  不做任何修改，并输出每条语句的锁级别与基于表大小的耗时估算。
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from alembic import context, op
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.logging import logger
+
+# 估算 DDL/回填耗时使用的顺序扫描吞吐（字节/秒），仅作数量级参考
+_ASSUMED_SCAN_BYTES_PER_SECOND = 100 * 1024 * 1024
+
+
+def is_dry_run() -> bool:
+    """是否以 ``-x dry_run=true`` 运行迁移。"""
+
+    value = context.get_x_argument(as_dictionary=True).get("dry_run", "")
+    return value.lower() in {"1", "true", "yes", "on"}
+
+
+def set_lock_timeout(milliseconds: int | None = None) -> None:
+    """限制当前事务的锁等待时间，拿不到锁时快速失败而不是让写入排队。"""
+
+    milliseconds = settings.migration_lock_timeout_ms if milliseconds is None else milliseconds
+    op.execute(f"SET LOCAL lock_timeout = '{int(milliseconds)}ms'")
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[Any],
+    *,
+    unique: bool = False,
+    **kw: Any,
+) -> None:
+    """在事务外并发建索引；若存在上次中断遗留的无效索引会先删除。
+
+    注意：分区父表不支持 CONCURRENTLY，需要对每个分区单独建索引后再 ATTACH。
+    """
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        invalid = bind.execute(
+            text(
+                """
+                SELECT 1 FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = :name AND NOT i.indisvalid
+                """
+            ),
+            {"name": index_name},
+        ).first()
+        if invalid is not None:
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+        op.create_index(
+            index_name,
+            table_name,
+            list(columns),
+            unique=unique,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+            **kw,
+        )
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """在事务外并发删除索引。"""
+
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def create_partitioned_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str],
+    *,
+    where: str | None = None,
+) -> None:
+    """为分区表在线建索引。
+
+    先 ``CREATE INDEX ON ONLY`` 在父表上建一个空的无效索引，再对每个分区
+    ``CONCURRENTLY`` 建索引并 ATTACH；全部挂上后父表索引自动变为有效。
+    之后新建的分区会自动继承该索引。
+    """
+
+    column_sql = ", ".join(columns)
+    predicate = f" WHERE {where}" if where else ""
+    bind = op.get_bind()
+    partitions = [
+        row[0]
+        for row in bind.execute(
+            text(
+                """
+                SELECT child.relname
+                FROM pg_inherits i
+                JOIN pg_class parent ON parent.oid = i.inhparent
+                JOIN pg_class child ON child.oid = i.inhrelid
+                WHERE parent.relname = :table
+                ORDER BY child.relname
+                """
+            ),
+            {"table": table_name},
+        )
+    ]
+    op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON ONLY {table_name} ({column_sql}){predicate}")
+    for partition in partitions:
+        child_index = f"{partition}_{index_name.removeprefix('ix_' + table_name + '_')}_idx"
+        create_index_concurrently(child_index, partition, [text(column_sql)], postgresql_where=text(where) if where else None)
+        op.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {child_index}")
+
+
+def backfill_column(
+    table_name: str,
+    column: str,
+    value_sql: str,
+    *,
+    where: str | None = None,
+    key: str = "id",
+    batch_size: int | None = None,
+    pause_seconds: float | None = None,
+) -> int:
+    """分批回填列值，返回更新的行数。
+
+    每批在 autocommit 下单独提交，只短暂持有本批行锁；``FOR UPDATE SKIP LOCKED``
+    避免与业务写入互相等待，批间休眠用于限速、给复制与 autovacuum 留出余量。
+    """
+
+    batch_size = batch_size or settings.migration_backfill_batch_size
+    pause_seconds = settings.migration_backfill_pause_seconds if pause_seconds is None else pause_seconds
+    condition = where or f"{column} IS NULL"
+    statement = text(
+        f"""
+        UPDATE {table_name} SET {column} = {value_sql}
+        WHERE {key} IN (
+            SELECT {key} FROM {table_name}
+            WHERE {condition}
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        """
+    )
+
+    if is_dry_run():
+        # dry-run 下语句会被替换为空操作，执行一次即可记录到报告中
+        op.get_bind().execute(statement, {"batch_size": batch_size})
+        return 0
+
+    total = 0
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            updated = bind.execute(statement, {"batch_size": batch_size}).rowcount
+            if not updated:
+                break
+            total += updated
+            logger.bind(component="migration").info(f"回填 {table_name}.{column} 进行中，已更新 {total} 行")
+            if pause_seconds:
+                time.sleep(pause_seconds)
+    return total
+
+
+def add_check_constraint_not_valid(constraint_name: str, table_name: str, condition: str) -> None:
+    """以 NOT VALID 添加 CHECK 约束：只校验新写入，不扫描存量数据。"""
+
+    set_lock_timeout()
+    op.execute(f"ALTER TABLE {table_name} ADD CONSTRAINT {constraint_name} CHECK ({condition}) NOT VALID")
+
+
+def add_foreign_key_not_valid(
+    constraint_name: str,
+    source_table: str,
+    referent_table: str,
+    local_cols: Sequence[str],
+    remote_cols: Sequence[str],
+    *,
+    ondelete: str | None = None,
+) -> None:
+    """以 NOT VALID 添加外键，避免在加约束时全表扫描。"""
+
+    set_lock_timeout()
+    on_delete = f" ON DELETE {ondelete}" if ondelete else ""
+    op.execute(
+        f"ALTER TABLE {source_table} ADD CONSTRAINT {constraint_name} "
+        f"FOREIGN KEY ({', '.join(local_cols)}) REFERENCES {referent_table} ({', '.join(remote_cols)})"
+        f"{on_delete} NOT VALID"
+    )
+
+
+def validate_constraint(table_name: str, constraint_name: str) -> None:
+    """在单独事务中校验 NOT VALID 约束，仅持有 SHARE UPDATE EXCLUSIVE 锁，不阻塞读写。"""
+
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE {table_name} VALIDATE CONSTRAINT {constraint_name}")
+
+
+@dataclass
+class LockImpact:
+    """单条迁移语句的锁影响估算。"""
+
+    statement: str
+    table: str | None
+    lock_mode: str
+    blocks_writes: bool
+    blocks_reads: bool
+    rewrites_or_scans: bool
+    estimated_rows: int | None = None
+    estimated_bytes: int | None = None
+
+    @property
+    def estimated_seconds(self) -> float | None:
+        if not self.rewrites_or_scans or self.estimated_bytes is None:
+            return None
+        return self.estimated_bytes / _ASSUMED_SCAN_BYTES_PER_SECOND
+
+
+# (匹配规则, 锁级别, 阻塞写, 阻塞读, 是否扫描/重写整表)，按顺序匹配
+_LOCK_RULES: tuple[tuple[re.Pattern[str], str, bool, bool, bool], ...] = tuple(
+    (re.compile(pattern, re.IGNORECASE | re.DOTALL), *rest)
+    for pattern, *rest in (
+        (r"^\s*CREATE\s+(UNIQUE\s+)?INDEX\s+CONCURRENTLY", "SHARE UPDATE EXCLUSIVE", False, False, True),
+        (r"^\s*CREATE\s+(UNIQUE\s+)?INDEX", "SHARE", True, False, True),
+        (r"^\s*DROP\s+INDEX\s+CONCURRENTLY", "SHARE UPDATE EXCLUSIVE", False, False, False),
+        (r"^\s*ALTER\s+TABLE\s+.*\bVALIDATE\s+CONSTRAINT\b", "SHARE UPDATE EXCLUSIVE", False, False, True),
+        (r"^\s*ALTER\s+TABLE\s+.*\bFOREIGN\s+KEY\b.*\bNOT\s+VALID\b", "SHARE ROW EXCLUSIVE", True, False, False),
+        (r"^\s*ALTER\s+TABLE\s+.*\bFOREIGN\s+KEY\b", "SHARE ROW EXCLUSIVE", True, False, True),
+        (r"^\s*ALTER\s+TABLE\s+.*\bNOT\s+VALID\b", "ACCESS EXCLUSIVE", True, True, False),
+        (r"^\s*ALTER\s+TABLE\s+.*\b(ATTACH|DETACH)\s+PARTITION\b.*\bCONCURRENTLY\b", "SHARE UPDATE EXCLUSIVE", False, False, False),
+        (r"^\s*ALTER\s+TABLE\s+.*\bATTACH\s+PARTITION\b", "SHARE UPDATE EXCLUSIVE", False, False, True),
+        (r"^\s*ALTER\s+TABLE\s+.*\b(ALTER\s+COLUMN\s+\S+\s+(SET\s+DATA\s+)?TYPE|SET\s+NOT\s+NULL)\b", "ACCESS EXCLUSIVE", True, True, True),
+        (r"^\s*ALTER\s+TABLE\s+.*\bADD\s+CONSTRAINT\b", "ACCESS EXCLUSIVE", True, True, True),
+        (r"^\s*ALTER\s+TABLE", "ACCESS EXCLUSIVE", True, True, False),
+        (r"^\s*(DROP|TRUNCATE)\s+TABLE", "ACCESS EXCLUSIVE", True, True, False),
+        (r"^\s*DROP\s+INDEX", "ACCESS EXCLUSIVE", True, True, False),
+        (r"^\s*ALTER\s+INDEX\s+.*\bATTACH\s+PARTITION\b", "ACCESS EXCLUSIVE", True, True, False),
+        (r"^\s*(UPDATE|DELETE|INSERT)\b", "ROW EXCLUSIVE", False, False, True),
+        (r"^\s*CREATE\s+TABLE\b.*\bPARTITION\s+OF\b", "ACCESS EXCLUSIVE", True, True, False),
+    )
+)
+_TABLE_PATTERN = re.compile(
+    r"\b(?:ON|TABLE(?:\s+IF\s+EXISTS)?|UPDATE|FROM|INTO|PARTITION\s+OF)\s+(?:ONLY\s+)?\"?([\w.]+)\"?",
+    re.IGNORECASE,
+)
+# DROP INDEX / ALTER INDEX 语句里只有索引名，所属的表需要到 pg_index 中查
+_INDEX_PATTERN = re.compile(
+    r"^\s*(?:DROP|ALTER)\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?\"?([\w.]+)\"?", re.IGNORECASE
+)
+_READ_ONLY_PATTERN = re.compile(r"^\s*(SELECT|SHOW|SET|RESET|EXPLAIN)\b", re.IGNORECASE)
+
+
+def classify_statement(statement: str) -> LockImpact | None:
+    """根据语句形态推断锁级别，无法识别或不涉及已有表时返回 None。"""
+
+    for pattern, lock_mode, blocks_writes, blocks_reads, scans in _LOCK_RULES:
+        if pattern.search(statement):
+            match = _TABLE_PATTERN.search(statement)
+            return LockImpact(
+                statement=" ".join(statement.split()),
+                table=match.group(1) if match else None,
+                lock_mode=lock_mode,
+                blocks_writes=blocks_writes,
+                blocks_reads=blocks_reads,
+                rewrites_or_scans=scans,
+            )
+    return None
+
+
+class DryRunRecorder:
+    """dry-run 期间拦截写语句，只记录不执行，结束后按表大小估算锁影响。"""
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+        self.statements: list[str] = []
+
+    def install(self) -> None:
+        event.listen(self.connection, "before_cursor_execute", self._intercept, retval=True)
+
+    def _intercept(self, conn, cursor, statement, parameters, exec_context, executemany):  # noqa: ANN001
+        if _READ_ONLY_PATTERN.match(statement):
+            return statement, parameters
+        self.statements.append(statement)
+        # 用空操作替换原语句，保证迁移流程（包括版本号写入）照常走完但不落库
+        return "SELECT 1", [()] if executemany else ()
+
+    def report(self) -> list[LockImpact]:
+        event.remove(self.connection, "before_cursor_execute", self._intercept)
+        impacts: list[LockImpact] = []
+        for statement in self.statements:
+            impact = classify_statement(statement)
+            if impact is None or impact.table == "alembic_version":
+                continue
+            if impact.table is None:
+                impact.table = self._index_table(statement)
+            if impact.table is None:
+                # 对象在本次 dry-run 中才创建、或无法识别所属表：照常报告锁级别，不估算大小
+                impacts.append(impact)
+                continue
+            row = self.connection.execute(
+                text(
+                    """
+                    SELECT c.reltuples::bigint, pg_total_relation_size(c.oid)
+                    FROM pg_class c WHERE c.oid = to_regclass(:table)
+                    """
+                ),
+                {"table": impact.table},
+            ).first()
+            if row is not None:
+                impact.estimated_rows = max(int(row[0]), 0)
+                impact.estimated_bytes = int(row[1])
+            impacts.append(impact)
+
+        for impact in impacts:
+            seconds = impact.estimated_seconds
+            blocking = "阻塞读写" if impact.blocks_reads else "阻塞写入" if impact.blocks_writes else "不阻塞读写"
+            logger.bind(component="migration").warning(
+                f"dry-run {impact.table or '?'}: {impact.lock_mode}（{blocking}）"
+                f" rows≈{impact.estimated_rows} size={impact.estimated_bytes}B"
+                f" est={'-' if seconds is None else f'{seconds:.1f}s'}"
+                f" | {impact.statement[:160]}"
+            )
+        return impacts
+
+    def _index_table(self, statement: str) -> str | None:
+        match = _INDEX_PATTERN.match(statement)
+        if match is None:
+            return None
+        return self.connection.execute(
+            text("SELECT indrelid::regclass::text FROM pg_index WHERE indexrelid = to_regclass(:index)"),
+            {"index": match.group(1)},
+        ).scalar()
+
+
+__all__ = (
+    "DryRunRecorder",
+    "LockImpact",
+    "add_check_constraint_not_valid",
+    "add_foreign_key_not_valid",
+    "backfill_column",
+    "classify_statement",
+    "create_index_concurrently",
+    "drop_index_concurrently",
+    "is_dry_run",
+    "set_lock_timeout",
+    "validate_constraint",
+)
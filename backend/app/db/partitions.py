@@ -0,0 +1,173 @@
+"""按月范围分区表的维护：预建未来分区、摘除并归档过期分区。"""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import pool, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.db.base import utcnow
+
+# 以 created_at 做月度 RANGE 分区的表
+PARTITIONED_TABLES: tuple[str, ...] = ("synthesis_tasks", "export_records")
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(value: datetime) -> datetime:
+    """返回 value 所在月份的 UTC 月初。"""
+
+    value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """在月初时间上前后平移若干个月。"""
+
+    index = value.year * 12 + (value.month - 1) + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    """分区子表命名，如 synthesis_tasks_p2025_11。"""
+
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def recent_window_start(months: int | None = None, *, now: datetime | None = None) -> datetime:
+    """热路径查询的 created_at 下界，保证查询只裁剪到最近几个分区。"""
+
+    months = settings.partition_hot_window_months if months is None else months
+    return add_months(month_start(now or utcnow()), -(months - 1))
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> dict[datetime, str]:
+    """列出父表当前挂载的月度分区，返回 {月初: 子表名}。"""
+
+    result = await conn.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            WHERE parent.relname = :table
+            """
+        ),
+        {"table": table},
+    )
+    partitions: dict[datetime, str] = {}
+    for (name,) in result:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            year, month = int(match.group(1)), int(match.group(2))
+            partitions[datetime(year, month, 1, tzinfo=timezone.utc)] = name
+    return partitions
+
+
+async def ensure_future_partitions(
+    conn: AsyncConnection,
+    table: str,
+    *,
+    months_ahead: int | None = None,
+    now: datetime | None = None,
+) -> list[str]:
+    """确保当前月及未来 months_ahead 个月的分区存在，返回新建的分区名。
+
+    先建独立表再 ATTACH，ATTACH 只需 SHARE UPDATE EXCLUSIVE 锁，不阻塞父表读写。
+    """
+
+    months_ahead = settings.partition_months_ahead if months_ahead is None else months_ahead
+    existing = await list_partitions(conn, table)
+    current = month_start(now or utcnow())
+
+    created: list[str] = []
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        if start in existing:
+            continue
+        end = add_months(start, 1)
+        name = partition_name(table, start)
+        await conn.execute(
+            text(f"CREATE TABLE IF NOT EXISTS {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        )
+        await conn.execute(
+            text(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+async def archive_old_partitions(
+    conn: AsyncConnection,
+    table: str,
+    *,
+    retention_months: int | None = None,
+    archive_schema: str | None = None,
+    now: datetime | None = None,
+) -> list[str]:
+    """摘除超过保留期的分区并移动到归档 schema，返回被归档的分区名。
+
+    使用 DETACH PARTITION CONCURRENTLY，要求连接处于 AUTOCOMMIT 模式。
+    """
+
+    retention_months = settings.partition_retention_months if retention_months is None else retention_months
+    archive_schema = archive_schema or settings.partition_archive_schema
+    cutoff = add_months(month_start(now or utcnow()), -retention_months)
+
+    archived: list[str] = []
+    partitions = await list_partitions(conn, table)
+    for start, name in sorted(partitions.items()):
+        if start >= cutoff:
+            continue
+        await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY"))
+        await conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+        archived.append(name)
+    return archived
+
+
+async def run_partition_maintenance(engine: AsyncEngine | None = None) -> dict[str, dict[str, list[str]]]:
+    """对所有分区表执行一次预建与归档，供定时任务调用。"""
+
+    owns_engine = engine is None
+    if engine is None:
+        engine = create_async_engine(settings.database_url, poolclass=pool.NullPool)
+
+    report: dict[str, dict[str, list[str]]] = {}
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            # 拿不到锁时尽快放弃，避免 DDL 排队阻塞业务写入
+            await conn.execute(text(f"SET lock_timeout = '{settings.partition_lock_timeout_ms}ms'"))
+            for table in PARTITIONED_TABLES:
+                created = await ensure_future_partitions(conn, table)
+                archived = await archive_old_partitions(conn, table)
+                report[table] = {"created": created, "archived": archived}
+                logger.bind(component="partitions", table=table).info(
+                    "分区维护完成", created=created, archived=archived
+                )
+    finally:
+        if owns_engine:
+            await engine.dispose()
+    return report
+
+
+__all__ = (
+    "PARTITIONED_TABLES",
+    "add_months",
+    "archive_old_partitions",
+    "ensure_future_partitions",
+    "list_partitions",
+    "month_start",
+    "partition_name",
+    "recent_window_start",
+    "run_partition_maintenance",
+)
@@ -1,9 +1,13 @@
 """数据库会话与引擎配置。"""
+import time
 from collections.abc import AsyncGenerator
+from typing import Any
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.core.logging.timing import DB, record_timing
 
 engine = create_async_engine(
     settings.database_url,
@@ -13,6 +17,19 @@ engine = create_async_engine(
     future=True,
 )
 
+
+# 同一连接上的语句串行执行，记录最近一次开始时间即可
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn: Any, *_: Any) -> None:
+    conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn: Any, *_: Any) -> None:
+    # 计入当前请求的 DB 耗时，供 Server-Timing 响应头使用
+    record_timing(DB, time.perf_counter() - conn.info["query_started"])
+
+
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 
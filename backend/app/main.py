@@ -1,10 +1,14 @@
 """FastAPI 应用入口，聚合 API 及健康检查。"""
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.api_error import ApiError
 from app.api.v1.routes import router as api_router
+from app.core.cache import close_cache, get_cache
 from app.core.config import get_settings
 from app.core.exceptions import (
     api_error_handler,
@@ -13,18 +17,39 @@ from app.core.exceptions import (
     request_validation_error_handler,
     service_error_handler,
 )
-from app.core.logging import configure_logging
-from app.core.redis import RedisBackendError
+from app.core.logging import configure_logging, flush_logging, logger
+from app.core.middleware import RequestContextMiddleware
+from app.core.redis import RedisBackendError, close_async_redis, close_redis, get_async_redis, ping_async_redis
 from app.services.exceptions import ServiceError
+from app.synthesis.progress import close_progress_hub
 
 settings = get_settings()
 configure_logging()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """应用生命周期：启动时建立异步 Redis 连接池与缓存失效订阅，退出时依次释放。"""
+
+    get_async_redis()
+    if not await ping_async_redis():
+        logger.bind(component="redis").warning("启动时 Redis 不可用，将在首次调用时重试")
+    await get_cache().start()
+    try:
+        yield
+    finally:
+        await close_cache()
+        await close_progress_hub()
+        await close_async_redis()
+        close_redis()
+        await flush_logging()
+
+
 def create_app() -> FastAPI:
     """创建并配置 FastAPI 应用实例。"""
     app = FastAPI(
         title=settings.app_name,
         debug=settings.debug,
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -33,7 +58,10 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[settings.request_id_header, "Server-Timing"],
     )
+    # 最后添加的中间件位于最外层，访问日志与耗时覆盖 CORS 等其余中间件
+    app.add_middleware(RequestContextMiddleware)
 
     app.include_router(api_router, prefix=settings.api_prefix)
 
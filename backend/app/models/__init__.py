@@ -5,7 +5,7 @@ from .export_record import ExportFormat, ExportRecord, ExportStatus
 from .project import Project, ProjectStatus
 from .script import Script, ScriptLanguage
 from .shot import Shot, ShotStatus
-from .synthesis_task import SynthesisTask, TaskStatus
+from .synthesis_task import SynthesisActiveTask, SynthesisTask, TaskPriority, TaskStatus
 from .user import User
 
 __all__ = (
@@ -21,7 +21,9 @@ __all__ = (
     "ScriptLanguage",
     "Shot",
     "ShotStatus",
+    "SynthesisActiveTask",
     "SynthesisTask",
+    "TaskPriority",
     "TaskStatus",
     "User",
 )
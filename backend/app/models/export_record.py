@@ -6,11 +6,11 @@ import enum
 import uuid
 from typing import Any
 
-from sqlalchemy import Enum, ForeignKey, String
+from sqlalchemy import Enum, ForeignKey, Index, PrimaryKeyConstraint, String
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.base import Base, TimestampMixin
+from app.db.base import Base, PartitionedTimestampMixin
 
 
 class ExportFormat(str, enum.Enum):
@@ -30,14 +30,20 @@ class ExportStatus(str, enum.Enum):
     FAILED = "failed"
 
 
-class ExportRecord(TimestampMixin, Base):
-    """记录用户触发导出的历史及产物。"""
+class ExportRecord(PartitionedTimestampMixin, Base):
+    """记录用户触发导出的历史及产物，按 created_at 月度分区。"""
 
     __tablename__ = "export_records"
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at", name="export_records_pkey"),
+        Index("ix_export_records_project_id_created_at", "project_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # 表主键为 (id, created_at)，ORM 仍按 id 定位实体
+    __mapper_args__ = {"primary_key": ["id"]}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
-        primary_key=True,
         default=uuid.uuid4,
         comment="导出记录 ID",
     )
@@ -45,7 +51,6 @@ class ExportRecord(TimestampMixin, Base):
         UUID(as_uuid=True),
         ForeignKey("projects.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
         comment="关联项目",
     )
     format: Mapped[ExportFormat] = mapped_column(
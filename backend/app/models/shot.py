@@ -6,13 +6,17 @@ import enum
 import uuid
 from typing import Any
 
-from sqlalchemy import Enum, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Enum, ForeignKey, Index, Integer, String, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, TimestampMixin
 
 
+# 高频过滤的元数据键，单独建立表达式索引
+SHOT_METADATA_INDEXED_KEYS = ("shot_size", "shot_type")
+
+
 class ShotStatus(str, enum.Enum):
     """镜头制作状态。"""
 
@@ -27,6 +31,16 @@ class Shot(TimestampMixin, Base):
     __tablename__ = "shots"
     __table_args__ = (
         UniqueConstraint("project_id", "sequence", name="uq_shot_project_sequence"),
+        Index(
+            "ix_shots_metadata",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+        ),
+        *(
+            Index(f"ix_shots_metadata_{key}", text(f"(metadata ->> '{key}')"))
+            for key in SHOT_METADATA_INDEXED_KEYS
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
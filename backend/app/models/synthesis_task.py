@@ -4,13 +4,14 @@ from __future__ import annotations
 
 import enum
 import uuid
+from datetime import datetime
 from typing import Any
 
-from sqlalchemy import Enum, ForeignKey, String
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Integer, PrimaryKeyConstraint, String, UniqueConstraint, func, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.base import Base, TimestampMixin
+from app.db.base import Base, PartitionedTimestampMixin, utcnow
 
 
 class TaskStatus(str, enum.Enum):
@@ -22,14 +23,47 @@ class TaskStatus(str, enum.Enum):
     FAILED = "failed"
 
 
-class SynthesisTask(TimestampMixin, Base):
-    """存储 TTS/多媒体生成的任务及结果路径。"""
+class TaskPriority(str, enum.Enum):
+    """调度优先级，声明顺序即数据库枚举的排序顺序（交互式优先）。"""
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
+class SynthesisTask(PartitionedTimestampMixin, Base):
+    """存储 TTS/多媒体生成的任务及结果路径，按 created_at 月度分区。"""
 
     __tablename__ = "synthesis_tasks"
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at", name="synthesis_tasks_pkey"),
+        Index("ix_synthesis_tasks_project_id_created_at", "project_id", "created_at"),
+        # 调度器只扫描排队中的任务
+        Index(
+            "ix_synthesis_tasks_pending",
+            "priority",
+            "created_at",
+            postgresql_where=text("status = 'QUEUED'"),
+        ),
+        # 死信队列只包含少量任务，部分索引只收录已隔离的行
+        Index(
+            "ix_synthesis_tasks_dead_letter",
+            "project_id",
+            "dead_lettered_at",
+            postgresql_where=text("dead_lettered_at IS NOT NULL"),
+        ),
+        Index(
+            "ix_synthesis_tasks_metadata",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # 表主键为 (id, created_at)，ORM 仍按 id 定位实体
+    __mapper_args__ = {"primary_key": ["id"]}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
-        primary_key=True,
         default=uuid.uuid4,
         comment="任务 ID",
     )
@@ -37,7 +71,6 @@ class SynthesisTask(TimestampMixin, Base):
         UUID(as_uuid=True),
         ForeignKey("projects.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
         comment="所属项目",
     )
     shot_id: Mapped[uuid.UUID | None] = mapped_column(
@@ -64,6 +97,35 @@ class SynthesisTask(TimestampMixin, Base):
         default=TaskStatus.QUEUED,
         comment="任务状态",
     )
+    priority: Mapped[TaskPriority] = mapped_column(
+        Enum(TaskPriority, name="synthesis_task_priority"),
+        nullable=False,
+        default=TaskPriority.BULK,
+        server_default=TaskPriority.BULK.name,
+        comment="调度优先级：交互式单条重生成 / 批量",
+    )
+    dispatched_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="投递到队列的时间，为空表示仍在等待调度",
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default="0",
+        comment="已认领执行的次数，包括中途退出的执行",
+    )
+    next_attempt_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="失败后下一次允许调度的时间（指数退避），为空表示可立即调度",
+    )
+    dead_lettered_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="用尽重试次数进入死信队列的时间",
+    )
     result_path: Mapped[str | None] = mapped_column(
         String(512),
         nullable=True,
@@ -86,3 +148,62 @@ class SynthesisTask(TimestampMixin, Base):
 
     def __repr__(self) -> str:  # pragma: no cover
         return f"SynthesisTask(id={self.id!s}, status={self.status})"
+
+
+class SynthesisActiveTask(Base):
+    """排队中与执行中的合成任务登记表，用于创建时去重。
+
+    分区表上的唯一索引必须包含分区键 created_at，无法跨分区约束"同一镜头、同一内容
+    只有一个活跃任务"，因此由这张不分区的小表承担唯一约束：任务创建时与任务行在同一
+    事务内插入，进入终态时与状态回写在同一事务内删除，表中只有活跃任务。
+    """
+
+    __tablename__ = "synthesis_active_tasks"
+    __table_args__ = (
+        # 未关联镜头的任务在项目内按内容去重，shot_id 为空也参与比较
+        UniqueConstraint(
+            "project_id",
+            "shot_id",
+            "payload_hash",
+            name="uq_synthesis_active_tasks_dedup",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    task_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        comment="活跃任务 ID",
+    )
+    task_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="任务创建时间，用于定位任务所在分区",
+    )
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("projects.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="所属项目",
+    )
+    shot_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("shots.id", ondelete="CASCADE"),
+        nullable=True,
+        comment="关联镜头",
+    )
+    payload_hash: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        comment="合成内容指纹（文本、音色、采样率、引擎参数）",
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=utcnow,
+        server_default=func.now(),
+        comment="登记时间",
+    )
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"SynthesisActiveTask(task_id={self.task_id!s})"
@@ -0,0 +1,41 @@
+"""素材资产 Schema 定义。"""
+
+from __future__ import annotations
+
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.models.asset import AssetStatus, AssetType
+from app.schemas.common import IDMixin, ORMBaseModel, TimestampMixin
+
+
+class AssetBase(BaseModel):
+    shot_id: Optional[UUID] = Field(None, description="关联镜头 ID，可选")
+    type: AssetType = Field(..., description="资产类型")
+    status: AssetStatus = Field(default=AssetStatus.DRAFT, description="状态")
+    storage_path: str = Field(..., min_length=1, max_length=512, description="素材存储路径")
+    format: Optional[str] = Field(None, max_length=32, description="编码/格式，如 mp4/wav/png")
+    duration_ms: Optional[int] = Field(None, ge=0, description="时长，毫秒")
+    resolution: Optional[str] = Field(None, max_length=32, description="分辨率，如 1920x1080")
+    sample_rate: Optional[int] = Field(None, ge=1, description="音频采样率")
+    metadata: Optional[dict] = Field(None, description="生成参数、字幕等附加数据")
+
+
+class AssetCreate(AssetBase):
+    pass
+
+
+class AssetRead(ORMBaseModel, IDMixin, TimestampMixin):
+    project_id: UUID
+    shot_id: Optional[UUID]
+    type: AssetType
+    status: AssetStatus
+    storage_path: str
+    format: Optional[str]
+    duration_ms: Optional[int]
+    resolution: Optional[str]
+    sample_rate: Optional[int]
+    # ORM 属性名为 extra_metadata，避免与 Base.metadata 冲突
+    metadata: Optional[dict] = Field(None, validation_alias="extra_metadata")
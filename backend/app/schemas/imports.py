@@ -0,0 +1,41 @@
+"""批量导入相关 Schema。"""
+
+from __future__ import annotations
+
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class ImportFormat(str, Enum):
+    """支持的导入文件格式。"""
+
+    CSV = "csv"
+    JSON = "json"
+    JSONL = "jsonl"
+
+
+class ImportKind(str, Enum):
+    """可导入的实体类型。"""
+
+    SHOTS = "shots"
+    ASSETS = "assets"
+
+
+class ImportRowError(BaseModel):
+    """单行导入失败的原因。"""
+
+    row: int = Field(description="源文件中的行号（CSV 含表头从 2 开始，JSON 从 1 开始）")
+    field: str | None = Field(None, description="出错字段，可为空")
+    message: str = Field(description="错误提示")
+
+
+class ImportReport(BaseModel):
+    """批量导入结果汇总。"""
+
+    kind: ImportKind = Field(description="导入的实体类型")
+    total_rows: int = Field(ge=0, description="读取到的数据行数")
+    imported: int = Field(ge=0, description="成功写入的行数")
+    failed: int = Field(ge=0, description="失败的行数")
+    errors: list[ImportRowError] = Field(default_factory=list, description="逐行错误，超过上限时截断")
+    errors_truncated: bool = Field(default=False, description="错误列表是否因超过上限被截断")
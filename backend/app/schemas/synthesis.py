@@ -0,0 +1,55 @@
+"""合成任务 Schema 定义。"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.models.synthesis_task import TaskPriority, TaskStatus
+from app.schemas.common import IDMixin, ORMBaseModel, TimestampMixin
+
+
+class SynthesisTaskCreate(BaseModel):
+    shot_id: Optional[UUID] = Field(None, description="关联镜头 ID，可选")
+    voice_preset_id: Optional[str] = Field(None, max_length=64, description="音色预设 ID")
+    text: str = Field(..., min_length=1, max_length=5000, description="待合成的文本")
+    sample_rate: Optional[int] = Field(None, ge=8000, le=48000, description="输出采样率，缺省使用服务端配置")
+    options: dict[str, Any] = Field(default_factory=dict, description="引擎参数，如语速、情绪")
+    metadata: Optional[dict] = Field(None, description="业务附加信息，可用于列表过滤")
+    priority: TaskPriority = Field(
+        TaskPriority.INTERACTIVE,
+        description="interactive：单条重生成，优先调度；bulk：批量生成，按项目公平轮转",
+    )
+
+
+class SynthesisTaskRead(ORMBaseModel, IDMixin, TimestampMixin):
+    project_id: UUID
+    shot_id: Optional[UUID]
+    voice_preset_id: Optional[str]
+    payload: dict[str, Any]
+    status: TaskStatus
+    priority: TaskPriority
+    attempts: int = Field(description="已执行次数，包括中途退出的执行")
+    next_attempt_at: Optional[datetime] = Field(None, description="失败后等待重试时，下一次允许调度的时间")
+    dead_lettered_at: Optional[datetime] = Field(None, description="进入死信队列的时间")
+    result_path: Optional[str]
+    error_message: Optional[str] = Field(None, description="最近一次失败的原因")
+    # ORM 属性名为 extra_metadata，避免与 Base.metadata 冲突
+    metadata: Optional[dict] = Field(None, validation_alias="extra_metadata")
+
+
+class SynthesisStatusCounts(BaseModel):
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+
+
+class SynthesisSummaryRead(BaseModel):
+    project_id: UUID
+    totals: SynthesisStatusCounts = Field(description="项目内最近分区任务按状态的合计")
+    shots: dict[UUID, SynthesisStatusCounts] = Field(description="各镜头按状态的计数，未关联镜头的任务只计入合计")
+    source: str = Field(description="counters：增量维护的计数；database：计数不可用时按数据库实时聚合")
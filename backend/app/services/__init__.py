@@ -1,7 +1,10 @@
 """业务服务导出。"""
 
+from .asset_service import AssetService
+from .import_service import BulkImportService
 from .project_service import ProjectService
 from .script_service import ScriptService
 from .shot_service import ShotService
+from .synthesis_service import SynthesisService
 
-__all__ = ("ProjectService", "ScriptService", "ShotService")
+__all__ = ("AssetService", "BulkImportService", "ProjectService", "ScriptService", "ShotService", "SynthesisService")
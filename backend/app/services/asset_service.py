@@ -0,0 +1,47 @@
+"""素材资产业务逻辑封装。"""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.asset import Asset
+from app.models.project import Project
+from app.services.exceptions import NotFoundError
+from app.utils.metadata_filter import metadata_filter_clauses
+
+
+class AssetService:
+    """素材查询服务。"""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def _ensure_project(self, project_id: UUID) -> Project:
+        project = await self.session.get(Project, project_id)
+        if project is None:
+            raise NotFoundError("项目不存在")
+        return project
+
+    async def list_assets(
+        self,
+        project_id: UUID,
+        *,
+        skip: int,
+        limit: int,
+        shot_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> Sequence[Asset]:
+        await self._ensure_project(project_id)
+        stmt = select(Asset).where(Asset.project_id == project_id)
+        if shot_id is not None:
+            stmt = stmt.where(Asset.shot_id == shot_id)
+        if metadata:
+            stmt = stmt.where(*metadata_filter_clauses(Asset.extra_metadata, metadata))
+        result = await self.session.execute(
+            stmt.order_by(Asset.created_at.desc()).offset(skip).limit(limit)
+        )
+        return result.scalars().all()
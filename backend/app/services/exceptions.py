@@ -65,3 +65,8 @@ class RateLimitExceededError(ServiceError):
     """触发限流保护。"""
     status_code = status.HTTP_429_TOO_MANY_REQUESTS
     default_code = "RATE_LIMIT_EXCEEDED"
+
+class ServiceUnavailableError(ServiceError):
+    """依赖服务（如任务队列）暂时不可用。"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_code = "SERVICE_UNAVAILABLE"
@@ -0,0 +1,451 @@
+"""镜头/素材批量导入：流式解析文件，COPY 到临时表后合并入正式表。"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import uuid
+from collections.abc import Callable, Iterator
+from pathlib import PurePath
+from typing import Any, BinaryIO
+from uuid import UUID
+
+from pydantic import BaseModel
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.project import Project
+from app.schemas.assets import AssetCreate
+from app.schemas.imports import ImportFormat, ImportKind, ImportReport, ImportRowError
+from app.schemas.shots import ShotCreate
+from app.services.exceptions import NotFoundError, ValidationError
+
+# (行号, 解析后的字段, 解析错误)
+ParsedRow = tuple[int, dict[str, Any] | None, str | None]
+
+
+def detect_format(filename: str | None) -> ImportFormat:
+    """根据文件扩展名推断导入格式。"""
+
+    suffix = PurePath(filename or "").suffix.lower().lstrip(".")
+    if suffix == "ndjson":
+        suffix = ImportFormat.JSONL.value
+    try:
+        return ImportFormat(suffix)
+    except ValueError as exc:
+        raise ValidationError("无法识别的导入文件格式，请使用 csv/json/jsonl") from exc
+
+
+def _iter_csv(stream: BinaryIO) -> Iterator[ParsedRow]:
+    wrapper = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(wrapper)
+    rows = iter(reader)
+    try:
+        while True:
+            # 解码在按块读取时发生，出错后无法定位到行并继续读取，按整份文件不合法处理
+            try:
+                raw = next(rows)
+            except StopIteration:
+                return
+            except UnicodeDecodeError as exc:
+                raise ValidationError("CSV 导入文件必须使用 UTF-8 编码") from exc
+            except csv.Error as exc:
+                raise ValidationError(f"CSV 第 {reader.line_num} 行格式不合法：{exc}") from exc
+            # CSV 中的空单元格视为未填写，交给 Schema 的默认值处理
+            row = {key.strip(): value.strip() for key, value in raw.items() if key and value not in (None, "")}
+            metadata = row.get("metadata")
+            if metadata is not None:
+                try:
+                    row["metadata"] = json.loads(metadata)
+                except json.JSONDecodeError:
+                    yield reader.line_num, None, "metadata 列不是合法的 JSON"
+                    continue
+            yield reader.line_num, row, None
+    finally:
+        # 避免包装器被回收时顺带关闭上传文件
+        wrapper.detach()
+
+
+def _iter_jsonl(stream: BinaryIO) -> Iterator[ParsedRow]:
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            yield line_no, None, "不是合法的 JSON 行"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "每行必须是 JSON 对象"
+            continue
+        yield line_no, row, None
+
+
+def _iter_json(stream: BinaryIO) -> Iterator[ParsedRow]:
+    # JSON 数组无法流式解析，超大文件建议使用 jsonl
+    try:
+        rows = json.load(stream)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise ValidationError("导入文件不是合法的 JSON") from exc
+    if not isinstance(rows, list):
+        raise ValidationError("JSON 导入文件的顶层必须是数组")
+    for index, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            yield index, None, "数组元素必须是 JSON 对象"
+            continue
+        yield index, row, None
+
+
+def iter_import_rows(stream: BinaryIO, fmt: ImportFormat) -> Iterator[ParsedRow]:
+    """按格式逐行读取导入文件，不在内存中保留整份数据（JSON 数组除外）。"""
+
+    if fmt is ImportFormat.CSV:
+        return _iter_csv(stream)
+    if fmt is ImportFormat.JSONL:
+        return _iter_jsonl(stream)
+    return _iter_json(stream)
+
+
+def _has_nul(value: Any) -> bool:
+    if isinstance(value, str):
+        return "\x00" in value
+    if isinstance(value, dict):
+        return any(_has_nul(key) or _has_nul(item) for key, item in value.items())
+    if isinstance(value, list):
+        return any(_has_nul(item) for item in value)
+    return False
+
+
+def _nul_field(item: BaseModel) -> str | None:
+    """返回含 NUL 字符的字段名；PostgreSQL 的 text 与 jsonb 都不接受 NUL，COPY 时会让整批失败。"""
+
+    for field, value in item.model_dump().items():
+        if _has_nul(value):
+            return field
+    return None
+
+
+def _json_or_none(value: dict | None) -> str | None:
+    return None if value is None else json.dumps(value, ensure_ascii=False)
+
+
+class _ImportSpec:
+    """描述一类实体的暂存表结构、行转换与合并 SQL。"""
+
+    def __init__(
+        self,
+        *,
+        schema: type[BaseModel],
+        staging_table: str,
+        staging_ddl: str,
+        columns: tuple[str, ...],
+        to_record: Callable[[Any], tuple],
+        orphan_check_sql: str,
+        orphan_column: str,
+        orphan_message: str,
+        unique_column: str,
+        duplicate_message: str,
+        merge_sql: str,
+        conflict_message: str,
+    ) -> None:
+        self.schema = schema
+        self.staging_table = staging_table
+        self.staging_ddl = staging_ddl
+        self.columns = columns
+        self.to_record = to_record
+        self.orphan_check_sql = orphan_check_sql
+        self.orphan_column = orphan_column
+        self.orphan_message = orphan_message
+        self.unique_column = unique_column
+        self.duplicate_message = duplicate_message
+        self.merge_sql = merge_sql
+        self.conflict_message = conflict_message
+
+
+_SHOT_SPEC = _ImportSpec(
+    schema=ShotCreate,
+    staging_table="shot_import_staging",
+    staging_ddl="""
+        CREATE TEMP TABLE shot_import_staging (
+            row_no integer NOT NULL,
+            id uuid NOT NULL,
+            script_id uuid,
+            sequence integer NOT NULL,
+            title text NOT NULL,
+            description text NOT NULL,
+            duration_seconds integer NOT NULL,
+            status text NOT NULL,
+            metadata jsonb
+        ) ON COMMIT DROP
+    """,
+    columns=(
+        "id",
+        "script_id",
+        "sequence",
+        "title",
+        "description",
+        "duration_seconds",
+        "status",
+        "metadata",
+    ),
+    to_record=lambda item: (
+        uuid.uuid4(),
+        item.script_id,
+        item.sequence,
+        item.title,
+        item.description,
+        item.duration_seconds,
+        # ORM 的 Enum 列按成员名落库
+        item.status.name,
+        _json_or_none(item.metadata),
+    ),
+    orphan_check_sql="""
+        DELETE FROM shot_import_staging s
+        WHERE s.script_id IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM scripts sc WHERE sc.id = s.script_id AND sc.project_id = :project_id
+          )
+        RETURNING s.row_no
+    """,
+    orphan_column="script_id",
+    orphan_message="脚本不存在或不属于该项目",
+    unique_column="sequence",
+    duplicate_message="镜头序号在导入文件中重复",
+    merge_sql="""
+        WITH inserted AS (
+            INSERT INTO shots (
+                id, project_id, script_id, sequence, title, description,
+                duration_seconds, status, metadata
+            )
+            SELECT
+                s.id, :project_id, s.script_id, s.sequence, s.title, s.description,
+                s.duration_seconds, s.status::shot_status, s.metadata
+            FROM shot_import_staging s
+            ORDER BY s.row_no
+            ON CONFLICT ON CONSTRAINT uq_shot_project_sequence DO NOTHING
+            RETURNING id
+        )
+        SELECT s.row_no
+        FROM shot_import_staging s
+        LEFT JOIN inserted i ON i.id = s.id
+        WHERE i.id IS NULL
+    """,
+    conflict_message="镜头序号已存在",
+)
+
+_ASSET_SPEC = _ImportSpec(
+    schema=AssetCreate,
+    staging_table="asset_import_staging",
+    staging_ddl="""
+        CREATE TEMP TABLE asset_import_staging (
+            row_no integer NOT NULL,
+            id uuid NOT NULL,
+            shot_id uuid,
+            type text NOT NULL,
+            status text NOT NULL,
+            storage_path text NOT NULL,
+            format text,
+            duration_ms integer,
+            resolution text,
+            sample_rate integer,
+            metadata jsonb
+        ) ON COMMIT DROP
+    """,
+    columns=(
+        "id",
+        "shot_id",
+        "type",
+        "status",
+        "storage_path",
+        "format",
+        "duration_ms",
+        "resolution",
+        "sample_rate",
+        "metadata",
+    ),
+    to_record=lambda item: (
+        uuid.uuid4(),
+        item.shot_id,
+        item.type.name,
+        item.status.name,
+        item.storage_path,
+        item.format,
+        item.duration_ms,
+        item.resolution,
+        item.sample_rate,
+        _json_or_none(item.metadata),
+    ),
+    orphan_check_sql="""
+        DELETE FROM asset_import_staging s
+        WHERE s.shot_id IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM shots sh WHERE sh.id = s.shot_id AND sh.project_id = :project_id
+          )
+        RETURNING s.row_no
+    """,
+    orphan_column="shot_id",
+    orphan_message="镜头不存在或不属于该项目",
+    unique_column="storage_path",
+    duplicate_message="素材路径在导入文件中重复",
+    merge_sql="""
+        WITH inserted AS (
+            INSERT INTO assets (
+                id, project_id, shot_id, type, status, storage_path,
+                format, duration_ms, resolution, sample_rate, metadata
+            )
+            SELECT
+                s.id, :project_id, s.shot_id, s.type::asset_type, s.status::asset_status, s.storage_path,
+                s.format, s.duration_ms, s.resolution, s.sample_rate, s.metadata
+            FROM asset_import_staging s
+            ORDER BY s.row_no
+            ON CONFLICT ON CONSTRAINT uq_asset_storage_path DO NOTHING
+            RETURNING id
+        )
+        SELECT s.row_no
+        FROM asset_import_staging s
+        LEFT JOIN inserted i ON i.id = s.id
+        WHERE i.id IS NULL
+    """,
+    conflict_message="素材路径已存在",
+)
+
+_SPECS: dict[ImportKind, _ImportSpec] = {
+    ImportKind.SHOTS: _SHOT_SPEC,
+    ImportKind.ASSETS: _ASSET_SPEC,
+}
+
+
+class _ErrorCollector:
+    """收集逐行错误，超过上限后只计数不保留明细。"""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.items: list[ImportRowError] = []
+        self.failed_rows: set[int] = set()
+        self.truncated = False
+
+    def add(self, row: int, message: str, field: str | None = None) -> None:
+        self.failed_rows.add(row)
+        if len(self.items) >= self.limit:
+            self.truncated = True
+            return
+        self.items.append(ImportRowError(row=row, field=field, message=message))
+
+
+class BulkImportService:
+    """批量导入镜头与素材，单行错误不会中断整个导入。"""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        batch_size: int | None = None,
+        max_errors: int | None = None,
+    ) -> None:
+        self.session = session
+        self.batch_size = batch_size or settings.bulk_import_batch_size
+        self.max_errors = max_errors or settings.bulk_import_max_errors
+
+    async def _ensure_project(self, project_id: UUID) -> Project:
+        project = await self.session.get(Project, project_id)
+        if project is None:
+            raise NotFoundError("项目不存在")
+        return project
+
+    async def import_file(
+        self,
+        project_id: UUID,
+        kind: ImportKind,
+        stream: BinaryIO,
+        fmt: ImportFormat,
+    ) -> ImportReport:
+        """校验并导入整份文件，返回逐行结果汇总。"""
+
+        await self._ensure_project(project_id)
+        spec = _SPECS[kind]
+        errors = _ErrorCollector(self.max_errors)
+
+        connection = await self.session.connection()
+        await connection.execute(text(spec.staging_ddl))
+        raw_connection = await connection.get_raw_connection()
+        driver = raw_connection.driver_connection
+        columns = ("row_no", *spec.columns)
+
+        total_rows = 0
+        staged_rows = 0
+        batch: list[tuple] = []
+        try:
+            for row_no, data, parse_error in iter_import_rows(stream, fmt):
+                total_rows += 1
+                if parse_error is not None:
+                    errors.add(row_no, parse_error)
+                    continue
+                try:
+                    item = spec.schema.model_validate(data)
+                except PydanticValidationError as exc:
+                    for error in exc.errors():
+                        field = ".".join(str(part) for part in error.get("loc", ())) or None
+                        errors.add(row_no, error.get("msg", "字段不合法"), field)
+                    continue
+                nul_field = _nul_field(item)
+                if nul_field is not None:
+                    errors.add(row_no, "不能包含 NUL（\\x00）字符", nul_field)
+                    continue
+                batch.append((row_no, *spec.to_record(item)))
+                if len(batch) >= self.batch_size:
+                    await driver.copy_records_to_table(spec.staging_table, records=batch, columns=columns)
+                    staged_rows += len(batch)
+                    batch = []
+            if batch:
+                await driver.copy_records_to_table(spec.staging_table, records=batch, columns=columns)
+                staged_rows += len(batch)
+
+            params = {"project_id": project_id}
+            orphans = await connection.execute(text(spec.orphan_check_sql), params)
+            for (row_no,) in orphans:
+                errors.add(row_no, spec.orphan_message, spec.orphan_column)
+
+            duplicates = await connection.execute(
+                text(
+                    f"""
+                    DELETE FROM {spec.staging_table} s
+                    USING {spec.staging_table} d
+                    WHERE s.{spec.unique_column} = d.{spec.unique_column} AND s.row_no > d.row_no
+                    RETURNING s.row_no
+                    """
+                )
+            )
+            for (row_no,) in duplicates:
+                errors.add(row_no, spec.duplicate_message, spec.unique_column)
+
+            conflicts = await connection.execute(text(spec.merge_sql), params)
+            for (row_no,) in conflicts:
+                errors.add(row_no, spec.conflict_message, spec.unique_column)
+
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+
+        failed = len(errors.failed_rows)
+        report = ImportReport(
+            kind=kind,
+            total_rows=total_rows,
+            imported=total_rows - failed,
+            failed=failed,
+            errors=sorted(errors.items, key=lambda item: item.row),
+            errors_truncated=errors.truncated,
+        )
+        logger.bind(component="import", project_id=str(project_id)).info(
+            "批量导入完成",
+            kind=kind.value,
+            total=total_rows,
+            staged=staged_rows,
+            imported=report.imported,
+            failed=failed,
+        )
+        return report
@@ -10,6 +10,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.project import Project
+from app.models.script import Script
 from app.schemas.projects import ProjectCreate, ProjectUpdate
 from app.services.exceptions import ConflictError, NotFoundError
 from app.models.user import User
@@ -62,7 +63,14 @@ class ProjectService:
         await self.session.refresh(project)
         return project
 
-    async def delete_project(self, project_id: UUID) -> None:
+    async def delete_project(self, project_id: UUID) -> list[UUID]:
+        """删除项目，返回随之级联删除的已锁定脚本 ID，供调用方清理脚本缓存。"""
+
         project = await self.get_project(project_id)
+        locked = await self.session.scalars(
+            select(Script.id).where(Script.project_id == project_id, Script.is_locked.is_(True))
+        )
+        script_ids = list(locked)
         await self.session.delete(project)
         await self.session.commit()
+        return script_ids
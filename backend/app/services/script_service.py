@@ -71,6 +71,9 @@ class ScriptService:
     async def update_script(self, project_id: UUID, script_id: UUID, payload: ScriptUpdate) -> Script:
         script = await self.get_script(project_id, script_id)
         data = payload.model_dump(exclude_unset=True)
+        if script.is_locked and data.keys() - {"is_locked"}:
+            # 锁定版本按内容不变长期缓存，只允许解锁，解锁后再修改
+            raise ConflictError("脚本已锁定，请先解锁再修改")
         for field, value in data.items():
             setattr(script, field, value)
         await self.session.commit()
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Sequence
+from typing import Any, Sequence
 from uuid import UUID
 
 from sqlalchemy import select
@@ -11,9 +11,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.project import Project
 from app.models.script import Script
-from app.models.shot import Shot
+from app.models.shot import SHOT_METADATA_INDEXED_KEYS, Shot
 from app.schemas.shots import ShotCreate, ShotUpdate
 from app.services.exceptions import ConflictError, NotFoundError
+from app.utils.metadata_filter import metadata_filter_clauses
 
 
 class ShotService:
@@ -52,11 +53,26 @@ class ShotService:
         await self.session.refresh(shot)
         return shot
 
-    async def list_shots(self, project_id: UUID, *, skip: int, limit: int) -> Sequence[Shot]:
+    async def list_shots(
+        self,
+        project_id: UUID,
+        *,
+        skip: int,
+        limit: int,
+        metadata: dict[str, Any] | None = None,
+    ) -> Sequence[Shot]:
         await self._ensure_project(project_id)
+        stmt = select(Shot).where(Shot.project_id == project_id)
+        if metadata:
+            stmt = stmt.where(
+                *metadata_filter_clauses(
+                    Shot.extra_metadata,
+                    metadata,
+                    indexed_keys=SHOT_METADATA_INDEXED_KEYS,
+                )
+            )
         result = await self.session.execute(
-            select(Shot)
-            .where(Shot.project_id == project_id)
+            stmt
             .order_by(Shot.sequence)
             .offset(skip)
             .limit(limit)
@@ -0,0 +1,449 @@
+"""合成任务业务逻辑：创建并投递任务、查询任务状态。
+
+创建时先去重：同一镜头（或项目内未关联镜头）、同一内容指纹已有排队或执行中的任务时，
+直接返回该任务。Redis 标记用于快速识别双击与客户端重试，唯一性由活跃任务登记表的
+唯一约束保证，并发创建时只有一个事务能插入成功，其余返回先创建的任务。
+
+随后按内容指纹查结果缓存：命中则任务直接以完成状态落库，不再投递到队列。
+未命中时，交互式任务在其公平主体还有交互式名额时立即投递；其余任务留在
+数据库中，由公平调度器按优先级与份额投递（见 ``app.synthesis.scheduling``）。
+
+按状态汇总的看板数据读取 Redis 中增量维护的计数（见 ``app.synthesis.counters``），
+计数不可用时退回数据库聚合。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import UUID
+
+from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.settings import settings
+from app.core.logging import logger
+from app.core.redis import AsyncRedisClient, RedisBackendError, RedisKeys
+from app.db.base import utcnow
+from app.db.partitions import recent_window_start
+from app.models.project import Project
+from app.models.shot import Shot
+from app.models.synthesis_task import SynthesisActiveTask, SynthesisTask, TaskPriority, TaskStatus
+from app.schemas.synthesis import SynthesisTaskCreate
+from app.services.exceptions import ConflictError, NotFoundError
+from app.synthesis import (
+    CachedResult,
+    build_request,
+    get_engine,
+    get_storage,
+    get_progress_publisher,
+    get_status_counters,
+    get_synthesis_cache,
+    synthesis_fingerprint,
+)
+from app.synthesis.counters import count_by_status, empty_counts, summarize
+from app.synthesis.progress import STAGE_COMPLETED, STAGE_QUEUED
+from app.synthesis.scheduling import count_inflight
+from app.utils.metadata_filter import metadata_filter_clauses
+from app.workers.tasks import enqueue_synthesis
+
+_ACTIVE_STATUSES = (TaskStatus.QUEUED, TaskStatus.RUNNING)
+_DEDUP_CONSTRAINT = "uq_synthesis_active_tasks_dedup"
+
+
+class SynthesisService:
+    """合成任务的创建、投递与查询。"""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def _ensure_project(self, project_id: UUID) -> Project:
+        project = await self.session.get(Project, project_id)
+        if project is None:
+            raise NotFoundError("项目不存在")
+        return project
+
+    async def _ensure_shot_belongs(self, project_id: UUID, shot_id: UUID | None) -> None:
+        if shot_id is None:
+            return
+        shot = await self.session.get(Shot, shot_id)
+        if shot is None or shot.project_id != project_id:
+            raise NotFoundError("镜头不存在或不属于该项目")
+
+    async def create_task(self, project_id: UUID, payload: SynthesisTaskCreate) -> SynthesisTask:
+        """落库并按优先级投递；结果缓存命中时任务直接以完成状态落库，不投递。
+
+        已有相同内容的活跃任务时返回该任务，不新建。立即投递失败时不报错，
+        任务保持排队，由调度器稍后重新投递。
+        """
+
+        project = await self._ensure_project(project_id)
+        await self._ensure_shot_belongs(project_id, payload.shot_id)
+
+        task_payload: dict[str, Any] = {"text": payload.text, "options": payload.options}
+        if payload.sample_rate is not None:
+            task_payload["sample_rate"] = payload.sample_rate
+        task = SynthesisTask(
+            id=uuid.uuid4(),
+            # 创建时间在应用侧确定，去重标记中即可记录完整主键
+            created_at=utcnow(),
+            project_id=project_id,
+            shot_id=payload.shot_id,
+            voice_preset_id=payload.voice_preset_id,
+            payload=task_payload,
+            status=TaskStatus.QUEUED,
+            priority=payload.priority,
+            extra_metadata=payload.metadata,
+        )
+        # 指纹随任务保存，Worker 与之后的查询无需重复计算
+        fingerprint = synthesis_fingerprint(build_request(task), get_engine().name)
+        task_payload["fingerprint"] = fingerprint
+        dedup_key: str | None = None
+        owned = False
+        if settings.synthesis_dedup_enabled:
+            dedup_key = RedisKeys.synthesis_dedup(project_id, task.shot_id, fingerprint)
+            existing, owned = await self._check_dedup_key(dedup_key, task)
+            if existing is not None:
+                return existing
+
+        cached = await self._complete_from_cache(task)
+        if not cached and task.priority is TaskPriority.INTERACTIVE and await self._interactive_slot_free(project):
+            task.dispatched_at = utcnow()
+        active = None
+        if settings.synthesis_dedup_enabled and not cached:
+            active = SynthesisActiveTask(
+                task_id=task.id,
+                task_created_at=task.created_at,
+                project_id=project_id,
+                shot_id=task.shot_id,
+                payload_hash=fingerprint,
+            )
+        existing = await self._insert(task, active)
+        if dedup_key is not None and (existing is not None or not owned):
+            # 标记已过期或指向已结束的任务：改为指向实际生效的活跃任务
+            await self._write_dedup_key(dedup_key, existing or task)
+        if existing is not None:
+            return existing
+        await self._count(task, None, task.status)
+        await self._publish_created(task)
+        if task.dispatched_at is None:
+            await self.session.refresh(task)
+            return task
+
+        try:
+            # 投递是同步的 Broker 网络调用，放到线程中执行
+            await asyncio.to_thread(enqueue_synthesis, task.id, task.created_at, task.priority)
+        except Exception:  # noqa: BLE001 - 交给调度器重试
+            logger.bind(
+                component="synthesis", task_id=str(task.id), throttle_key="synthesis:enqueue:failed"
+            ).exception("合成任务立即投递失败，改由调度器投递")
+            task.dispatched_at = None
+            await self.session.commit()
+        await self.session.refresh(task)
+        return task
+
+    @staticmethod
+    def _dedup_value(task: SynthesisTask) -> str:
+        return f"{task.id}|{task.created_at.isoformat()}"
+
+    async def _check_dedup_key(self, key: str, task: SynthesisTask) -> tuple[SynthesisTask | None, bool]:
+        """抢占去重标记。返回 (已有的活跃任务, 是否由本次请求写入了标记)。
+
+        标记指向的任务已结束或尚未提交时返回 (None, False)，交给唯一约束裁决；
+        Redis 不可用时同样只依赖唯一约束。
+        """
+
+        redis = AsyncRedisClient()
+        try:
+            if await redis.set(
+                key, self._dedup_value(task), expire_seconds=settings.synthesis_dedup_ttl_seconds, only_if_absent=True
+            ):
+                return None, True
+            value = await redis.get(key)
+        except RedisBackendError:
+            return None, False
+        if not value:
+            return None, False
+        task_id, _, created_at = str(value).partition("|")
+        try:
+            existing = await self._active_task(task.project_id, UUID(task_id), datetime.fromisoformat(created_at))
+        except ValueError:
+            return None, False
+        if existing is not None:
+            self._log_duplicate(existing)
+        return existing, False
+
+    async def _write_dedup_key(self, key: str, task: SynthesisTask) -> None:
+        try:
+            await AsyncRedisClient().set(
+                key, self._dedup_value(task), expire_seconds=settings.synthesis_dedup_ttl_seconds
+            )
+        except RedisBackendError:
+            pass
+
+    async def _active_task(self, project_id: UUID, task_id: UUID, created_at: datetime) -> SynthesisTask | None:
+        result = await self.session.execute(
+            select(SynthesisTask).where(
+                SynthesisTask.id == task_id,
+                SynthesisTask.created_at == created_at,
+                SynthesisTask.project_id == project_id,
+                SynthesisTask.status.in_(_ACTIVE_STATUSES),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def _insert(self, task: SynthesisTask, active: SynthesisActiveTask | None) -> SynthesisTask | None:
+        """任务与活跃登记在同一事务内插入；违反去重约束时返回已有的活跃任务。"""
+
+        for attempt in range(2):
+            self.session.add(task)
+            if active is not None:
+                self.session.add(active)
+            try:
+                await self.session.commit()
+                return None
+            except IntegrityError as exc:
+                await self.session.rollback()
+                if active is None or _DEDUP_CONSTRAINT not in str(exc.orig):
+                    raise
+                existing = await self._active_duplicate(active)
+                if existing is not None:
+                    self._log_duplicate(existing)
+                    return existing
+                if attempt:
+                    raise ConflictError("相同内容的合成任务正在创建，请稍后重试") from exc
+        return None
+
+    async def _active_duplicate(self, active: SynthesisActiveTask) -> SynthesisTask | None:
+        """查找占用去重约束的任务；登记行已失效（任务不存在或已结束）时清理掉并返回 None。"""
+
+        result = await self.session.execute(
+            select(SynthesisActiveTask, SynthesisTask)
+            .outerjoin(
+                SynthesisTask,
+                and_(
+                    SynthesisTask.id == SynthesisActiveTask.task_id,
+                    SynthesisTask.created_at == SynthesisActiveTask.task_created_at,
+                ),
+            )
+            .where(
+                SynthesisActiveTask.project_id == active.project_id,
+                SynthesisActiveTask.shot_id.is_not_distinct_from(active.shot_id),
+                SynthesisActiveTask.payload_hash == active.payload_hash,
+            )
+        )
+        row = result.first()
+        if row is None:
+            # 冲突的任务刚好结束，登记行已被移除
+            return None
+        holder, existing = row
+        if existing is not None and existing.status in _ACTIVE_STATUSES:
+            return existing
+        await self.session.delete(holder)
+        await self.session.commit()
+        return None
+
+    @staticmethod
+    def _log_duplicate(existing: SynthesisTask) -> None:
+        logger.bind(
+            component="synthesis", task_id=str(existing.id), throttle_key="synthesis:enqueue:duplicate"
+        ).info("重复的合成请求，返回已有任务")
+
+    async def _publish_created(self, task: SynthesisTask) -> None:
+        publisher = get_progress_publisher()
+        if publisher is None:
+            return
+        if task.status is TaskStatus.COMPLETED:
+            await publisher.publish(
+                task.project_id,
+                task.id,
+                stage=STAGE_COMPLETED,
+                progress=1.0,
+                status=task.status.value,
+                result_path=task.result_path,
+                cache="hit",
+            )
+        else:
+            await publisher.publish(task.project_id, task.id, stage=STAGE_QUEUED, progress=0.0, status=task.status.value)
+
+    @staticmethod
+    async def _count(task: SynthesisTask, old: TaskStatus | None, new: TaskStatus) -> None:
+        counters = get_status_counters()
+        if counters is not None:
+            await counters.transition(task, old, new)
+
+    async def _interactive_slot_free(self, project: Project) -> bool:
+        key = project.owner_id if settings.synthesis_fair_share_key == "owner" else project.id
+        inflight = await count_inflight(self.session, fair_key=key)
+        return inflight.get((str(key), TaskPriority.INTERACTIVE), 0) < settings.synthesis_interactive_cap_per_key
+
+    async def _complete_from_cache(self, task: SynthesisTask) -> bool:
+        """缓存命中时把缓存音频链接为本任务产物并标记完成；未命中或缓存异常返回 False。"""
+
+        cache = get_synthesis_cache()
+        if cache is None:
+            return False
+        fingerprint = task.payload["fingerprint"]
+        entry: CachedResult | None = await cache.lookup(fingerprint)
+        if entry is None:
+            return False
+        try:
+            result_path = await get_storage().link(entry.path, f"{task.project_id}/{task.id}.{entry.format}")
+        except FileNotFoundError:
+            # 查询之后缓存文件刚好被淘汰，按未命中处理
+            return False
+        task.status = TaskStatus.COMPLETED
+        task.result_path = result_path
+        task.extra_metadata = {
+            **(task.extra_metadata or {}),
+            "engine": get_engine().name,
+            "format": entry.format,
+            "sample_rate": entry.sample_rate,
+            "duration_ms": entry.duration_ms,
+            "size_bytes": entry.size_bytes,
+            "cache": "hit",
+            "fingerprint": fingerprint,
+        }
+        return True
+
+    async def list_tasks(
+        self,
+        project_id: UUID,
+        *,
+        skip: int,
+        limit: int,
+        status: TaskStatus | None = None,
+        shot_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> Sequence[SynthesisTask]:
+        """列出最近几个月分区内的任务，按创建时间倒序。"""
+
+        await self._ensure_project(project_id)
+        stmt = select(SynthesisTask).where(
+            SynthesisTask.project_id == project_id,
+            SynthesisTask.created_at >= recent_window_start(),
+        )
+        if status is not None:
+            stmt = stmt.where(SynthesisTask.status == status)
+        if shot_id is not None:
+            stmt = stmt.where(SynthesisTask.shot_id == shot_id)
+        if metadata:
+            stmt = stmt.where(*metadata_filter_clauses(SynthesisTask.extra_metadata, metadata))
+        result = await self.session.execute(
+            stmt.order_by(SynthesisTask.created_at.desc()).offset(skip).limit(limit)
+        )
+        return result.scalars().all()
+
+    async def list_active_tasks(self, project_id: UUID, *, limit: int = 500) -> Sequence[SynthesisTask]:
+        """项目内排队中与执行中的任务，用作进度推送连接建立时的快照。"""
+
+        await self._ensure_project(project_id)
+        result = await self.session.execute(
+            select(SynthesisTask)
+            .where(
+                SynthesisTask.project_id == project_id,
+                SynthesisTask.created_at >= recent_window_start(),
+                SynthesisTask.status.in_(_ACTIVE_STATUSES),
+            )
+            .order_by(SynthesisTask.created_at)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def list_dead_letter(self, project_id: UUID, *, skip: int, limit: int) -> Sequence[SynthesisTask]:
+        """列出项目内用尽重试次数、进入死信队列的任务，最近进入的在前。"""
+
+        await self._ensure_project(project_id)
+        result = await self.session.execute(
+            select(SynthesisTask)
+            .where(
+                SynthesisTask.project_id == project_id,
+                SynthesisTask.dead_lettered_at.is_not(None),
+                SynthesisTask.created_at >= recent_window_start(),
+            )
+            .order_by(SynthesisTask.dead_lettered_at.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    async def requeue_task(self, project_id: UUID, task_id: UUID) -> SynthesisTask:
+        """把死信队列中的任务重新排队：执行次数清零，由调度器按优先级重新投递。
+
+        调度器只处理最近几个分区内的任务，更早的任务重新排队后永远不会被投递，
+        还会占住去重登记，因此与死信列表一致，只允许重新排队窗口内的任务。
+        """
+
+        task = await self.get_task(project_id, task_id)
+        if task.dead_lettered_at is None:
+            raise ConflictError("只有死信队列中的任务可以重新排队")
+        if task.created_at < recent_window_start():
+            raise ConflictError("任务创建时间超出调度窗口，无法重新排队，请重新创建任务")
+        task.status = TaskStatus.QUEUED
+        task.attempts = 0
+        task.next_attempt_at = None
+        task.dead_lettered_at = None
+        task.dispatched_at = None
+        fingerprint = (task.payload or {}).get("fingerprint")
+        if settings.synthesis_dedup_enabled and fingerprint:
+            self.session.add(
+                SynthesisActiveTask(
+                    task_id=task.id,
+                    task_created_at=task.created_at,
+                    project_id=task.project_id,
+                    shot_id=task.shot_id,
+                    payload_hash=fingerprint,
+                )
+            )
+        try:
+            await self.session.commit()
+        except IntegrityError as exc:
+            # 相同内容已有活跃任务，或同一任务被并发重新排队
+            await self.session.rollback()
+            raise ConflictError("已有相同内容的任务在排队或执行中") from exc
+        await self.session.refresh(task)
+        await self._count(task, TaskStatus.FAILED, TaskStatus.QUEUED)
+        await self._publish_created(task)
+        return task
+
+    async def summary(self, project_id: UUID, *, shot_id: UUID | None = None) -> dict[str, Any]:
+        """项目内最近分区任务按状态的计数，含项目合计与各镜头计数；shot_id 给定时只返回该镜头。
+
+        优先读取增量维护的计数；计数未启用、尚未校准或 Redis 不可用时按数据库实时聚合，
+        并尽量回填计数。
+        """
+
+        await self._ensure_project(project_id)
+        counters = get_status_counters()
+        counts = None
+        if counters is not None:
+            try:
+                counts = await counters.read(project_id)
+            except RedisBackendError:
+                counters = None
+        source = "counters"
+        if counts is None:
+            source = "database"
+            rows = await count_by_status(self.session, project_id=project_id)
+            counts = summarize(rows)
+            if counters is not None:
+                try:
+                    await counters.replace(project_id, rows)
+                except RedisBackendError:
+                    pass
+        totals, shots = counts
+        if shot_id is not None:
+            shots = {str(shot_id): shots.get(str(shot_id), empty_counts())}
+        return {"project_id": project_id, "totals": totals, "shots": shots, "source": source}
+
+    async def get_task(self, project_id: UUID, task_id: UUID) -> SynthesisTask:
+        result = await self.session.execute(
+            select(SynthesisTask).where(SynthesisTask.id == task_id, SynthesisTask.project_id == project_id)
+        )
+        task = result.scalar_one_or_none()
+        if task is None:
+            raise NotFoundError("合成任务不存在")
+        return task
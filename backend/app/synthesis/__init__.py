@@ -0,0 +1,73 @@
+"""合成任务执行：TTS 引擎、后端并发限制、优先级与公平调度、微批调度、产物存储、结果缓存、进度推送、状态计数、状态回写与执行流程。"""
+
+from .batching import SynthesisBatcher
+from .counters import StatusCounters, get_status_counters, reconcile_status_counters
+from .engines import (
+    HttpTTSEngine,
+    LocalToneEngine,
+    SynthesisEngineError,
+    SynthesisRequest,
+    SynthesisResult,
+    TTSEngine,
+    get_engine,
+    register_engine,
+)
+from .limits import ConcurrencyLimitedEngine, backend_concurrency
+from .pipeline import SynthesisOutcome, SynthesisPipeline, build_request
+from .progress import (
+    ProgressEvent,
+    ProgressHub,
+    ProgressPublisher,
+    close_progress_hub,
+    get_progress_hub,
+    get_progress_publisher,
+)
+from .result_cache import (
+    CachedResult,
+    SynthesisResultCache,
+    get_synthesis_cache,
+    normalize_text,
+    synthesis_fingerprint,
+)
+from .scheduling import FairShareDispatcher, PendingTask, plan_dispatch
+from .status import StatusUpdate, StatusWriter
+from .storage import LocalResultStorage, ResultStorage, get_storage
+
+__all__ = (
+    "CachedResult",
+    "ConcurrencyLimitedEngine",
+    "FairShareDispatcher",
+    "HttpTTSEngine",
+    "LocalResultStorage",
+    "LocalToneEngine",
+    "PendingTask",
+    "ProgressEvent",
+    "ProgressHub",
+    "ProgressPublisher",
+    "ResultStorage",
+    "StatusCounters",
+    "StatusUpdate",
+    "StatusWriter",
+    "SynthesisBatcher",
+    "SynthesisEngineError",
+    "SynthesisOutcome",
+    "SynthesisPipeline",
+    "SynthesisRequest",
+    "SynthesisResult",
+    "SynthesisResultCache",
+    "TTSEngine",
+    "backend_concurrency",
+    "build_request",
+    "close_progress_hub",
+    "get_engine",
+    "get_progress_hub",
+    "get_progress_publisher",
+    "get_status_counters",
+    "get_storage",
+    "get_synthesis_cache",
+    "normalize_text",
+    "plan_dispatch",
+    "reconcile_status_counters",
+    "register_engine",
+    "synthesis_fingerprint",
+)
@@ -0,0 +1,98 @@
+"""Worker 内的微批合成。
+
+同一事件循环中并发执行的合成请求先进入待合成队列，凑满 ``max_batch`` 句
+或最早一句等待超过 ``max_wait`` 秒时，作为一次 ``synthesize_batch`` 交给引擎，
+结果再按顺序分发回各自的调用方。批次调度不阻塞入队：上一批还在合成时，
+新请求继续积攒成下一批。
+
+``SynthesisBatcher`` 实现了与引擎相同的接口，流水线无需区分是否开启批量。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Sequence
+
+from app.core.logging import logger
+from app.synthesis.engines import SynthesisEngineError, SynthesisRequest, SynthesisResult, TTSEngine
+
+
+class SynthesisBatcher:
+    """把单句合成请求攒批后交给引擎。必须在同一个事件循环中使用。"""
+
+    def __init__(self, engine: TTSEngine, *, max_batch: int, max_wait: float) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.engine = engine
+        self.name = engine.name
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: list[tuple[SynthesisRequest, asyncio.Future[SynthesisResult]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task[None]] = set()
+        self._batches = 0
+        self._items = 0
+
+    async def synthesize(self, request: SynthesisRequest) -> SynthesisResult:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[SynthesisResult] = loop.create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    async def synthesize_batch(
+        self, requests: Sequence[SynthesisRequest]
+    ) -> list[SynthesisResult | SynthesisEngineError]:
+        return await self.engine.synthesize_batch(requests)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list[tuple[SynthesisRequest, asyncio.Future[SynthesisResult]]]) -> None:
+        self._batches += 1
+        self._items += len(batch)
+        try:
+            results = await self.engine.synthesize_batch([request for request, _ in batch])
+            if len(results) != len(batch):
+                raise SynthesisEngineError(f"引擎返回 {len(results)} 个结果，期望 {len(batch)} 个")
+        except Exception as exc:  # noqa: BLE001 - 整批失败时逐个通知调用方
+            logger.bind(component="synthesis", batch_size=len(batch)).exception("批量合成失败")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """立即提交积攒的请求并等待进行中的批次结束。"""
+
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+            "pending": len(self._pending),
+        }
+
+
+__all__ = ("SynthesisBatcher",)
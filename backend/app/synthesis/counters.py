@@ -0,0 +1,191 @@
+"""按项目与镜头的合成任务状态计数。
+
+看板需要"排队 12 / 执行中 3 / 完成 140 / 失败 2"这样的汇总，逐条列任务代价太高。
+每个项目一个 Redis Hash：项目合计的字段为状态名，镜头维度的字段为
+``shot:{shot_id}:{status}``，一次 HGETALL 即可取回项目与所有镜头的计数。
+
+状态每次变化（创建、认领、完成、失败重试、死信、重新排队）都在写库之后对 Hash
+做 HINCRBY：旧状态减一、新状态加一。增量难免与数据库出现偏差（Redis 写失败、
+租约过期后被重新认领的任务按排队计减等），定时校准任务用 ``GROUP BY status``
+重算并整体替换 Hash。只有经过重算的 Hash 带 ``_synced_at`` 字段，读取时缺少该字段
+（Key 过期后只被增量重新创建）视为不可用，改为实时聚合并回填。
+
+计数范围与任务列表一致，只统计最近几个分区内的任务。
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config.settings import settings
+from app.core.logging import logger
+from app.core.redis import AsyncRedisClient, RedisBackendError, RedisKeys
+from app.db.partitions import recent_window_start
+from app.models.synthesis_task import SynthesisTask, TaskStatus
+
+_SYNCED_FIELD = "_synced_at"
+
+# (project_id, shot_id, 旧状态, 新状态)；新建任务旧状态为 None
+Transition = tuple[uuid.UUID, uuid.UUID | None, TaskStatus | None, TaskStatus | None]
+# (project_id, shot_id, 状态, 数量)
+CountRow = tuple[uuid.UUID, uuid.UUID | None, TaskStatus, int]
+
+
+def empty_counts() -> dict[str, int]:
+    return {status.value: 0 for status in TaskStatus}
+
+
+def summarize(rows: Iterable[CountRow]) -> tuple[dict[str, int], dict[str, dict[str, int]]]:
+    """把聚合结果整理为项目合计与各镜头计数。"""
+
+    totals = empty_counts()
+    shots: dict[str, dict[str, int]] = {}
+    for _, shot_id, status, count in rows:
+        totals[status.value] += count
+        if shot_id is not None:
+            shots.setdefault(str(shot_id), empty_counts())[status.value] += count
+    return totals, shots
+
+
+async def count_by_status(session: AsyncSession, *, project_id: uuid.UUID | None = None) -> list[CountRow]:
+    """按 (项目, 镜头, 状态) 聚合最近分区内的任务数，project_id 给定时只统计该项目。"""
+
+    stmt = (
+        select(SynthesisTask.project_id, SynthesisTask.shot_id, SynthesisTask.status, func.count())
+        .where(SynthesisTask.created_at >= recent_window_start())
+        .group_by(SynthesisTask.project_id, SynthesisTask.shot_id, SynthesisTask.status)
+    )
+    if project_id is not None:
+        stmt = stmt.where(SynthesisTask.project_id == project_id)
+    result = await session.execute(stmt)
+    return [(row[0], row[1], row[2], row[3]) for row in result]
+
+
+class StatusCounters:
+    """维护与读取状态计数；写入失败只记日志，偏差由定时校准修正。"""
+
+    def __init__(self, redis: AsyncRedisClient | None = None) -> None:
+        self.redis = redis or AsyncRedisClient()
+
+    async def record(self, transitions: Iterable[Transition]) -> None:
+        """登记一批状态变化，同一项目的增量合并后在一个 Pipeline 中写入。"""
+
+        deltas: dict[str, Counter[str]] = defaultdict(Counter)
+        for project_id, shot_id, old, new in transitions:
+            if old == new:
+                continue
+            fields = deltas[RedisKeys.synthesis_status_counters(project_id)]
+            for status, step in ((old, -1), (new, 1)):
+                if status is None:
+                    continue
+                fields[status.value] += step
+                if shot_id is not None:
+                    fields[f"shot:{shot_id}:{status.value}"] += step
+        if not deltas:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, fields in deltas.items():
+                    for field, delta in fields.items():
+                        if delta:
+                            pipe.hincrby(key, field, delta)
+                    pipe.expire(key, settings.synthesis_counters_ttl_seconds)
+        except RedisBackendError:
+            logger.bind(component="synthesis", throttle_key="synthesis:counters:record_failed").warning(
+                "合成任务状态计数更新失败，等待定时校准"
+            )
+
+    async def transition(
+        self, task: SynthesisTask, old: TaskStatus | None, new: TaskStatus | None
+    ) -> None:
+        await self.record([(task.project_id, task.shot_id, old, new)])
+
+    async def read(self, project_id: uuid.UUID) -> tuple[dict[str, int], dict[str, dict[str, int]]] | None:
+        """返回项目合计与各镜头计数；计数尚未校准时返回 None。Redis 异常向上抛出。"""
+
+        raw = await self.redis.hgetall(RedisKeys.synthesis_status_counters(project_id))
+        if _SYNCED_FIELD not in raw:
+            return None
+        totals = empty_counts()
+        shots: dict[str, dict[str, int]] = {}
+        for field, value in raw.items():
+            if field == _SYNCED_FIELD:
+                continue
+            # 增量偏差可能让计数短暂为负，展示时按 0 处理
+            count = max(0, int(value))
+            if field.startswith("shot:"):
+                _, shot_id, status = field.split(":", 2)
+                shots.setdefault(shot_id, empty_counts())[status] = count
+            else:
+                totals[field] = count
+        return totals, shots
+
+    async def replace(self, project_id: uuid.UUID, rows: Iterable[CountRow]) -> None:
+        """用聚合结果整体替换项目的计数 Hash，并标记为已校准。"""
+
+        totals, shots = summarize(rows)
+        mapping: dict[str, Any] = {_SYNCED_FIELD: int(time.time()), **totals}
+        for shot_id, counts in shots.items():
+            mapping.update({f"shot:{shot_id}:{status}": count for status, count in counts.items() if count})
+        key = RedisKeys.synthesis_status_counters(project_id)
+        # 不用事务：旧版 redis-py 的集群客户端不支持 Pipeline 事务。DEL 与 HSET 之间读到的
+        # 是不带 _synced_at 的 Hash，读取方会改为实时聚合，不会用到不完整的计数
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, settings.synthesis_counters_ttl_seconds)
+
+
+async def reconcile_status_counters(
+    session_factory: async_sessionmaker[AsyncSession], counters: StatusCounters
+) -> dict[str, int]:
+    """按数据库聚合结果重算所有有任务的项目的计数。
+
+    聚合与写入之间发生的状态变化会被覆盖，偏差留到下一轮校准。
+    """
+
+    async with session_factory() as session:
+        rows = await count_by_status(session)
+    by_project: dict[uuid.UUID, list[CountRow]] = defaultdict(list)
+    for row in rows:
+        by_project[row[0]].append(row)
+    failed = 0
+    for project_id, project_rows in by_project.items():
+        try:
+            await counters.replace(project_id, project_rows)
+        except RedisBackendError:
+            failed += 1
+    stats = {"projects": len(by_project), "failed": failed}
+    logger.bind(component="synthesis", **stats).info("合成任务状态计数已校准")
+    return stats
+
+
+_counters: StatusCounters | None = None
+
+
+def get_status_counters() -> StatusCounters | None:
+    """返回 API 进程内共享的计数器，未启用时返回 None。"""
+
+    global _counters
+    if not settings.synthesis_counters_enabled:
+        return None
+    if _counters is None:
+        _counters = StatusCounters()
+    return _counters
+
+
+__all__ = (
+    "StatusCounters",
+    "count_by_status",
+    "empty_counts",
+    "get_status_counters",
+    "reconcile_status_counters",
+    "summarize",
+)
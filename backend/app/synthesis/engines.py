@@ -0,0 +1,274 @@
+"""可插拔的 TTS 引擎。
+
+引擎只负责把文本合成为音频字节，不接触数据库与存储；按名称注册，
+Worker 根据 ``synthesis_engine`` 配置选择。内置的 ``local`` 引擎不依赖模型，
+按文本逐字生成确定性的音调序列并封装为 WAV，用于开发、联调与压测；``http``
+引擎把请求转发给独立部署的模型服务，调用期间只占用事件循环上的一个协程。
+
+模型类引擎每次调用都有固定开销（排队、拷贝、推理启动），一次处理多句的
+单句成本远低于逐句调用，因此接口同时提供批量合成；批内单句失败只影响该句。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import math
+import time
+import wave
+from array import array
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+import httpx
+
+from app.core.config.settings import settings
+
+
+class SynthesisEngineError(RuntimeError):
+    """引擎无法完成合成（参数不合法、模型服务异常等）。"""
+
+
+@dataclass(frozen=True)
+class SynthesisRequest:
+    """一次合成的输入，来自任务的 payload 快照。"""
+
+    text: str
+    voice_preset_id: str | None = None
+    sample_rate: int = 22050
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SynthesisResult:
+    """合成产物与基本属性，写入任务元数据。"""
+
+    audio: bytes
+    format: str
+    sample_rate: int
+    duration_ms: int
+
+
+class TTSEngine(Protocol):
+    """TTS 引擎接口。"""
+
+    name: str
+
+    async def synthesize(self, request: SynthesisRequest) -> SynthesisResult: ...
+
+    async def synthesize_batch(
+        self, requests: Sequence[SynthesisRequest]
+    ) -> list[SynthesisResult | SynthesisEngineError]:
+        """按输入顺序返回结果，单句失败时对应位置为异常对象而不是抛出。"""
+        ...
+
+
+class LocalToneEngine:
+    """确定性的本地替身引擎：相同的文本与音色总是生成完全相同的 WAV。
+
+    每个字符对应一段固定时长的正弦音，频率由字符与音色共同决定；
+    合成在线程中执行，长文本不会阻塞事件循环。``call_overhead_ms`` 模拟
+    模型服务每次调用的固定开销，用于压测批量合成的收益。
+    """
+
+    name = "local"
+
+    def __init__(self, *, char_ms: int = 80, amplitude: float = 0.3, call_overhead_ms: float = 0.0) -> None:
+        self.char_ms = char_ms
+        self.amplitude = amplitude
+        self.call_overhead_ms = call_overhead_ms
+
+    async def synthesize(self, request: SynthesisRequest) -> SynthesisResult:
+        result = (await self.synthesize_batch([request]))[0]
+        if isinstance(result, SynthesisEngineError):
+            raise result
+        return result
+
+    async def synthesize_batch(
+        self, requests: Sequence[SynthesisRequest]
+    ) -> list[SynthesisResult | SynthesisEngineError]:
+        return await asyncio.to_thread(self._render_batch, list(requests))
+
+    def _render_batch(self, requests: list[SynthesisRequest]) -> list[SynthesisResult | SynthesisEngineError]:
+        if self.call_overhead_ms:
+            time.sleep(self.call_overhead_ms / 1000)
+        results: list[SynthesisResult | SynthesisEngineError] = []
+        for request in requests:
+            if not request.text.strip():
+                results.append(SynthesisEngineError("合成文本为空"))
+            else:
+                results.append(self._render(request))
+        return results
+
+    def _render(self, request: SynthesisRequest) -> SynthesisResult:
+        rate = request.sample_rate
+        seed = int.from_bytes(hashlib.sha256((request.voice_preset_id or "").encode()).digest()[:4], "big")
+        segment_len = rate * self.char_ms // 1000
+        peak = int(32767 * self.amplitude)
+        segments: dict[int, array] = {}
+        samples = array("h")
+        for char in request.text:
+            if char.isspace():
+                frequency = 0
+            else:
+                frequency = 200 + (ord(char) * 37 + seed) % 600
+            segment = segments.get(frequency)
+            if segment is None:
+                segment = segments[frequency] = self._tone(frequency, segment_len, rate, peak)
+            samples.extend(segment)
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(rate)
+            writer.writeframes(samples.tobytes())
+        return SynthesisResult(
+            audio=buffer.getvalue(),
+            format="wav",
+            sample_rate=rate,
+            duration_ms=len(samples) * 1000 // rate,
+        )
+
+    @staticmethod
+    def _tone(frequency: int, length: int, rate: int, peak: int) -> array:
+        if frequency == 0:
+            return array("h", bytes(length * 2))
+        # 首尾各 5ms 线性淡入淡出，避免段与段之间出现爆音
+        fade = max(1, rate // 200)
+        step = 2 * math.pi * frequency / rate
+        return array(
+            "h",
+            (
+                int(peak * math.sin(step * index) * min(1.0, index / fade, (length - index) / fade))
+                for index in range(length)
+            ),
+        )
+
+
+_AUDIO_FORMATS = {"audio/wav": "wav", "audio/x-wav": "wav", "audio/mpeg": "mp3", "audio/ogg": "ogg"}
+# httpcore 每次分配连接都要把排队请求与池中所有连接逐一比对，单个连接池的连接数
+# 与并发请求数同时增大时开销按平方增长；拆成多个小连接池轮询使用
+_CONNECTIONS_PER_CLIENT = 16
+
+
+class HttpTTSEngine:
+    """调用 HTTP 模型服务的引擎。
+
+    以 JSON POST 合成参数，响应体为音频字节：格式取自 Content-Type，时长取自
+    ``X-Audio-Duration-Ms`` 响应头（WAV 缺省时从文件头计算）。连接池在首次调用时
+    于当前事件循环内创建，按 ``_CONNECTIONS_PER_CLIENT`` 拆分为多个客户端轮询使用，
+    Worker 退出时由运行时调用 ``aclose`` 释放。
+    """
+
+    name = "http"
+
+    def __init__(
+        self, *, url: str | None = None, timeout: float | None = None, max_connections: int | None = None
+    ) -> None:
+        self.url = url or settings.synthesis_http_engine_url
+        self.timeout = timeout if timeout is not None else settings.synthesis_http_engine_timeout_seconds
+        self.max_connections = max_connections or settings.synthesis_http_engine_max_connections
+        self._clients: list[httpx.AsyncClient] = []
+        self._calls = 0
+
+    def _http(self) -> httpx.AsyncClient:
+        if not self._clients:
+            shards = -(-self.max_connections // _CONNECTIONS_PER_CLIENT)
+            size = -(-self.max_connections // shards)
+            limits = httpx.Limits(max_connections=size, max_keepalive_connections=size)
+            self._clients = [httpx.AsyncClient(timeout=self.timeout, limits=limits) for _ in range(shards)]
+        self._calls += 1
+        return self._clients[self._calls % len(self._clients)]
+
+    async def synthesize(self, request: SynthesisRequest) -> SynthesisResult:
+        try:
+            response = await self._http().post(
+                self.url,
+                json={
+                    "text": request.text,
+                    "voice_preset_id": request.voice_preset_id,
+                    "sample_rate": request.sample_rate,
+                    "options": request.options,
+                },
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            raise SynthesisEngineError(f"模型服务调用失败：{type(exc).__name__}: {exc}") from exc
+
+        content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+        fmt = _AUDIO_FORMATS.get(content_type)
+        if fmt is None:
+            raise SynthesisEngineError(f"模型服务返回了不支持的内容类型：{content_type or '(空)'}")
+        audio = response.content
+        duration = response.headers.get("x-audio-duration-ms")
+        if duration is not None:
+            duration_ms = int(duration)
+        elif fmt == "wav":
+            with wave.open(io.BytesIO(audio)) as reader:
+                duration_ms = reader.getnframes() * 1000 // reader.getframerate()
+        else:
+            duration_ms = 0
+        return SynthesisResult(audio=audio, format=fmt, sample_rate=request.sample_rate, duration_ms=duration_ms)
+
+    async def synthesize_batch(
+        self, requests: Sequence[SynthesisRequest]
+    ) -> list[SynthesisResult | SynthesisEngineError]:
+        # 服务端没有批量接口，并发发出单句请求
+        results = await asyncio.gather(*(self.synthesize(request) for request in requests), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        return [
+            result
+            if isinstance(result, (SynthesisResult, SynthesisEngineError))
+            else SynthesisEngineError(f"{type(result).__name__}: {result}")
+            for result in results
+        ]
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, []
+        for client in clients:
+            await client.aclose()
+
+
+_ENGINES: dict[str, Callable[[], TTSEngine]] = {
+    LocalToneEngine.name: LocalToneEngine,
+    HttpTTSEngine.name: HttpTTSEngine,
+}
+_instances: dict[str, TTSEngine] = {}
+
+
+def register_engine(name: str, factory: Callable[[], TTSEngine]) -> None:
+    """注册 TTS 引擎工厂，名称重复时覆盖；已创建的同名实例会被丢弃。"""
+
+    _ENGINES[name] = factory
+    _instances.pop(name, None)
+
+
+def get_engine(name: str | None = None) -> TTSEngine:
+    """返回进程内共享的引擎实例，缺省按 ``synthesis_engine`` 配置选择。"""
+
+    name = name or settings.synthesis_engine
+    engine = _instances.get(name)
+    if engine is None:
+        try:
+            factory = _ENGINES[name]
+        except KeyError as exc:
+            raise ValueError(f"unknown synthesis engine: {name}") from exc
+        engine = _instances[name] = factory()
+    return engine
+
+
+__all__ = (
+    "HttpTTSEngine",
+    "LocalToneEngine",
+    "SynthesisEngineError",
+    "SynthesisRequest",
+    "SynthesisResult",
+    "TTSEngine",
+    "get_engine",
+    "register_engine",
+)
@@ -0,0 +1,82 @@
+"""按后端限制并发的引擎包装。
+
+asyncio 执行模式下，一个 Worker 进程的事件循环里同时有几十个任务在等待模型或
+HTTP 后端。不加限制时这些调用会同时压到后端上，后端排队变长、超时增多，
+重试又进一步放大压力。``ConcurrencyLimitedEngine`` 在引擎外面加一个有界信号量，
+同一后端同时进行中的调用数不超过配置的上限，多出的调用在进程内排队等待。
+
+上限按引擎名称配置（``synthesis_backend_concurrency``），未配置的引擎使用
+``synthesis_backend_default_concurrency``。开启微批时包在批调度器里面，
+一批只占一个名额，与后端实际承受的调用数一致。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from typing import Any
+
+from app.core.config.settings import settings
+from app.synthesis.engines import SynthesisEngineError, SynthesisRequest, SynthesisResult, TTSEngine
+
+
+def backend_concurrency(name: str) -> int:
+    """返回指定后端允许的同时调用数。"""
+
+    return settings.synthesis_backend_concurrency.get(name, settings.synthesis_backend_default_concurrency)
+
+
+class ConcurrencyLimitedEngine:
+    """限制同时进行中的引擎调用数。必须在同一个事件循环中使用。"""
+
+    def __init__(self, engine: TTSEngine, *, limit: int) -> None:
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        self.engine = engine
+        self.name = engine.name
+        self.limit = limit
+        self._semaphore = asyncio.BoundedSemaphore(limit)
+        self._active = 0
+        self._waiting = 0
+        self._peak = 0
+        self._calls = 0
+
+    async def synthesize(self, request: SynthesisRequest) -> SynthesisResult:
+        async with self._slot():
+            return await self.engine.synthesize(request)
+
+    async def synthesize_batch(
+        self, requests: Sequence[SynthesisRequest]
+    ) -> list[SynthesisResult | SynthesisEngineError]:
+        async with self._slot():
+            return await self.engine.synthesize_batch(requests)
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._active += 1
+        self._calls += 1
+        self._peak = max(self._peak, self._active)
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": self.name,
+            "limit": self.limit,
+            "active": self._active,
+            "waiting": self._waiting,
+            "peak": self._peak,
+            "calls": self._calls,
+        }
+
+
+__all__ = ("ConcurrencyLimitedEngine", "backend_concurrency")
@@ -0,0 +1,369 @@
+"""合成任务执行流程：认领任务 → 查结果缓存 → 调用 TTS 引擎 → 写入存储 → 回写状态。
+
+状态流转为 QUEUED → RUNNING → COMPLETED / FAILED。认领是一条条件 UPDATE：
+只有 QUEUED 且已到重试时间的任务，或 RUNNING 且超过租约时间没有任何状态更新
+（上一次执行中途退出）的任务可以被认领，认领时执行次数加一。已完成或已被其他
+Worker 认领的任务再次投递（Broker 重投、人工重放、已被批量认领）时直接返回，
+不会重复合成。
+
+执行失败的任务按指数退避回到 QUEUED 等待重试，用尽次数后进入死信队列
+（见 ``app.synthesis.retries``）；失败原因写入 error_message。
+
+开启批量时，Worker 处理一条消息会顺带认领若干已投递、排队最久的任务，与本任务
+一起并发执行；这些请求经 ``SynthesisBatcher`` 合并为一次引擎调用，结果再
+分别回写到各自的任务。被顺带处理的任务，其自身消息到达时已不可认领而直接跳过。
+
+启用结果缓存时，内容指纹相同的任务直接复用已有音频（硬链接为本任务的产物），
+并发的相同请求只由一个任务实际合成。
+
+每次状态变化在写库之后登记到状态计数（见 ``app.synthesis.counters``）。认领按
+QUEUED → RUNNING 计；租约过期后被重新认领的任务实际来自 RUNNING，偏差由定时校准修正。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import and_, func, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config.settings import settings
+from app.core.logging import logger
+from app.db.base import utcnow
+from app.db.partitions import recent_window_start
+from app.models.synthesis_task import SynthesisTask, TaskStatus
+from app.synthesis.counters import StatusCounters
+from app.synthesis.engines import SynthesisRequest, TTSEngine
+from app.synthesis.progress import (
+    STAGE_COMPLETED,
+    STAGE_FAILED,
+    STAGE_RETRYING,
+    STAGE_RUNNING,
+    STAGE_SYNTHESIZING,
+    ProgressPublisher,
+)
+from app.synthesis.result_cache import CachedResult, SynthesisResultCache, synthesis_fingerprint
+from app.synthesis.retries import exhausted, next_attempt_at
+from app.synthesis.status import StatusUpdate, StatusWriter
+from app.synthesis.storage import ResultStorage
+
+_ERROR_MESSAGE_LIMIT = 512
+
+
+@dataclass(frozen=True)
+class SynthesisOutcome:
+    """一次执行的结果摘要，作为 Celery 任务返回值。"""
+
+    task_id: uuid.UUID
+    status: TaskStatus
+    result_path: str | None = None
+    skipped: bool = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "task_id": str(self.task_id),
+            "status": self.status.value,
+            "result_path": self.result_path,
+            "skipped": self.skipped,
+        }
+
+
+def build_request(task: SynthesisTask) -> SynthesisRequest:
+    """从任务的 payload 快照构造引擎输入。"""
+
+    payload = task.payload or {}
+    return SynthesisRequest(
+        text=str(payload.get("text", "")),
+        voice_preset_id=task.voice_preset_id,
+        sample_rate=int(payload.get("sample_rate") or settings.synthesis_sample_rate),
+        options=dict(payload.get("options") or {}),
+    )
+
+
+class SynthesisPipeline:
+    """在 Worker 的常驻事件循环中执行合成任务，各依赖由运行时注入。"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        engine: TTSEngine,
+        storage: ResultStorage,
+        status_writer: StatusWriter,
+        cache: SynthesisResultCache | None = None,
+        claim_batch: int = 1,
+        progress: ProgressPublisher | None = None,
+        counters: StatusCounters | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.engine = engine
+        self.storage = storage
+        self.status_writer = status_writer
+        self.cache = cache
+        self.claim_batch = claim_batch
+        self.progress = progress
+        self.counters = counters
+
+    async def _load(self, task_id: uuid.UUID, created_at: datetime | None) -> SynthesisTask | None:
+        stmt = select(SynthesisTask).where(SynthesisTask.id == task_id)
+        if created_at is not None:
+            # 带上分区键，只扫描任务所在的月度分区
+            stmt = stmt.where(SynthesisTask.created_at == created_at)
+        async with self.session_factory() as session:
+            return (await session.execute(stmt)).scalar_one_or_none()
+
+    @staticmethod
+    def _claimable() -> Any:
+        lease_expired = utcnow() - timedelta(seconds=settings.synthesis_claim_lease_seconds)
+        return or_(
+            and_(
+                SynthesisTask.status == TaskStatus.QUEUED,
+                or_(SynthesisTask.next_attempt_at.is_(None), SynthesisTask.next_attempt_at <= func.now()),
+            ),
+            and_(SynthesisTask.status == TaskStatus.RUNNING, SynthesisTask.updated_at < lease_expired),
+        )
+
+    async def _claim(self, task_id: uuid.UUID, created_at: datetime | None) -> SynthesisTask | None:
+        stmt = (
+            update(SynthesisTask)
+            .where(SynthesisTask.id == task_id, self._claimable())
+            .values(status=TaskStatus.RUNNING, attempts=SynthesisTask.attempts + 1)
+            .returning(SynthesisTask)
+        )
+        if created_at is not None:
+            stmt = stmt.where(SynthesisTask.created_at == created_at)
+        async with self.session_factory() as session:
+            task = (
+                await session.execute(stmt, execution_options={"synchronize_session": False})
+            ).scalar_one_or_none()
+            await session.commit()
+        if task is not None:
+            await self._count([task], TaskStatus.QUEUED, TaskStatus.RUNNING)
+        return task
+
+    async def _claim_queued(self, limit: int, *, exclude: uuid.UUID) -> list[SynthesisTask]:
+        """按创建时间认领最多 limit 个已投递、可认领的任务；已被其他 Worker 锁定的行直接跳过。"""
+
+        candidates = (
+            select(SynthesisTask.id, SynthesisTask.created_at)
+            .where(
+                self._claimable(),
+                # 只顺带处理调度器已经放行的任务，不绕过优先级与公平份额
+                SynthesisTask.dispatched_at.is_not(None),
+                SynthesisTask.created_at >= recent_window_start(),
+                SynthesisTask.id != exclude,
+            )
+            .order_by(SynthesisTask.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(SynthesisTask)
+            .where(tuple_(SynthesisTask.id, SynthesisTask.created_at).in_(candidates))
+            .values(status=TaskStatus.RUNNING, attempts=SynthesisTask.attempts + 1)
+            .returning(SynthesisTask)
+        )
+        async with self.session_factory() as session:
+            tasks = list(
+                (await session.execute(stmt, execution_options={"synchronize_session": False})).scalars()
+            )
+            await session.commit()
+        await self._count(tasks, TaskStatus.QUEUED, TaskStatus.RUNNING)
+        return tasks
+
+    async def run(self, task_id: uuid.UUID, created_at: datetime | None = None) -> SynthesisOutcome:
+        log = logger.bind(component="synthesis", task_id=str(task_id))
+        task = await self._claim(task_id, created_at)
+        if task is None:
+            current = await self._load(task_id, created_at)
+            if current is None:
+                log.warning("合成任务不存在，可能已被删除")
+                return SynthesisOutcome(task_id=task_id, status=TaskStatus.FAILED, skipped=True)
+            return SynthesisOutcome(
+                task_id=task_id, status=current.status, result_path=current.result_path, skipped=True
+            )
+
+        extras = await self._claim_queued(self.claim_batch - 1, exclude=task.id) if self.claim_batch > 1 else []
+        if not extras:
+            return await self._execute(task)
+        log.info(f"顺带认领 {len(extras)} 个排队中的合成任务，合并执行")
+        outcomes = await asyncio.gather(
+            self._execute(task), *(self._execute(extra) for extra in extras), return_exceptions=True
+        )
+        for extra, outcome in zip(extras, outcomes[1:]):
+            if isinstance(outcome, BaseException):
+                log.opt(exception=outcome).error(f"顺带执行的合成任务 {extra.id} 状态回写失败")
+        if isinstance(outcomes[0], BaseException):
+            raise outcomes[0]
+        return outcomes[0]
+
+    async def _execute(self, task: SynthesisTask) -> SynthesisOutcome:
+        log = logger.bind(component="synthesis", task_id=str(task.id))
+        started = time.perf_counter()
+        if task.attempts > settings.synthesis_max_attempts:
+            # 之前的执行都没能回写结果（Worker 崩溃或超时），不再尝试
+            return await self._fail(task, "执行多次中途退出（Worker 崩溃或超时）", started)
+        await self._publish(
+            task, stage=STAGE_RUNNING, progress=0.0, status=TaskStatus.RUNNING, attempts=task.attempts
+        )
+        try:
+            request = build_request(task)
+            fingerprint = (task.payload or {}).get("fingerprint") or synthesis_fingerprint(
+                request, self.engine.name
+            )
+            entry, cache_state, result_path = await self._resolve(task, request, fingerprint)
+        except Exception as exc:  # noqa: BLE001 - 任何失败都记录到任务上
+            log.exception(f"合成任务第 {task.attempts} 次执行失败")
+            return await self._fail(task, f"{type(exc).__name__}: {exc}", started)
+
+        await self.status_writer.submit(
+            StatusUpdate(
+                task_id=task.id,
+                created_at=task.created_at,
+                status=TaskStatus.COMPLETED,
+                result_path=result_path,
+                metadata={
+                    "engine": self.engine.name,
+                    "format": entry.format,
+                    "sample_rate": entry.sample_rate,
+                    "duration_ms": entry.duration_ms,
+                    "size_bytes": entry.size_bytes,
+                    "elapsed_ms": _elapsed_ms(started),
+                    "cache": cache_state,
+                    "fingerprint": fingerprint,
+                },
+            )
+        )
+        # 状态落库之后再计数并推送完成事件，客户端据此拉取详情时能读到最新状态
+        await self._count([task], TaskStatus.RUNNING, TaskStatus.COMPLETED)
+        await self._publish(
+            task,
+            stage=STAGE_COMPLETED,
+            progress=1.0,
+            status=TaskStatus.COMPLETED,
+            result_path=result_path,
+            cache=cache_state,
+        )
+        log.info(f"合成任务完成（缓存 {cache_state}），音频 {entry.duration_ms}ms")
+        return SynthesisOutcome(task_id=task.id, status=TaskStatus.COMPLETED, result_path=result_path)
+
+    async def _fail(self, task: SynthesisTask, message: str, started: float) -> SynthesisOutcome:
+        """记录失败：未用尽次数时按退避时间回到排队，否则进入死信队列。"""
+
+        error_message = message[:_ERROR_MESSAGE_LIMIT]
+        metadata = {"engine": self.engine.name, "elapsed_ms": _elapsed_ms(started), "attempts": task.attempts}
+        if exhausted(task.attempts):
+            await self.status_writer.submit(
+                StatusUpdate(
+                    task_id=task.id,
+                    created_at=task.created_at,
+                    status=TaskStatus.FAILED,
+                    error_message=error_message,
+                    metadata=metadata,
+                    dead_lettered_at=utcnow(),
+                )
+            )
+            await self._count([task], TaskStatus.RUNNING, TaskStatus.FAILED)
+            await self._publish(
+                task,
+                stage=STAGE_FAILED,
+                progress=1.0,
+                status=TaskStatus.FAILED,
+                error_message=error_message,
+                attempts=task.attempts,
+            )
+            logger.bind(
+                component="synthesis", task_id=str(task.id), throttle_key="synthesis:dead_letter"
+            ).error(f"合成任务已执行 {task.attempts} 次仍未成功，进入死信队列：{error_message}")
+            return SynthesisOutcome(task_id=task.id, status=TaskStatus.FAILED)
+
+        retry_at = next_attempt_at(task.attempts)
+        await self.status_writer.submit(
+            StatusUpdate(
+                task_id=task.id,
+                created_at=task.created_at,
+                status=TaskStatus.QUEUED,
+                error_message=error_message,
+                metadata=metadata,
+                next_attempt_at=retry_at,
+            )
+        )
+        await self._count([task], TaskStatus.RUNNING, TaskStatus.QUEUED)
+        await self._publish(
+            task,
+            stage=STAGE_RETRYING,
+            progress=0.0,
+            status=TaskStatus.QUEUED,
+            error_message=error_message,
+            attempts=task.attempts,
+            next_attempt_at=retry_at.isoformat(),
+        )
+        return SynthesisOutcome(task_id=task.id, status=TaskStatus.QUEUED)
+
+    async def _count(self, tasks: list[SynthesisTask], old: TaskStatus, new: TaskStatus) -> None:
+        if self.counters is not None and tasks:
+            await self.counters.record((task.project_id, task.shot_id, old, new) for task in tasks)
+
+    async def _publish(self, task: SynthesisTask, *, status: TaskStatus, **fields: Any) -> None:
+        if self.progress is not None:
+            await self.progress.publish(task.project_id, task.id, status=status.value, **fields)
+
+    async def _resolve(
+        self, task: SynthesisTask, request: SynthesisRequest, fingerprint: str
+    ) -> tuple[CachedResult, str, str]:
+        """返回音频条目、缓存状态（hit / coalesced / miss / disabled）与本任务的产物路径。"""
+
+        key_prefix = f"{task.project_id}/{task.id}"
+        produced_path: str | None = None
+
+        async def produce() -> CachedResult:
+            nonlocal produced_path
+            await self._publish(task, stage=STAGE_SYNTHESIZING, progress=0.1, status=TaskStatus.RUNNING)
+            result = await self.engine.synthesize(request)
+            produced_path = await self.storage.save(f"{key_prefix}.{result.format}", result.audio)
+            if self.cache is None:
+                return CachedResult(
+                    fingerprint=fingerprint,
+                    path=produced_path,
+                    format=result.format,
+                    size_bytes=len(result.audio),
+                    duration_ms=result.duration_ms,
+                    sample_rate=result.sample_rate,
+                )
+            return await self.cache.store(
+                fingerprint,
+                produced_path,
+                fmt=result.format,
+                size_bytes=len(result.audio),
+                duration_ms=result.duration_ms,
+                sample_rate=result.sample_rate,
+            )
+
+        if self.cache is None:
+            return await produce(), "disabled", produced_path
+
+        entry = await self.cache.lookup(fingerprint)
+        state = "hit"
+        if entry is None:
+            entry, produced = await self.cache.get_or_produce(fingerprint, produce)
+            state = "miss" if produced else "coalesced"
+        if produced_path is not None:
+            return entry, state, produced_path
+        try:
+            return entry, state, await self.storage.link(entry.path, f"{key_prefix}.{entry.format}")
+        except FileNotFoundError:
+            # 缓存文件在查询之后被淘汰，退回到自行合成
+            entry = await produce()
+            return entry, "miss", produced_path
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
+__all__ = ("SynthesisOutcome", "SynthesisPipeline", "build_request")
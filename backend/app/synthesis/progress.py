@@ -0,0 +1,248 @@
+"""合成任务进度推送。
+
+Worker 在任务状态变化时把事件 PUBLISH 到项目的进度频道；API 进程用一条
+模式订阅连接接收所有项目的事件，再分发给本进程内订阅了该项目的 SSE 连接。
+一个连接即可收到项目内所有任务的进度，前端不必轮询任务表。
+
+Pub/Sub 不保证送达：订阅建立前、断线期间的事件会丢失。因此连接建立时先订阅
+再下发一次活跃任务快照；连接积压过多或订阅重连后下发 ``resync``，由客户端
+重新拉取任务列表。事件只用于展示，任务表仍是状态的唯一来源。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from redis.exceptions import RedisError
+
+from app.core.config.settings import settings
+from app.core.logging import logger
+from app.core.redis import AsyncRedisClient, RedisBackendError, RedisKeys, get_async_redis_pubsub
+
+# 进度阶段
+STAGE_QUEUED = "queued"
+STAGE_RUNNING = "running"
+STAGE_SYNTHESIZING = "synthesizing"
+STAGE_RETRYING = "retrying"
+STAGE_COMPLETED = "completed"
+STAGE_FAILED = "failed"
+
+# 分发队列中的特殊标记：事件有丢失，客户端需要重新拉取任务列表
+RESYNC = "__resync__"
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """单个任务的一次进度变化，progress 取值 0~1。"""
+
+    task_id: str
+    project_id: str
+    stage: str
+    progress: float
+    status: str
+    result_path: str | None = None
+    error_message: str | None = None
+    cache: str | None = None
+    attempts: int | None = None
+    next_attempt_at: str | None = None
+    ts: float = 0.0
+
+    def to_json(self) -> str:
+        data = {key: value for key, value in asdict(self).items() if value is not None}
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class ProgressPublisher:
+    """发布进度事件；Redis 不可用时只记日志，不影响任务执行。"""
+
+    def __init__(self, redis: AsyncRedisClient | None = None) -> None:
+        self.redis = redis or AsyncRedisClient()
+
+    async def publish(
+        self,
+        project_id: uuid.UUID | str,
+        task_id: uuid.UUID | str,
+        *,
+        stage: str,
+        progress: float,
+        status: str,
+        **extra: Any,
+    ) -> None:
+        event = ProgressEvent(
+            task_id=str(task_id),
+            project_id=str(project_id),
+            stage=stage,
+            progress=progress,
+            status=status,
+            ts=round(time.time(), 3),
+            **extra,
+        )
+        try:
+            await self.redis.publish(RedisKeys.synthesis_progress_channel(project_id), event.to_json())
+        except RedisBackendError:
+            logger.bind(
+                component="synthesis", task_id=str(task_id), throttle_key="synthesis:progress:publish_failed"
+            ).warning("合成进度发布失败")
+
+
+class ProgressSubscription:
+    """单个 SSE 连接的事件队列。积压满时清空并改为下发一次重新同步。"""
+
+    def __init__(self, hub: ProgressHub, project_id: str, maxsize: int) -> None:
+        self.hub = hub
+        self.project_id = project_id
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, data: str) -> None:
+        if self.queue.full():
+            # 客户端跟不上：积压的事件全部丢弃，改为一次重新同步，之后的事件照常推送
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            data = RESYNC
+        self.queue.put_nowait(data)
+
+    async def get(self, timeout: float) -> str | None:
+        """等待下一条事件，超时返回 None；返回 ``RESYNC`` 表示需要重新拉取。"""
+
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.hub._remove(self)
+
+
+class ProgressHub:
+    """API 进程内的进度分发器，所有 SSE 连接共享一条模式订阅。"""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[ProgressSubscription]] = {}
+        self._listener: asyncio.Task[None] | None = None
+        self._counters = {"received": 0, "delivered": 0, "reconnects": 0}
+
+    def subscribe(self, project_id: uuid.UUID | str) -> ProgressSubscription:
+        subscription = ProgressSubscription(self, str(project_id), settings.synthesis_progress_queue_size)
+        self._subscribers.setdefault(subscription.project_id, set()).add(subscription)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(), name="synthesis-progress")
+        return subscription
+
+    def _remove(self, subscription: ProgressSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.project_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.project_id]
+
+    def _all(self) -> Iterator[ProgressSubscription]:
+        for subscribers in self._subscribers.values():
+            yield from subscribers
+
+    def _deliver(self, channel: str, data: str) -> None:
+        self._counters["received"] += 1
+        project_id = channel.rsplit(":", 1)[-1]
+        # 直接转发原始 JSON，API 侧不解析事件
+        for subscription in self._subscribers.get(project_id, ()):
+            subscription.offer(data)
+            self._counters["delivered"] += 1
+
+    async def _listen(self) -> None:
+        backoff = 1.0
+        connected_before = False
+        while True:
+            pubsub = get_async_redis_pubsub().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(RedisKeys.synthesis_progress_pattern())
+                if connected_before:
+                    # 断线期间的事件已经丢失
+                    self._counters["reconnects"] += 1
+                    for subscription in self._all():
+                        subscription.offer(RESYNC)
+                connected_before = True
+                backoff = 1.0
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None and message.get("type") == "pmessage":
+                        self._deliver(message["channel"], message["data"])
+            except RedisError as exc:
+                logger.bind(component="synthesis", error=str(exc)).warning("合成进度订阅中断，稍后重连")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                await pubsub.aclose()
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **self._counters,
+            "projects": len(self._subscribers),
+            "connections": sum(len(subscribers) for subscribers in self._subscribers.values()),
+        }
+
+
+_publisher: ProgressPublisher | None = None
+_hub: ProgressHub | None = None
+
+
+def get_progress_publisher() -> ProgressPublisher | None:
+    """返回 API 进程内共享的发布器，未启用进度推送时返回 None。"""
+
+    global _publisher
+    if not settings.synthesis_progress_enabled:
+        return None
+    if _publisher is None:
+        _publisher = ProgressPublisher()
+    return _publisher
+
+
+def get_progress_hub() -> ProgressHub:
+    """返回 API 进程内共享的进度分发器。"""
+
+    global _hub
+    if _hub is None:
+        _hub = ProgressHub()
+    return _hub
+
+
+async def close_progress_hub() -> None:
+    """停止进度订阅，应用退出时调用。"""
+
+    global _hub
+    hub, _hub = _hub, None
+    if hub is not None:
+        await hub.stop()
+
+
+__all__ = (
+    "RESYNC",
+    "STAGE_COMPLETED",
+    "STAGE_FAILED",
+    "STAGE_QUEUED",
+    "STAGE_RETRYING",
+    "STAGE_RUNNING",
+    "STAGE_SYNTHESIZING",
+    "ProgressEvent",
+    "ProgressHub",
+    "ProgressPublisher",
+    "ProgressSubscription",
+    "close_progress_hub",
+    "get_progress_hub",
+    "get_progress_publisher",
+)
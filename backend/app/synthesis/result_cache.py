@@ -0,0 +1,315 @@
+"""按内容寻址的合成结果缓存。
+
+同一句台词、同一音色与参数反复生成时，结果完全相同。这里以规范化文本、
+音色预设、采样率、引擎参数与引擎名计算 SHA-256 指纹：
+
+* 命中时直接把缓存文件硬链接为任务产物，接口层创建任务即完成，不再投递；
+* 未命中时同一指纹只允许一个合成在执行：进程内用 Future 合并，跨进程用
+  Redis 占位锁，其余请求等待结果写入缓存后直接复用；
+* 缓存文件单独存放在存储根目录的 ``_cache/`` 下，与任务产物共享内容（硬链接），
+  淘汰缓存条目只删除缓存这一份链接，已完成任务的产物不受影响；
+* 条目按最近访问时间记录在 ZSET 中，总字节数或条目数超限时从最久未访问的开始淘汰。
+
+Redis 不可用时缓存整体降级为未命中，合成照常执行。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+import unicodedata
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config.settings import settings
+from app.core.logging import logger
+from app.core.redis import AsyncRedisClient, RedisBackendError, RedisKeys
+from app.core.redis.scripts import RELEASE_LOCK
+from app.synthesis.engines import SynthesisRequest
+from app.synthesis.storage import ResultStorage, get_storage
+
+FINGERPRINT_VERSION = 1
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC 规范化（全角半角统一）并折叠空白，标点与大小写保留，它们会影响发音。"""
+
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def synthesis_fingerprint(request: SynthesisRequest, engine_name: str) -> str:
+    """合成输入的内容指纹；参数以排序后的 JSON 参与计算，键顺序不影响结果。"""
+
+    canonical = json.dumps(
+        {
+            "v": FINGERPRINT_VERSION,
+            "engine": engine_name,
+            "text": normalize_text(request.text),
+            "voice": request.voice_preset_id,
+            "sample_rate": request.sample_rate,
+            "options": request.options,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    """一个缓存条目：缓存文件路径与音频属性。"""
+
+    fingerprint: str
+    path: str
+    format: str
+    size_bytes: int
+    duration_ms: int
+    sample_rate: int
+
+    def to_mapping(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "format": self.format,
+            "size_bytes": self.size_bytes,
+            "duration_ms": self.duration_ms,
+            "sample_rate": self.sample_rate,
+        }
+
+    @classmethod
+    def from_mapping(cls, fingerprint: str, data: dict[str, Any]) -> CachedResult:
+        return cls(
+            fingerprint=fingerprint,
+            path=data["path"],
+            format=data["format"],
+            size_bytes=int(data["size_bytes"]),
+            duration_ms=int(data["duration_ms"]),
+            sample_rate=int(data["sample_rate"]),
+        )
+
+
+class SynthesisResultCache:
+    """合成结果缓存，单个实例只在一个事件循环中使用。"""
+
+    def __init__(
+        self,
+        redis: AsyncRedisClient | None = None,
+        storage: ResultStorage | None = None,
+        *,
+        max_bytes: int | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self.redis = redis or AsyncRedisClient()
+        self.storage = storage or get_storage()
+        self.max_bytes = settings.synthesis_cache_max_bytes if max_bytes is None else max_bytes
+        self.max_entries = settings.synthesis_cache_max_entries if max_entries is None else max_entries
+        self._inflight: dict[str, asyncio.Future[CachedResult]] = {}
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "evicted": 0, "degraded": 0}
+
+    @staticmethod
+    def cache_key(fingerprint: str, fmt: str) -> str:
+        return f"_cache/{fingerprint[:2]}/{fingerprint}.{fmt}"
+
+    async def lookup(self, fingerprint: str) -> CachedResult | None:
+        """查询缓存并刷新访问时间；条目存在但文件已丢失时清理条目并按未命中处理。"""
+
+        try:
+            data = await self.redis.hgetall(RedisKeys.synthesis_result(fingerprint))
+            if not data:
+                self._counters["misses"] += 1
+                return None
+            entry = CachedResult.from_mapping(fingerprint, data)
+            if not await self.storage.exists(entry.path):
+                await self._drop(fingerprint, entry)
+                self._counters["misses"] += 1
+                return None
+            await self.redis.zadd(RedisKeys.synthesis_result_lru(), {fingerprint: time.time()})
+        except RedisBackendError:
+            self._counters["degraded"] += 1
+            return None
+        self._counters["hits"] += 1
+        return entry
+
+    async def store(
+        self,
+        fingerprint: str,
+        source_path: str,
+        *,
+        fmt: str,
+        size_bytes: int,
+        duration_ms: int,
+        sample_rate: int,
+    ) -> CachedResult:
+        """把已生成的任务产物登记为缓存条目（硬链接到缓存目录），必要时触发淘汰。"""
+
+        path = await self.storage.link(source_path, self.cache_key(fingerprint, fmt))
+        entry = CachedResult(
+            fingerprint=fingerprint,
+            path=path,
+            format=fmt,
+            size_bytes=size_bytes,
+            duration_ms=duration_ms,
+            sample_rate=sample_rate,
+        )
+        try:
+            await self.redis.hset(RedisKeys.synthesis_result(fingerprint), entry.to_mapping())
+            added = await self.redis.zadd(RedisKeys.synthesis_result_lru(), {fingerprint: time.time()})
+            total = await self.redis.incr(RedisKeys.synthesis_result_bytes(), size_bytes if added else 0)
+            if total > self.max_bytes or await self.redis.zcard(RedisKeys.synthesis_result_lru()) > self.max_entries:
+                await self.evict()
+        except RedisBackendError:
+            self._counters["degraded"] += 1
+        return entry
+
+    async def get_or_produce(
+        self,
+        fingerprint: str,
+        produce: Callable[[], Awaitable[CachedResult]],
+    ) -> tuple[CachedResult, bool]:
+        """合并同一指纹的并发合成，返回 (条目, 是否由本次调用生成)。
+
+        produce 负责合成并调用 ``store``；只有拿到占位的调用方会执行它，
+        其余调用方等待缓存出现。占位方失败或超时未写入时，等待方自行生成。
+        """
+
+        inflight = self._inflight.get(fingerprint)
+        if inflight is not None:
+            self._counters["coalesced"] += 1
+            return await asyncio.shield(inflight), False
+
+        future: asyncio.Future[CachedResult] = asyncio.get_running_loop().create_future()
+        self._inflight[fingerprint] = future
+        try:
+            entry, produced = await self._produce_once(fingerprint, produce)
+        except BaseException as exc:
+            future.set_exception(exc)
+            # 没有其他等待方时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(entry)
+            return entry, produced
+        finally:
+            self._inflight.pop(fingerprint, None)
+
+    async def _produce_once(
+        self,
+        fingerprint: str,
+        produce: Callable[[], Awaitable[CachedResult]],
+    ) -> tuple[CachedResult, bool]:
+        lock_key = RedisKeys.synthesis_inflight(fingerprint)
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis.set(
+                lock_key, token, expire_seconds=settings.synthesis_cache_lock_ttl_seconds, only_if_absent=True
+            )
+        except RedisBackendError:
+            self._counters["degraded"] += 1
+            return await produce(), True
+
+        if not acquired:
+            self._counters["coalesced"] += 1
+            entry = await self._wait_for_entry(fingerprint, lock_key)
+            if entry is not None:
+                return entry, False
+            # 占位方失败或超时：不再等待，自行生成（不持锁，最坏情况重复合成一次）
+            return await produce(), True
+
+        try:
+            return await produce(), True
+        finally:
+            try:
+                await self.redis.run_script(RELEASE_LOCK, [lock_key], [token])
+            except RedisBackendError:
+                pass
+
+    async def _wait_for_entry(self, fingerprint: str, lock_key: str) -> CachedResult | None:
+        deadline = time.monotonic() + settings.synthesis_cache_wait_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.synthesis_cache_poll_seconds)
+            entry = await self.lookup(fingerprint)
+            if entry is not None:
+                return entry
+            try:
+                if await self.redis.get(lock_key) is None:
+                    # 锁已释放却没有结果，说明占位方失败
+                    return None
+            except RedisBackendError:
+                return None
+        logger.bind(component="synthesis", fingerprint=fingerprint, throttle_key="synthesis:cache:wait_timeout").warning(
+            "等待相同内容的合成结果超时，自行合成"
+        )
+        return None
+
+    async def evict(self, batch: int = 64) -> int:
+        """从最久未访问的条目开始淘汰，直到总字节数与条目数都回到上限以内。"""
+
+        lru_key = RedisKeys.synthesis_result_lru()
+        total = int(await self.redis.get(RedisKeys.synthesis_result_bytes()) or 0)
+        count = await self.redis.zcard(lru_key)
+        evicted = 0
+        while total > self.max_bytes or count > self.max_entries:
+            candidates = await self.redis.zrange(lru_key, 0, batch - 1)
+            if not candidates:
+                break
+            for fingerprint in candidates:
+                data = await self.redis.hgetall(RedisKeys.synthesis_result(fingerprint))
+                entry = CachedResult.from_mapping(fingerprint, data) if data else None
+                if await self._drop(fingerprint, entry):
+                    evicted += 1
+                # 其他进程抢先淘汰的条目同样计入，避免重复淘汰
+                total -= entry.size_bytes if entry is not None else 0
+                count -= 1
+                if total <= self.max_bytes and count <= self.max_entries:
+                    break
+        self._counters["evicted"] += evicted
+        if evicted:
+            logger.bind(component="synthesis").info(f"合成结果缓存淘汰 {evicted} 条")
+        return evicted
+
+    async def _drop(self, fingerprint: str, entry: CachedResult | None) -> bool:
+        # 以 ZREM 的返回值认领删除权，多个进程同时淘汰时只有一方扣减字节数、删除文件
+        if not await self.redis.zrem(RedisKeys.synthesis_result_lru(), fingerprint):
+            return False
+        await self.redis.delete(RedisKeys.synthesis_result(fingerprint))
+        if entry is not None:
+            await self.redis.incr(RedisKeys.synthesis_result_bytes(), -entry.size_bytes)
+            await self.storage.delete(entry.path)
+        return True
+
+    def stats(self) -> dict[str, int]:
+        return dict(self._counters)
+
+
+_cache: SynthesisResultCache | None = None
+
+
+def get_synthesis_cache() -> SynthesisResultCache | None:
+    """返回 API 进程内共享的结果缓存，未启用时返回 None。
+
+    实例与首次调用时的事件循环绑定；Worker 进程由运行时在常驻事件循环中自行创建。
+    """
+
+    global _cache
+    if not settings.synthesis_cache_enabled:
+        return None
+    if _cache is None:
+        _cache = SynthesisResultCache()
+    return _cache
+
+
+__all__ = (
+    "FINGERPRINT_VERSION",
+    "CachedResult",
+    "SynthesisResultCache",
+    "get_synthesis_cache",
+    "normalize_text",
+    "synthesis_fingerprint",
+)
@@ -0,0 +1,42 @@
+"""合成任务失败后的退避重试。
+
+引擎崩溃或模型服务异常的任务如果立即重新排队，会在队列里反复失败、占满 Worker。
+失败的任务回到排队状态，但在 ``next_attempt_at`` 之前不参与调度，等待时间随失败
+次数指数增长并加入随机抖动，同一时刻失败的一批任务不会同时重试。用尽
+``synthesis_max_attempts`` 次仍失败的任务进入死信队列（FAILED 且 ``dead_lettered_at``
+非空），由人工排查后通过接口重新排队。
+
+执行次数在认领时累加：Worker 中途退出、任务从未回写失败状态的情况同样计数，
+反复拖垮 Worker 的任务也会被隔离。
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+
+from app.core.config.settings import settings
+from app.db.base import utcnow
+
+
+def retry_delay(attempts: int, *, rng: random.Random | None = None) -> float:
+    """第 attempts 次执行失败后的等待秒数：指数退避，取上限后在一半到全部之间随机。"""
+
+    ceiling = min(
+        settings.synthesis_retry_max_seconds,
+        settings.synthesis_retry_base_seconds * 2 ** max(0, attempts - 1),
+    )
+    return ceiling / 2 + (rng or random).uniform(0, ceiling / 2)
+
+
+def next_attempt_at(attempts: int) -> datetime:
+    return utcnow() + timedelta(seconds=retry_delay(attempts))
+
+
+def exhausted(attempts: int) -> bool:
+    """已执行 attempts 次后是否应进入死信队列。"""
+
+    return attempts >= settings.synthesis_max_attempts
+
+
+__all__ = ("exhausted", "next_attempt_at", "retry_delay")
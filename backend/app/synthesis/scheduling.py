@@ -0,0 +1,348 @@
+"""合成任务的优先级与公平调度。
+
+所有任务共用一个 FIFO 队列时，一个项目一次排入上千条批量任务，其他人的
+任务只能排在后面。这里把"写入队列"从创建接口中拿出来，由调度器决定：
+
+* 交互式（单条重生成）任务优先于批量任务，进入单独的 Celery 队列；
+* 同一优先级内按公平主体（项目或项目所有者）轮转，当前在途任务少的主体先发；
+* 每个主体在途（已投递未完成）的任务数有上限，全局在途总数也有上限，
+  队列里始终只有少量任务，新来的小用户不必等大批量任务排空；
+* 已投递但长时间未被认领的任务（消息丢失）会重新参与调度；
+* 执行中超过租约没有任何状态更新的任务（Worker 退出）计为一次失败，按退避时间
+  重新排队，用尽次数的进入死信队列；失败重试的任务在 ``next_attempt_at`` 之前不参与调度。
+
+``plan_dispatch`` 是纯函数，调度器与仿真压测共用同一套选择逻辑。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import case, delete, func, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config.settings import settings
+from app.core.logging import logger
+from app.db.base import utcnow
+from app.db.partitions import recent_window_start
+from app.models.project import Project
+from app.models.synthesis_task import SynthesisActiveTask, SynthesisTask, TaskPriority, TaskStatus
+from app.synthesis.counters import StatusCounters, Transition
+
+# pg_try_advisory_xact_lock 的键，保证同一时刻只有一个调度器在分配
+_DISPATCH_LOCK_KEY = 0x5E_D15_7A5C
+
+
+@dataclass(frozen=True)
+class PendingTask:
+    """等待调度的任务。"""
+
+    id: uuid.UUID
+    created_at: datetime
+    priority: TaskPriority
+    fair_key: str
+
+
+def _cap(priority: TaskPriority) -> int:
+    if priority is TaskPriority.INTERACTIVE:
+        return settings.synthesis_interactive_cap_per_key
+    return settings.synthesis_bulk_cap_per_key
+
+
+def plan_dispatch(
+    pending: Iterable[PendingTask],
+    inflight: Mapping[tuple[str, TaskPriority], int],
+    *,
+    capacity: int,
+    caps: Mapping[TaskPriority, int] | None = None,
+) -> list[PendingTask]:
+    """从等待中的任务里选出本轮要投递的任务，按投递顺序返回。
+
+    pending 需按创建时间升序；inflight 为各 (主体, 优先级) 当前在途数。
+    先发完交互式再发批量；同一优先级内在主体之间轮转，在途少的主体排在前面。
+    """
+
+    caps = caps or {priority: _cap(priority) for priority in TaskPriority}
+    used = dict(inflight)
+    by_priority: dict[TaskPriority, OrderedDict[str, deque[PendingTask]]] = {
+        priority: OrderedDict() for priority in TaskPriority
+    }
+    for task in pending:
+        by_priority[task.priority].setdefault(task.fair_key, deque()).append(task)
+
+    planned: list[PendingTask] = []
+    for priority in TaskPriority:
+        cap = caps[priority]
+        queues = by_priority[priority]
+        order = sorted(queues, key=lambda key: used.get((key, priority), 0))
+        while capacity > 0 and order:
+            remaining = []
+            for key in order:
+                if capacity <= 0:
+                    break
+                slot = (key, priority)
+                if used.get(slot, 0) >= cap:
+                    continue
+                planned.append(queues[key].popleft())
+                used[slot] = used.get(slot, 0) + 1
+                capacity -= 1
+                if queues[key]:
+                    remaining.append(key)
+            order = remaining
+    return planned
+
+
+def fair_key_column() -> Any:
+    """公平主体对应的列：按项目，或按项目所有者（需要关联 projects 表）。"""
+
+    if settings.synthesis_fair_share_key == "owner":
+        return Project.owner_id
+    return SynthesisTask.project_id
+
+
+def _with_fair_key(stmt: Any) -> Any:
+    if settings.synthesis_fair_share_key == "owner":
+        return stmt.join(Project, Project.id == SynthesisTask.project_id)
+    return stmt
+
+
+def _inflight_condition() -> Any:
+    return or_(
+        SynthesisTask.status == TaskStatus.RUNNING,
+        (SynthesisTask.status == TaskStatus.QUEUED) & SynthesisTask.dispatched_at.is_not(None),
+    )
+
+
+async def count_inflight(
+    session: AsyncSession, *, fair_key: Any | None = None
+) -> dict[tuple[str, TaskPriority], int]:
+    """统计在途任务数，fair_key 给定时只统计该主体。"""
+
+    key_column = fair_key_column()
+    stmt = _with_fair_key(
+        select(key_column, SynthesisTask.priority, func.count())
+        .where(_inflight_condition(), SynthesisTask.created_at >= recent_window_start())
+        .group_by(key_column, SynthesisTask.priority)
+    )
+    if fair_key is not None:
+        stmt = stmt.where(key_column == fair_key)
+    result = await session.execute(stmt)
+    return {(str(key), priority): count for key, priority, count in result}
+
+
+class FairShareDispatcher:
+    """按优先级与公平份额把排队中的任务投递到 Celery。
+
+    send 是同步回调（投递一条消息），由 Worker 侧注入，避免本模块依赖 Celery 应用。
+    传入 counters 时，租约过期回收造成的状态变化会登记到状态计数。
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        send: Callable[[uuid.UUID, datetime, TaskPriority], None],
+        *,
+        counters: StatusCounters | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.send = send
+        self.counters = counters
+
+    async def dispatch_once(self) -> dict[str, int]:
+        """执行一轮调度，返回本轮统计；其他调度器正在执行时直接跳过。"""
+
+        window_start = recent_window_start()
+        async with self.session_factory() as session:
+            locked = await session.scalar(select(func.pg_try_advisory_xact_lock(_DISPATCH_LOCK_KEY)))
+            if not locked:
+                return {"skipped": 1}
+
+            reset = await self._reset_lost(session, window_start)
+            transitions = await self._recover_expired(session, window_start)
+            recovered = sum(1 for *_, new in transitions if new is TaskStatus.QUEUED)
+            dead_lettered = len(transitions) - recovered
+            inflight = await count_inflight(session)
+            capacity = settings.synthesis_dispatch_max_inflight - sum(inflight.values())
+            if capacity <= 0:
+                await session.commit()
+                await self._count(transitions)
+                return {
+                    "reset": reset,
+                    "recovered": recovered,
+                    "dead_lettered": dead_lettered,
+                    "dispatched": 0,
+                    "inflight": sum(inflight.values()),
+                }
+
+            pending = await self._pending(session, window_start)
+            planned = plan_dispatch(pending, inflight, capacity=capacity)
+            dispatched: Sequence[Any] = []
+            if planned:
+                result = await session.execute(
+                    update(SynthesisTask)
+                    .where(
+                        tuple_(SynthesisTask.id, SynthesisTask.created_at).in_(
+                            [(task.id, task.created_at) for task in planned]
+                        ),
+                        SynthesisTask.status == TaskStatus.QUEUED,
+                        SynthesisTask.dispatched_at.is_(None),
+                    )
+                    .values(dispatched_at=func.now())
+                    .returning(SynthesisTask.id, SynthesisTask.created_at, SynthesisTask.priority)
+                    .execution_options(synchronize_session=False)
+                )
+                dispatched = result.all()
+            await session.commit()
+        await self._count(transitions)
+
+        # 先提交再投递：投递失败的任务会在超时后由 _reset_lost 放回等待队列
+        order = {(task.id, task.created_at): index for index, task in enumerate(planned)}
+        rows = sorted(dispatched, key=lambda row: order.get((row[0], row[1]), len(order)))
+        # 投递是同步的 Broker 网络调用，放到线程中执行
+        failed = await asyncio.to_thread(self._send_all, rows) if rows else 0
+        stats = {
+            "reset": reset,
+            "recovered": recovered,
+            "dead_lettered": dead_lettered,
+            "pending": len(pending),
+            "dispatched": len(dispatched) - failed,
+            "failed": failed,
+            "inflight": sum(inflight.values()) + len(dispatched),
+        }
+        if dispatched:
+            logger.bind(component="synthesis", **stats).debug("合成任务调度完成")
+        return stats
+
+    async def _count(self, transitions: list[Transition]) -> None:
+        if self.counters is not None and transitions:
+            await self.counters.record(transitions)
+
+    def _send_all(self, rows: Sequence[Any]) -> int:
+        failed = 0
+        for task_id, created_at, priority in rows:
+            try:
+                self.send(task_id, created_at, priority)
+            except Exception:  # noqa: BLE001 - 单条投递失败不影响本轮其他任务
+                failed += 1
+                logger.bind(
+                    component="synthesis", task_id=str(task_id), throttle_key="synthesis:dispatch:send_failed"
+                ).exception("合成任务投递失败，等待超时后重新调度")
+        return failed
+
+    @staticmethod
+    async def _reset_lost(session: AsyncSession, window_start: datetime) -> int:
+        deadline = utcnow() - timedelta(seconds=settings.synthesis_dispatch_timeout_seconds)
+        result = await session.execute(
+            update(SynthesisTask)
+            .where(
+                SynthesisTask.status == TaskStatus.QUEUED,
+                SynthesisTask.dispatched_at < deadline,
+                SynthesisTask.created_at >= window_start,
+            )
+            .values(dispatched_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    @staticmethod
+    async def _recover_expired(session: AsyncSession, window_start: datetime) -> list[Transition]:
+        """把超过租约的执行中任务计为一次失败：未用尽次数的按退避重新排队，其余进入死信队列。
+
+        返回各任务的状态变化，提交后登记到状态计数。
+        """
+
+        lease_expired = utcnow() - timedelta(seconds=settings.synthesis_claim_lease_seconds)
+        expired = (
+            SynthesisTask.status == TaskStatus.RUNNING,
+            SynthesisTask.updated_at < lease_expired,
+            SynthesisTask.created_at >= window_start,
+        )
+        message = f"执行中断：超过 {settings.synthesis_claim_lease_seconds} 秒没有状态更新（Worker 退出或超时）"
+        # 与 retries.retry_delay 相同的退避：上限之内的指数等待，在一半到全部之间随机
+        ceiling = func.least(
+            settings.synthesis_retry_max_seconds,
+            settings.synthesis_retry_base_seconds * func.power(2, func.greatest(SynthesisTask.attempts - 1, 0)),
+        )
+        recovered = await session.execute(
+            update(SynthesisTask)
+            .where(*expired, SynthesisTask.attempts < settings.synthesis_max_attempts)
+            .values(
+                status=TaskStatus.QUEUED,
+                dispatched_at=None,
+                error_message=message,
+                next_attempt_at=func.now()
+                + func.make_interval(0, 0, 0, 0, 0, 0, ceiling * (0.5 + 0.5 * func.random())),
+            )
+            .returning(SynthesisTask.project_id, SynthesisTask.shot_id)
+            .execution_options(synchronize_session=False)
+        )
+        transitions: list[Transition] = [
+            (project_id, shot_id, TaskStatus.RUNNING, TaskStatus.QUEUED) for project_id, shot_id in recovered
+        ]
+        dead = await session.execute(
+            update(SynthesisTask)
+            .where(*expired, SynthesisTask.attempts >= settings.synthesis_max_attempts)
+            .values(status=TaskStatus.FAILED, error_message=message, dead_lettered_at=func.now())
+            .returning(SynthesisTask.id, SynthesisTask.project_id, SynthesisTask.shot_id)
+            .execution_options(synchronize_session=False)
+        )
+        dead_ids = []
+        for task_id, project_id, shot_id in dead:
+            dead_ids.append(task_id)
+            transitions.append((project_id, shot_id, TaskStatus.RUNNING, TaskStatus.FAILED))
+        if dead_ids:
+            await session.execute(delete(SynthesisActiveTask).where(SynthesisActiveTask.task_id.in_(dead_ids)))
+            logger.bind(component="synthesis", count=len(dead_ids), throttle_key="synthesis:dead_letter").error(
+                "执行中断的合成任务用尽重试次数，进入死信队列"
+            )
+        return transitions
+
+    @staticmethod
+    async def _pending(session: AsyncSession, window_start: datetime) -> list[PendingTask]:
+        """每个 (主体, 优先级) 只取排在最前、不超过上限条数的任务，大批量的主体不会拖慢查询结果。"""
+
+        key_column = fair_key_column()
+        ranked = _with_fair_key(
+            select(
+                SynthesisTask.id,
+                SynthesisTask.created_at,
+                SynthesisTask.priority,
+                key_column.label("fair_key"),
+                func.row_number()
+                .over(partition_by=(key_column, SynthesisTask.priority), order_by=SynthesisTask.created_at)
+                .label("queue_rank"),
+            ).where(
+                SynthesisTask.status == TaskStatus.QUEUED,
+                SynthesisTask.dispatched_at.is_(None),
+                or_(SynthesisTask.next_attempt_at.is_(None), SynthesisTask.next_attempt_at <= func.now()),
+                SynthesisTask.created_at >= window_start,
+            )
+        ).subquery()
+        cap = case(
+            (ranked.c.priority == TaskPriority.INTERACTIVE, settings.synthesis_interactive_cap_per_key),
+            else_=settings.synthesis_bulk_cap_per_key,
+        )
+        result = await session.execute(
+            select(ranked.c.id, ranked.c.created_at, ranked.c.priority, ranked.c.fair_key)
+            .where(ranked.c.queue_rank <= cap)
+            .order_by(ranked.c.created_at)
+        )
+        return [
+            PendingTask(id=task_id, created_at=created_at, priority=priority, fair_key=str(fair_key))
+            for task_id, created_at, priority, fair_key in result
+        ]
+
+
+__all__ = (
+    "FairShareDispatcher",
+    "PendingTask",
+    "count_inflight",
+    "fair_key_column",
+    "plan_dispatch",
+)
@@ -0,0 +1,186 @@
+"""合成任务状态的批量回写。
+
+Worker 进程内并发执行的任务把状态变更提交给同一个 ``StatusWriter``，后台协程每隔
+``flush_interval`` 或攒满 ``max_batch`` 条时，在一个事务里用一条 executemany UPDATE
+写入整批；同一任务在一个批次内的多次变更（如 RUNNING 紧接 COMPLETED）只写最终状态。
+进入终态的任务在同一事务内从活跃任务登记表中移除，之后相同内容的请求可以重新创建任务；
+失败后等待重试的任务回到 QUEUED 并清空投递时间，仍保留在登记表中。
+
+``submit`` 返回的 Future 在所在批次提交后完成：终态更新需要等待落库后再确认
+Celery 消息，中间状态（RUNNING）可以不等待。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Boolean, bindparam, case, cast, delete, func, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.logging import logger
+from app.models.synthesis_task import SynthesisActiveTask, SynthesisTask, TaskStatus
+
+_table = SynthesisTask.__table__
+_TERMINAL = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
+
+@dataclass
+class StatusUpdate:
+    """一次状态变更；metadata 与库中已有的元数据按键合并。"""
+
+    task_id: uuid.UUID
+    created_at: datetime
+    status: TaskStatus
+    result_path: str | None = None
+    error_message: str | None = None
+    metadata: dict[str, Any] = field(default_factory=dict)
+    next_attempt_at: datetime | None = None
+    dead_lettered_at: datetime | None = None
+
+    def merge(self, newer: StatusUpdate) -> StatusUpdate:
+        return StatusUpdate(
+            task_id=self.task_id,
+            created_at=self.created_at,
+            status=newer.status,
+            result_path=newer.result_path,
+            error_message=newer.error_message,
+            metadata={**self.metadata, **newer.metadata},
+            next_attempt_at=newer.next_attempt_at,
+            dead_lettered_at=newer.dead_lettered_at,
+        )
+
+
+# 分区表按 (id, created_at) 定位，带上分区键只触达一个分区
+_UPDATE_STATEMENT = (
+    update(_table)
+    .where(_table.c.id == bindparam("b_id"), _table.c.created_at == bindparam("b_created_at"))
+    .values(
+        status=bindparam("b_status"),
+        result_path=bindparam("b_result_path"),
+        error_message=bindparam("b_error_message"),
+        metadata=func.coalesce(_table.c.metadata, cast({}, JSONB)).op("||")(
+            bindparam("b_metadata", type_=JSONB)
+        ),
+        next_attempt_at=bindparam("b_next_attempt_at"),
+        dead_lettered_at=bindparam("b_dead_lettered_at"),
+        # 回到排队的任务需要调度器重新投递
+        dispatched_at=case((bindparam("b_requeue", type_=Boolean), None), else_=_table.c.dispatched_at),
+    )
+)
+
+
+class StatusWriter:
+    """合并同一 Worker 进程内的状态变更，按批写库。必须在同一个事件循环中使用。"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        flush_interval: float,
+        max_batch: int,
+    ) -> None:
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: dict[uuid.UUID, tuple[StatusUpdate, list[asyncio.Future[None]]]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._closing = False
+        self.batches = 0
+        self.rows = 0
+        self.coalesced = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="synthesis-status-writer")
+
+    def submit(self, status_update: StatusUpdate) -> asyncio.Future[None]:
+        """登记一次状态变更，返回在所属批次提交后完成的 Future。"""
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        existing = self._pending.get(status_update.task_id)
+        if existing is None:
+            self._pending[status_update.task_id] = (status_update, [future])
+        else:
+            self.coalesced += 1
+            previous, futures = existing
+            futures.append(future)
+            self._pending[status_update.task_id] = (previous.merge(status_update), futures)
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        return future
+
+    async def _run(self) -> None:
+        while not self._closing or self._pending:
+            if not self._closing:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            if self._pending:
+                await self._flush()
+
+    async def _flush(self) -> None:
+        batch, self._pending = self._pending, {}
+        rows = [
+            {
+                "b_id": item.task_id,
+                "b_created_at": item.created_at,
+                "b_status": item.status,
+                "b_result_path": item.result_path,
+                "b_error_message": item.error_message,
+                "b_metadata": item.metadata,
+                "b_next_attempt_at": item.next_attempt_at,
+                "b_dead_lettered_at": item.dead_lettered_at,
+                "b_requeue": item.status is TaskStatus.QUEUED,
+            }
+            for item, _ in batch.values()
+        ]
+        finished = [item.task_id for item, _ in batch.values() if item.status in _TERMINAL]
+        try:
+            async with self.session_factory() as session:
+                await session.execute(_UPDATE_STATEMENT, rows)
+                if finished:
+                    await session.execute(
+                        delete(SynthesisActiveTask).where(SynthesisActiveTask.task_id.in_(finished))
+                    )
+                await session.commit()
+        except Exception as exc:  # noqa: BLE001 - 写库失败交给等待方决定是否重试
+            logger.bind(component="synthesis", batch_size=len(rows)).exception("合成任务状态批量回写失败")
+            for _, futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+        self.batches += 1
+        self.rows += len(rows)
+        for _, futures in batch.values():
+            for future in futures:
+                if not future.done():
+                    future.set_result(None)
+
+    async def close(self) -> None:
+        """写完所有待提交的变更后停止后台协程。"""
+
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "coalesced": self.coalesced,
+            "pending": len(self._pending),
+        }
+
+
+__all__ = ("StatusUpdate", "StatusWriter")
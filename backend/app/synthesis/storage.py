@@ -0,0 +1,110 @@
+"""合成产物存储。
+
+任务表的 ``result_path`` 保存存储返回的路径；默认写入本地目录（容器内由
+backend 与 worker 共享的卷挂载），换成对象存储时实现同样的接口即可。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Protocol
+
+from app.core.config.settings import settings
+
+
+class ResultStorage(Protocol):
+    """合成产物存储接口。"""
+
+    async def save(self, key: str, data: bytes) -> str: ...
+
+    async def link(self, source: str, key: str) -> str: ...
+
+    async def exists(self, path: str) -> bool: ...
+
+    async def delete(self, path: str) -> None: ...
+
+
+class LocalResultStorage:
+    """写入本地目录：先写临时文件再原子替换，读取方不会看到写了一半的文件。"""
+
+    def __init__(self, root: str | os.PathLike[str] | None = None) -> None:
+        self.root = Path(root or settings.synthesis_storage_dir)
+
+    async def save(self, key: str, data: bytes) -> str:
+        return await asyncio.to_thread(self._write, key, data)
+
+    async def link(self, source: str, key: str) -> str:
+        """让 key 指向与 source 相同的内容：优先硬链接，不占额外空间；跨设备时退化为复制。"""
+
+        return await asyncio.to_thread(self._link, source, key)
+
+    async def exists(self, path: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, path)
+
+    async def delete(self, path: str) -> None:
+        await asyncio.to_thread(self._delete, path)
+
+    def _target(self, key: str) -> Path:
+        target = (self.root / key).resolve()
+        if self.root.resolve() not in target.parents:
+            raise ValueError(f"storage key escapes root: {key}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        return target
+
+    def _write(self, key: str, data: bytes) -> str:
+        target = self._target(key)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return str(target)
+
+    def _link(self, source: str, key: str) -> str:
+        target = self._target(key)
+        if target.exists() and os.path.samefile(source, target):
+            return str(target)
+        tmp_path = target.parent / f".{target.name}.{uuid.uuid4().hex}.link"
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, target)
+        return str(target)
+
+    @staticmethod
+    def _delete(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+_storage: ResultStorage | None = None
+
+
+def get_storage() -> ResultStorage:
+    """返回进程内共享的产物存储。"""
+
+    global _storage
+    if _storage is None:
+        _storage = LocalResultStorage()
+    return _storage
+
+
+__all__ = (
+    "LocalResultStorage",
+    "ResultStorage",
+    "get_storage",
+)
@@ -0,0 +1,86 @@
+"""列表接口的 JSONB 元数据过滤语法。
+
+查询参数形如 ``meta=shot_size:close-up``，可重复传入，多个条件按 AND 组合；
+键支持点号表示嵌套（``meta=camera.move:pan``），值优先按 JSON 字面量解析
+（``true``/``3``/``"3"``），解析失败时视为字符串。
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import Text, literal
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.services.exceptions import ValidationError
+
+MAX_METADATA_FILTERS = 10
+
+
+def _parse_value(raw: str) -> Any:
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return raw
+
+
+def parse_metadata_filters(expressions: Iterable[str] | None) -> dict[str, Any]:
+    """把 ``key:value`` 形式的表达式解析为嵌套字典，用于 ``@>`` 包含查询。"""
+
+    filters: dict[str, Any] = {}
+    if not expressions:
+        return filters
+
+    expressions = list(expressions)
+    if len(expressions) > MAX_METADATA_FILTERS:
+        raise ValidationError(f"元数据过滤条件最多 {MAX_METADATA_FILTERS} 个")
+
+    for expression in expressions:
+        path, sep, raw_value = expression.partition(":")
+        keys = [key.strip() for key in path.split(".")]
+        if not sep or not all(keys):
+            raise ValidationError(f"元数据过滤条件格式应为 key:value，收到 {expression!r}")
+
+        node = filters
+        for key in keys[:-1]:
+            child = node.setdefault(key, {})
+            if not isinstance(child, dict):
+                raise ValidationError(f"元数据过滤条件 {path!r} 与其他条件冲突")
+            node = child
+        leaf = keys[-1]
+        if leaf in node:
+            raise ValidationError(f"元数据过滤条件 {path!r} 重复")
+        node[leaf] = _parse_value(raw_value)
+    return filters
+
+
+def metadata_filter_clauses(
+    column: Any,
+    filters: dict[str, Any],
+    *,
+    indexed_keys: Iterable[str] = (),
+) -> list[ColumnElement[bool]]:
+    """把过滤字典编译为 SQL 条件。
+
+    命中表达式索引的顶层字符串键编译为 ``metadata ->> 'key' = value``，
+    其余条件合并为一次 ``metadata @> {...}``，由 GIN ``jsonb_path_ops`` 索引支撑。
+    """
+
+    clauses: list[ColumnElement[bool]] = []
+    contained: dict[str, Any] = {}
+    indexed = set(indexed_keys)
+    for key, value in filters.items():
+        if key in indexed and isinstance(value, str):
+            # 键名必须以字面量出现，才能匹配 (metadata ->> 'key') 表达式索引
+            extracted = column.op("->>", return_type=Text)(literal(key, literal_execute=True))
+            clauses.append(extracted == value)
+        else:
+            contained[key] = value
+    if contained:
+        clauses.append(column.contains(contained))
+    return clauses
+
+
+__all__ = ("MAX_METADATA_FILTERS", "metadata_filter_clauses", "parse_metadata_filters")
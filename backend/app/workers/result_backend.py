@@ -0,0 +1,64 @@
+"""Celery 结果后端的内存占用报告。
+
+合成结果（音频路径、时长等）都写在任务表里，结果后端只保留每条消息一个很小的
+引用（任务 ID 与最终状态），并在 ``celery_result_expires_seconds`` 后过期；调度、
+分区维护等定时任务不写结果。这里按 SCAN 抽样 ``celery-task-meta-*`` 的
+MEMORY USAGE，估算结果 Key 的总占用，用于确认结果后端不再无限增长。
+
+``used_memory`` 是整个 Redis 实例的占用：结果后端与 Broker 共用实例时两者都计入。
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config.settings import settings
+from app.services.exceptions import ServiceUnavailableError
+
+_RESULT_KEY_PATTERN = "celery-task-meta-*"
+
+
+async def result_backend_stats(*, sample: int = 200) -> dict[str, Any]:
+    """返回结果后端所在实例的内存、结果 Key 数量与抽样估算的结果 Key 总占用。"""
+
+    client = Redis.from_url(str(settings.result_backend))
+    db = client.connection_pool.connection_kwargs.get("db", 0)
+    try:
+        memory = await client.info("memory")
+        keys = await client.dbsize()
+        sizes: list[int] = []
+        ttl_missing = 0
+        async for key in client.scan_iter(match=_RESULT_KEY_PATTERN, count=500):
+            size = await client.memory_usage(key)
+            if size is not None:
+                sizes.append(size)
+            if await client.ttl(key) == -1:
+                ttl_missing += 1
+            if len(sizes) >= sample:
+                break
+    except RedisError as exc:
+        raise ServiceUnavailableError("结果后端不可用") from exc
+    finally:
+        await client.aclose()
+
+    average = sum(sizes) / len(sizes) if sizes else 0.0
+    return {
+        "db": db,
+        "used_memory": memory.get("used_memory"),
+        "used_memory_human": memory.get("used_memory_human"),
+        "maxmemory": memory.get("maxmemory"),
+        "keys": keys,
+        "result_expires_seconds": settings.celery_result_expires_seconds,
+        "sampled": len(sizes),
+        "sampled_without_ttl": ttl_missing,
+        "avg_result_bytes": round(average, 1),
+        "max_result_bytes": max(sizes, default=0),
+        # 结果后端库中基本只有结果 Key，按库内 Key 总数估算
+        "estimated_result_bytes": int(average * keys),
+    }
+
+
+__all__ = ("result_backend_stats",)
@@ -0,0 +1,170 @@
+"""Worker 进程级运行时：常驻事件循环、数据库连接池与合成流水线。
+
+Celery 任务函数是同步的，若每个任务都 ``asyncio.run`` 并新建引擎，连接无法
+跨任务复用，每次都要重新握手。这里每个 Worker 进程只创建一次运行时：
+事件循环跑在后台线程里，任务函数把协程提交过去并等待结果；数据库连接池、
+Redis 连接、状态回写器、结果缓存、进度发布器、状态计数与 TTS 引擎（外面依次包一层按后端
+限制并发的信号量与微批调度器）在整个进程生命周期内复用。
+
+``worker_execution_mode=asyncio`` 时 Celery 使用线程池接收消息，每个线程只是把协程
+提交到这个事件循环后阻塞等待，几十个任务的协程在同一个循环上并发等待后端，
+一个进程即可承载原先几十个 prefork 进程的在途调用。
+
+运行时在进程内首次执行任务时惰性创建；prefork 子进程启动时丢弃从父进程
+继承的实例，进程退出时写完待提交的状态并释放连接。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config.settings import settings
+from app.core.logging import logger
+from app.core.redis import close_async_redis
+from app.synthesis import (
+    ConcurrencyLimitedEngine,
+    ProgressPublisher,
+    StatusWriter,
+    SynthesisBatcher,
+    SynthesisPipeline,
+    StatusCounters,
+    SynthesisResultCache,
+    backend_concurrency,
+    get_engine,
+    get_storage,
+)
+
+T = TypeVar("T")
+
+
+class WorkerRuntime:
+    """单个 Worker 进程的常驻资源。"""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="worker-event-loop", daemon=True)
+        self._thread.start()
+        self.db_engine: AsyncEngine = create_async_engine(
+            settings.database_url,
+            pool_size=(
+                settings.worker_async_database_pool_size
+                if settings.worker_execution_mode == "asyncio"
+                else settings.worker_database_pool_size
+            ),
+            max_overflow=0,
+            # 任务间隔可能很长，取连接前探活，避免使用已被服务端断开的连接
+            pool_pre_ping=True,
+        )
+        self.session_factory = async_sessionmaker(self.db_engine, expire_on_commit=False, class_=AsyncSession)
+        self.status_writer = self.run(self._start_status_writer())
+        self.cache = self.run(self._create_cache()) if settings.synthesis_cache_enabled else None
+        self.progress = self.run(self._create_progress()) if settings.synthesis_progress_enabled else None
+        self.counters = self.run(self._create_counters()) if settings.synthesis_counters_enabled else None
+        self.engine = get_engine()
+        self.limited_engine = ConcurrencyLimitedEngine(self.engine, limit=backend_concurrency(self.engine.name))
+        self.batcher = (
+            SynthesisBatcher(
+                self.limited_engine,
+                max_batch=settings.synthesis_batch_max_size,
+                max_wait=settings.synthesis_batch_max_wait_seconds,
+            )
+            if settings.synthesis_batch_max_size > 1
+            else None
+        )
+        self.pipeline = SynthesisPipeline(
+            self.session_factory,
+            engine=self.batcher or self.limited_engine,
+            storage=get_storage(),
+            status_writer=self.status_writer,
+            cache=self.cache,
+            progress=self.progress,
+            counters=self.counters,
+            claim_batch=settings.synthesis_batch_max_size,
+        )
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _start_status_writer(self) -> StatusWriter:
+        writer = StatusWriter(
+            self.session_factory,
+            flush_interval=settings.synthesis_status_flush_interval_seconds,
+            max_batch=settings.synthesis_status_batch_size,
+        )
+        writer.start()
+        return writer
+
+    async def _create_cache(self) -> SynthesisResultCache:
+        # Redis 客户端（含自动 Pipeline）在常驻事件循环内创建，与之绑定
+        return SynthesisResultCache(storage=get_storage())
+
+    async def _create_progress(self) -> ProgressPublisher:
+        return ProgressPublisher()
+
+    async def _create_counters(self) -> StatusCounters:
+        return StatusCounters()
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """在常驻事件循环中执行协程，阻塞当前线程直到完成。"""
+
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def _close(self) -> None:
+        if self.batcher is not None:
+            await self.batcher.close()
+        await self.status_writer.close()
+        aclose = getattr(self.engine, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        await self.db_engine.dispose()
+        if self.cache is not None or self.progress is not None or self.counters is not None:
+            await close_async_redis()
+
+    def close(self) -> None:
+        try:
+            self.run(self._close(), timeout=30)
+        except Exception:  # noqa: BLE001 - 进程退出阶段尽力而为
+            logger.bind(component="worker").exception("Worker 运行时关闭失败")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+
+
+_runtime: WorkerRuntime | None = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> WorkerRuntime:
+    """返回当前进程的运行时，首次调用时创建。"""
+
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = WorkerRuntime()
+    return _runtime
+
+
+def reset_runtime() -> None:
+    """丢弃从父进程继承的运行时（其事件循环线程在子进程中并不存在），不做清理。"""
+
+    global _runtime
+    _runtime = None
+
+
+def shutdown_runtime() -> None:
+    """进程退出时调用：写完待提交的状态并释放数据库连接。"""
+
+    global _runtime
+    runtime, _runtime = _runtime, None
+    if runtime is not None:
+        runtime.close()
+
+
+__all__ = ("WorkerRuntime", "get_runtime", "reset_runtime", "shutdown_runtime")
@@ -1,7 +1,18 @@
-"""Celery 任务占位，后续可注册具体任务。"""
+"""Celery 应用与任务定义。"""
+import asyncio
+from datetime import datetime, timedelta
+from uuid import UUID
+
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 
 from app.core.config import get_settings
+from app.core.logging import logger
+from app.db.partitions import run_partition_maintenance
+from app.models.synthesis_task import TaskPriority
+from app.synthesis import FairShareDispatcher, reconcile_status_counters
+from app.workers.runtime import WorkerRuntime, get_runtime, reset_runtime, shutdown_runtime
 
 settings = get_settings()
 celery_app = Celery(
@@ -9,9 +20,105 @@ celery_app = Celery(
     broker=settings.broker_url,
     backend=settings.result_backend,
 )
+celery_app.conf.task_routes = {
+    "synthesis.run": {"queue": settings.synthesis_bulk_queue},
+    # 调度本身很轻，走交互式队列，不被批量任务拖慢
+    "synthesis.dispatch": {"queue": settings.synthesis_interactive_queue},
+}
+# 合成产物与元数据落在任务表与存储里，结果后端只保存很小的引用，过期后自动删除
+celery_app.conf.result_expires = timedelta(seconds=settings.celery_result_expires_seconds)
+# 每个进程只预取一条消息，避免批量任务被提前领走、占住其他进程的空闲
+celery_app.conf.worker_prefetch_multiplier = 1
+if settings.worker_execution_mode == "asyncio":
+    # 线程只负责收发消息并等待，任务协程在进程内的常驻事件循环上并发执行
+    celery_app.conf.worker_pool = "threads"
+    celery_app.conf.worker_concurrency = settings.worker_async_concurrency
+celery_app.conf.beat_schedule = {
+    "dispatch-synthesis": {
+        "task": "synthesis.dispatch",
+        "schedule": timedelta(seconds=settings.synthesis_dispatch_interval_seconds),
+        # 调度消息堆积时旧的没有意义
+        "options": {"expires": settings.synthesis_dispatch_interval_seconds * 5},
+    },
+    "reconcile-synthesis-counters": {
+        "task": "synthesis.reconcile_counters",
+        "schedule": timedelta(seconds=settings.synthesis_counters_reconcile_interval_seconds),
+        "options": {"expires": settings.synthesis_counters_reconcile_interval_seconds},
+    },
+    "maintenance-partitions": {
+        "task": "maintenance.partitions",
+        # 每天凌晨预建未来分区并归档过期分区
+        "schedule": crontab(hour=3, minute=17),
+    },
+}
+
+
+@worker_process_init.connect
+def _init_worker_process(**_: object) -> None:
+    reset_runtime()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**_: object) -> None:
+    shutdown_runtime()
+
+
+@worker_shutdown.connect
+def _shutdown_worker(**_: object) -> None:
+    # 线程池模式下任务在主进程内执行，没有子进程退出信号
+    shutdown_runtime()
 
 
 @celery_app.task(name="synthesis.run")
-def run_synthesis(task_payload: dict) -> dict:
-    """执行合成任务的示例 Celery 任务。"""
-    return {"status": "completed", "payload": task_payload}
+def run_synthesis(task_id: str, created_at: str | None = None) -> dict:
+    """执行一个合成任务，created_at 用于定位任务所在分区。
+
+    返回值只含任务 ID、状态与产物路径，完整结果以任务表为准。
+    """
+    runtime = get_runtime()
+    outcome = runtime.run(
+        runtime.pipeline.run(UUID(task_id), datetime.fromisoformat(created_at) if created_at else None)
+    )
+    if settings.synthesis_dispatch_on_complete and not outcome.skipped:
+        try:
+            runtime.run(_dispatcher(runtime).dispatch_once())
+        except Exception:  # noqa: BLE001 - 定时调度会兜底
+            logger.bind(component="synthesis", throttle_key="synthesis:dispatch:failed").exception("完成后调度失败")
+    return outcome.as_dict()
+
+
+def enqueue_synthesis(task_id: UUID, created_at: datetime, priority: TaskPriority) -> None:
+    """把任务投递到对应优先级的队列。"""
+    queue = (
+        settings.synthesis_interactive_queue
+        if priority is TaskPriority.INTERACTIVE
+        else settings.synthesis_bulk_queue
+    )
+    run_synthesis.apply_async(args=(str(task_id), created_at.isoformat()), queue=queue)
+
+
+# 定时触发、无人读取结果的任务不写结果后端（调度每秒一次，否则每天留下数万个结果 Key）
+@celery_app.task(name="synthesis.dispatch", ignore_result=True)
+def dispatch_synthesis() -> dict:
+    """按优先级与公平份额投递排队中的合成任务。"""
+    runtime = get_runtime()
+    return runtime.run(_dispatcher(runtime).dispatch_once())
+
+
+def _dispatcher(runtime: WorkerRuntime) -> FairShareDispatcher:
+    return FairShareDispatcher(runtime.session_factory, enqueue_synthesis, counters=runtime.counters)
+
+
+@celery_app.task(name="synthesis.reconcile_counters", ignore_result=True)
+def reconcile_synthesis_counters() -> dict:
+    """按数据库聚合结果校准合成任务状态计数。"""
+    runtime = get_runtime()
+    if runtime.counters is None:
+        return {"skipped": 1}
+    return runtime.run(reconcile_status_counters(runtime.session_factory, runtime.counters))
+
+
+@celery_app.task(name="maintenance.partitions", ignore_result=True)
+def maintain_partitions() -> dict:
+    """维护按月分区的大表。"""
+    return asyncio.run(run_partition_maintenance())
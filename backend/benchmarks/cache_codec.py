@@ -0,0 +1,101 @@
+"""对比缓存编码格式的体积与编解码耗时，用于估算大脚本内容占用的 Redis 内存。
+
+按 ScriptRead 的结构生成不同规模的脚本（content 中包含若干场景与台词），
+分别用 JSON、msgpack、msgpack + zstd 编码，输出编码后体积与单次耗时。
+
+    python -m benchmarks.cache_codec --lines 50 500 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.cache import JSON, MSGPACK, ValueCodec
+
+_SPEAKERS = ("旁白", "林夏", "周野", "老陈")
+_WORDS = "夜色 城市 霓虹 雨 街角 咖啡 信号 记忆 列车 回声 沉默 光".split()
+
+
+def _script_payload(lines: int, rng: random.Random) -> dict[str, Any]:
+    scenes = []
+    for scene_index in range(max(1, lines // 25)):
+        scenes.append(
+            {
+                "scene": scene_index + 1,
+                "location": rng.choice(_WORDS),
+                "lines": [
+                    {
+                        "speaker": rng.choice(_SPEAKERS),
+                        "text": "，".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 16))),
+                        "emotion": rng.choice(("calm", "tense", "warm")),
+                        "duration_ms": rng.randint(800, 6000),
+                    }
+                    for _ in range(25)
+                ],
+            }
+        )
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "v": {
+            "id": str(uuid.uuid4()),
+            "project_id": str(uuid.uuid4()),
+            "version": 3,
+            "title": "第一集",
+            "language": "zh",
+            "content": {"scenes": scenes},
+            "is_locked": True,
+            "version_snapshot": None,
+            "created_at": now,
+            "updated_at": now,
+        },
+        "exp": time.time() + 3600,
+        "d": 0.012,
+    }
+
+
+def _measure(codec: ValueCodec, payload: dict[str, Any], rounds: int) -> tuple[int, float, float]:
+    encoded = codec.encode(payload)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        codec.encode(payload)
+    encode_us = (time.perf_counter() - started) / rounds * 1e6
+    started = time.perf_counter()
+    for _ in range(rounds):
+        codec.decode(encoded)
+    decode_us = (time.perf_counter() - started) / rounds * 1e6
+    return len(encoded), encode_us, decode_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--level", type=int, default=3)
+    args = parser.parse_args()
+
+    codecs = {
+        "json": ValueCodec(JSON, compress_threshold=0),
+        "msgpack": ValueCodec(MSGPACK, compress_threshold=0),
+        "msgpack+zstd": ValueCodec(MSGPACK, compress_threshold=1, compress_level=args.level),
+    }
+    rng = random.Random(42)
+    for lines in args.lines:
+        payload = _script_payload(lines, rng)
+        baseline = None
+        print(f"script with {lines} lines")
+        for name, codec in codecs.items():
+            size, encode_us, decode_us = _measure(codec, payload, args.rounds)
+            baseline = baseline or size
+            print(
+                f"  {name:>13}: {size:>9} bytes ({size / baseline:>5.1%}) | "
+                f"encode {encode_us:>8.1f}us decode {decode_us:>8.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""验证 TieredCache 的防击穿能力：每次过期只允许一次回源。
+
+模拟多个 API 进程（各自一个 TieredCache 实例，共享同一个 Redis），
+在冷启动未命中与逻辑过期两个时刻各发起一波并发请求，统计 loader 被调用的次数，
+不等于 1 时以非零状态退出。
+
+    python -m benchmarks.cache_stampede --processes 4 --concurrency 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+from app.core.cache import TieredCache
+from app.core.config.settings import settings
+from app.core.redis import AsyncRedisClient, close_async_redis, get_async_redis_bytes
+
+
+class _CountingLoader:
+    """模拟慢查询的回源函数，记录被调用次数。"""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> dict[str, int]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"version": self.calls}
+
+
+async def _burst(
+    caches: list[TieredCache], key: str, loader: _CountingLoader, concurrency: int, ttl: int
+) -> list[float]:
+    latencies: list[float] = []
+
+    async def _call(index: int) -> None:
+        started = time.perf_counter()
+        await caches[index % len(caches)].get_or_load("bench", key, loader, ttl=ttl)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(_call(i) for i in range(concurrency)))
+    # 过期旧值由后台刷新，等刷新完成后再统计回源次数
+    await asyncio.gather(*(cache.join_background() for cache in caches))
+    return latencies
+
+
+def _report(label: str, loads: int, latencies: list[float]) -> bool:
+    latencies.sort()
+    print(
+        f"{label:>8}: loads={loads} | p50={statistics.median(latencies):.1f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1]:.1f}ms max={latencies[-1]:.1f}ms"
+    )
+    return loads == 1
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--load-delay", type=float, default=0.2, help="模拟回源耗时（秒）")
+    parser.add_argument("--ttl", type=int, default=2)
+    args = parser.parse_args()
+
+    # 关闭提前刷新，保证两波请求分别落在“未命中”与“逻辑过期”两种情形
+    settings.cache_early_refresh_beta = 0.0
+    redis = AsyncRedisClient(get_async_redis_bytes())
+    caches = [TieredCache(redis=redis) for _ in range(args.processes)]
+    key = f"stampede:{uuid.uuid4().hex}"
+    ok = True
+    try:
+        loader = _CountingLoader(args.load_delay)
+        latencies = await _burst(caches, key, loader, args.concurrency, args.ttl)
+        ok &= _report("cold", loader.calls, latencies)
+
+        await asyncio.sleep(args.ttl + 0.1)
+        loader.calls = 0
+        latencies = await _burst(caches, key, loader, args.concurrency, args.ttl)
+        ok &= _report("expired", loader.calls, latencies)
+    finally:
+        await caches[0].invalidate("bench", key)
+        await close_async_redis()
+
+    if not ok:
+        print("FAILED: 同一次过期发生了多次回源", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
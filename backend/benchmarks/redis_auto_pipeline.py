@@ -0,0 +1,82 @@
+"""对比开启与关闭自动 Pipeline 时，请求扇出场景下的 Redis 吞吐。
+
+每个模拟请求并发发出一组典型命令：限流计数（INCR + EXPIRE）、缓存读取、
+会话读取。关闭自动 Pipeline 时每条命令独占一次往返；开启后同一轮事件循环中
+的命令会合并成一个 Pipeline 发送。
+
+    python -m benchmarks.redis_auto_pipeline --concurrency 200 --duration 5 --window-ms 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.config.settings import settings
+from app.core.redis import AsyncRedisClient, RedisKeys, close_async_redis, get_async_redis
+
+
+async def _request(client: AsyncRedisClient, index: int) -> None:
+    user = f"user-{index % 512}"
+    await asyncio.gather(
+        client.incr(RedisKeys.rate_limit("api", user, "1m")),
+        client.expire(RedisKeys.rate_limit("api", user, "1m"), 60),
+        client.get(RedisKeys.cache("project", f"bench-{index % 64}")),
+        client.get(RedisKeys.refresh_session(user)),
+    )
+
+
+async def _worker(client: AsyncRedisClient, index: int, latencies: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await _request(client, index)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def _run(client: AsyncRedisClient, concurrency: int, duration: float) -> dict[str, float]:
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    tasks = [asyncio.create_task(_worker(client, i, latencies, stop)) for i in range(concurrency)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    latencies.sort()
+    return {
+        "requests_per_sec": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--window-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    settings.redis_auto_pipeline_window_ms = args.window_ms
+    redis = get_async_redis()
+    plain = AsyncRedisClient(redis, auto_pipeline=False)
+    auto = AsyncRedisClient(redis, auto_pipeline=True)
+
+    baseline = await _run(plain, args.concurrency, args.duration)
+    batched = await _run(auto, args.concurrency, args.duration)
+    for label, result in (("plain", baseline), ("auto", batched)):
+        print(
+            f"{label:>5}: {result['requests_per_sec']:>9.0f} req/s | "
+            f"p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms"
+        )
+    stats = auto.auto_pipeline.stats()
+    print(
+        f"auto pipeline: {stats['batches']:.0f} batches, avg {stats['avg_batch_size']:.1f} commands/batch, "
+        f"throughput x{batched['requests_per_sec'] / baseline['requests_per_sec']:.2f}"
+    )
+    await close_async_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
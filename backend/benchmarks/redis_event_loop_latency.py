@@ -0,0 +1,89 @@
+"""对比同步 RedisClient 与 AsyncRedisClient 在并发缓存流量下的事件循环延迟。
+
+事件循环中跑一个 1ms 间隔的探针协程，记录每次唤醒的超时量（loop lag），
+同时用 N 个协程持续读写缓存。同步客户端会在每次网络往返期间阻塞整个循环，
+异步客户端只会让出控制权。
+
+    python -m benchmarks.redis_event_loop_latency --concurrency 200 --duration 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.redis import AsyncRedisClient, RedisClient, RedisKeys, close_async_redis, close_redis
+
+PROBE_INTERVAL = 0.001
+
+
+async def _probe(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def _sync_worker(client: RedisClient, index: int, counter: list[int], stop: asyncio.Event) -> None:
+    key = RedisKeys.cache("bench", f"loop:{index % 64}")
+    while not stop.is_set():
+        # 在 async def 中直接调用同步客户端：网络往返期间事件循环被阻塞
+        client.set(key, "x" * 256, expire_seconds=60)
+        client.get(key)
+        counter[0] += 2
+        await asyncio.sleep(0)
+
+
+async def _async_worker(client: AsyncRedisClient, index: int, counter: list[int], stop: asyncio.Event) -> None:
+    key = RedisKeys.cache("bench", f"loop:{index % 64}")
+    while not stop.is_set():
+        await client.set(key, "x" * 256, expire_seconds=60)
+        await client.get(key)
+        counter[0] += 2
+
+
+async def _run(mode: str, concurrency: int, duration: float) -> dict[str, float]:
+    stop = asyncio.Event()
+    lags: list[float] = []
+    counter = [0]
+    if mode == "sync":
+        client = RedisClient()
+        workers = [_sync_worker(client, i, counter, stop) for i in range(concurrency)]
+    else:
+        async_client = AsyncRedisClient()
+        workers = [_async_worker(async_client, i, counter, stop) for i in range(concurrency)]
+
+    tasks = [asyncio.create_task(_probe(lags, stop))] + [asyncio.create_task(w) for w in workers]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    lags.sort()
+    return {
+        "ops_per_sec": counter[0] / duration,
+        "lag_p50_ms": statistics.median(lags),
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1],
+        "lag_max_ms": lags[-1],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for mode in ("sync", "async"):
+        result = await _run(mode, args.concurrency, args.duration)
+        print(
+            f"{mode:>5}: {result['ops_per_sec']:>10.0f} ops/s | loop lag p50={result['lag_p50_ms']:.2f}ms "
+            f"p99={result['lag_p99_ms']:.2f}ms max={result['lag_max_ms']:.2f}ms"
+        )
+    await close_async_redis()
+    close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""测量微批合成的吞吐：逐句调用引擎与经 SynthesisBatcher 攒批调用的每秒句数。
+
+使用本地替身引擎，``--overhead-ms`` 模拟模型服务每次调用的固定开销
+（排队、拷贝、推理启动）。逐句模式对应一条消息一次引擎调用；批量模式下
+所有句子并发提交，按 ``--batch`` 与 ``--wait-ms`` 攒批。
+
+    python -m benchmarks.synthesis_batching --lines 256 --overhead-ms 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from app.synthesis import LocalToneEngine, SynthesisBatcher, SynthesisRequest
+
+
+def _requests(count: int) -> list[SynthesisRequest]:
+    return [
+        SynthesisRequest(text=f"第{index}句台词，镜头推近。", voice_preset_id=f"voice-{index % 4}")
+        for index in range(count)
+    ]
+
+
+async def _sequential(engine: LocalToneEngine, requests: list[SynthesisRequest]) -> float:
+    started = time.perf_counter()
+    for request in requests:
+        await engine.synthesize(request)
+    return len(requests) / (time.perf_counter() - started)
+
+
+async def _batched(
+    engine: LocalToneEngine, requests: list[SynthesisRequest], batch: int, wait: float
+) -> tuple[float, float]:
+    batcher = SynthesisBatcher(engine, max_batch=batch, max_wait=wait)
+    started = time.perf_counter()
+    await asyncio.gather(*(batcher.synthesize(request) for request in requests))
+    rate = len(requests) / (time.perf_counter() - started)
+    return rate, batcher.stats()["avg_batch_size"]
+
+
+async def _main(args: argparse.Namespace) -> None:
+    engine = LocalToneEngine(call_overhead_ms=args.overhead_ms)
+    requests = _requests(args.lines)
+    await engine.synthesize(requests[0])  # 预热
+
+    print(f"{'mode':<12} {'batch':>6} {'avg size':>9} {'lines/s':>10}")
+    rate = await _sequential(engine, requests)
+    print(f"{'sequential':<12} {1:>6} {1:>9.1f} {rate:>10,.1f}")
+    for batch in args.batch:
+        rate, avg = await _batched(engine, requests, batch, args.wait_ms / 1000)
+        print(f"{'batched':<12} {batch:>6} {avg:>9.1f} {rate:>10,.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=256)
+    parser.add_argument("--overhead-ms", type=float, default=20.0)
+    parser.add_argument("--batch", type=int, nargs="+", default=[4, 16, 32])
+    parser.add_argument("--wait-ms", type=float, default=50.0)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""仿真对比单一 FIFO 队列与优先级 + 公平调度下，小用户任务的等待时间。
+
+场景：一个大项目在 0 时刻排入大量批量任务，随后若干小项目零星提交任务
+（部分为交互式单条重生成）。W 个 Worker 并行执行，单条耗时服从指数分布。
+
+* fifo：所有任务按提交顺序进入同一个队列；
+* fair：任务先留在"数据库"，调度器每个 tick 以及每完成一个任务时用
+  ``plan_dispatch`` 按优先级与项目轮转投递，受每项目在途上限与全局在途上限约束；
+  Worker 优先取交互式队列。
+
+输出小项目任务等待时间（提交到开始执行）的 p50/p95/max，以及大项目全部完成的时间。
+
+    python -m benchmarks.synthesis_fair_scheduling --workers 8 --bulk 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import itertools
+import random
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from app.models.synthesis_task import TaskPriority
+from app.synthesis.scheduling import PendingTask, plan_dispatch
+
+_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+_BIG = "big-project"
+
+
+@dataclass
+class _Task:
+    project: str
+    priority: TaskPriority
+    submitted: float
+    duration: float
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    started: float | None = None
+    finished: float | None = None
+
+    def pending(self) -> PendingTask:
+        return PendingTask(
+            id=self.id,
+            created_at=_EPOCH + timedelta(seconds=self.submitted),
+            priority=self.priority,
+            fair_key=self.project,
+        )
+
+
+def _workload(args: argparse.Namespace, rng: random.Random) -> list[_Task]:
+    tasks = [
+        _Task(_BIG, TaskPriority.BULK, 0.0, rng.expovariate(1 / args.service_seconds)) for _ in range(args.bulk)
+    ]
+    for index in range(args.small_projects):
+        for _ in range(args.small_tasks):
+            priority = TaskPriority.INTERACTIVE if rng.random() < args.interactive_ratio else TaskPriority.BULK
+            tasks.append(
+                _Task(
+                    f"small-{index}",
+                    priority,
+                    rng.uniform(0, args.horizon_seconds),
+                    rng.expovariate(1 / args.service_seconds),
+                )
+            )
+    tasks.sort(key=lambda task: task.submitted)
+    return tasks
+
+
+def _simulate(tasks: list[_Task], args: argparse.Namespace, mode: str) -> None:
+    counter = itertools.count()
+    events: list[tuple[float, int, str, _Task | None]] = []
+    for task in tasks:
+        heapq.heappush(events, (task.submitted, next(counter), "submit", task))
+    if mode == "fair":
+        heapq.heappush(events, (0.0, next(counter), "tick", None))
+
+    by_id = {task.id: task for task in tasks}
+    waiting: list[_Task] = []  # fair 模式下仍在"数据库"中的任务
+    queues = {priority: deque() for priority in TaskPriority}
+    inflight: dict[tuple[str, TaskPriority], int] = {}
+    idle = args.workers
+    remaining = len(tasks)
+
+    def dispatch() -> None:
+        nonlocal waiting
+        capacity = args.max_inflight - sum(inflight.values())
+        if capacity <= 0 or not waiting:
+            return
+        planned = plan_dispatch(
+            (item.pending() for item in waiting),
+            inflight,
+            capacity=capacity,
+            caps={TaskPriority.INTERACTIVE: args.interactive_cap, TaskPriority.BULK: args.bulk_cap},
+        )
+        chosen = {item.id for item in planned}
+        waiting = [item for item in waiting if item.id not in chosen]
+        for item in planned:
+            dispatched = by_id[item.id]
+            queues[dispatched.priority].append(dispatched)
+            slot = (dispatched.project, dispatched.priority)
+            inflight[slot] = inflight.get(slot, 0) + 1
+
+    def start_work(now: float) -> None:
+        nonlocal idle
+        while idle:
+            queue = queues[TaskPriority.INTERACTIVE] or queues[TaskPriority.BULK]
+            if not queue:
+                return
+            task = queue.popleft()
+            task.started = now
+            idle -= 1
+            heapq.heappush(events, (now + task.duration, next(counter), "finish", task))
+
+    while events and remaining:
+        now, _, kind, task = heapq.heappop(events)
+        if kind == "submit":
+            if mode == "fifo":
+                queues[TaskPriority.BULK].append(task)
+            else:
+                waiting.append(task)
+        elif kind == "finish":
+            idle += 1
+            remaining -= 1
+            task.finished = now
+            if mode == "fair":
+                slot = (task.project, task.priority)
+                inflight[slot] -= 1
+                dispatch()
+        elif kind == "tick":
+            dispatch()
+            heapq.heappush(events, (now + args.tick_seconds, next(counter), "tick", None))
+        start_work(now)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--bulk", type=int, default=2000, help="大项目一次排入的批量任务数")
+    parser.add_argument("--small-projects", type=int, default=20)
+    parser.add_argument("--small-tasks", type=int, default=5, help="每个小项目提交的任务数")
+    parser.add_argument("--interactive-ratio", type=float, default=0.5)
+    parser.add_argument("--horizon-seconds", type=float, default=300.0, help="小项目提交时间的分布范围")
+    parser.add_argument("--service-seconds", type=float, default=1.0, help="单条任务平均耗时")
+    parser.add_argument("--tick-seconds", type=float, default=1.0)
+    parser.add_argument("--max-inflight", type=int, default=16)
+    parser.add_argument("--interactive-cap", type=int, default=4)
+    parser.add_argument("--bulk-cap", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'mode':<6} {'small p50 s':>12} {'small p95 s':>12} {'small max s':>12} {'big makespan s':>15}")
+    for mode in ("fifo", "fair"):
+        tasks = _workload(args, random.Random(args.seed))
+        _simulate(tasks, args, mode)
+        waits = [task.started - task.submitted for task in tasks if task.project != _BIG]
+        makespan = max(task.finished for task in tasks if task.project == _BIG)
+        print(
+            f"{mode:<6} {_percentile(waits, 0.5):>12.1f} {_percentile(waits, 0.95):>12.1f} "
+            f"{max(waits):>12.1f} {makespan:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""对比 prefork 与 asyncio 两种 Worker 执行模式在 I/O 密集合成任务上的吞吐。
+
+替身后端是一个独立进程中的最小 HTTP 服务：每个请求等待 ``--latency-ms``
+（叠加 ``--jitter-ms`` 的均匀抖动）后返回一段固定的 WAV，模拟模型服务的推理等待。
+
+* prefork：``--processes`` 个进程，每个进程同一时刻只执行一个任务，
+  与 Celery prefork 池一致，在途调用数等于进程数；
+* asyncio：单个进程内的事件循环并发执行所有任务，经 ``HttpTTSEngine``
+  调用后端，``ConcurrencyLimitedEngine`` 把同时进行中的调用限制在 ``--limit`` 以内。
+
+所有任务同时提交，输出每种模式的进程数、每秒任务数、单任务从提交到完成耗时的
+p50/p95，以及执行任务的各进程 RSS 之和。
+
+    python -m benchmarks.synthesis_worker_modes --tasks 400 --latency-ms 200 --processes 8 --limit 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import multiprocessing
+import os
+import random
+import socket
+import time
+import wave
+from multiprocessing.connection import Connection
+
+import httpx
+
+from app.synthesis import ConcurrencyLimitedEngine, HttpTTSEngine, SynthesisRequest
+
+
+def _wav(duration_ms: int = 500, rate: int = 22050) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(bytes(rate * duration_ms // 1000 * 2))
+    return buffer.getvalue()
+
+
+def _serve(sock: socket.socket, latency: float, jitter: float) -> None:
+    """替身后端：HTTP/1.1 keep-alive，只处理带 Content-Length 的 POST。"""
+
+    body = _wav()
+    head = (
+        "HTTP/1.1 200 OK\r\nContent-Type: audio/wav\r\nX-Audio-Duration-Ms: 500\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode()
+    rng = random.Random(0)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                header = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in header.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+                await asyncio.sleep(latency + rng.uniform(0, jitter))
+                writer.write(head + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def main() -> None:
+        server = await asyncio.start_server(handle, sock=sock, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def _rss_mb() -> float:
+    try:
+        with open(f"/proc/{os.getpid()}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _payload(index: int) -> dict:
+    return {"text": f"第{index}句台词", "voice_preset_id": None, "sample_rate": 22050, "options": {}}
+
+
+# ---- prefork：每个进程同步地一次执行一个任务 ----
+
+_client: httpx.Client | None = None
+
+
+def _prefork_init(url: str) -> None:
+    global _client
+    _client = httpx.Client(base_url=url, timeout=60)
+
+
+def _prefork_task(index: int, submitted: float) -> tuple[float, int, float]:
+    response = _client.post("", json=_payload(index))
+    response.raise_for_status()
+    return time.monotonic() - submitted, os.getpid(), _rss_mb()
+
+
+def _run_prefork(url: str, args: argparse.Namespace) -> tuple[int, float, list[float], float]:
+    with multiprocessing.Pool(args.processes, initializer=_prefork_init, initargs=(url,)) as pool:
+        # 预热：每个进程建立到后端的连接
+        pool.starmap(_prefork_task, [(index, time.monotonic()) for index in range(args.processes)])
+        submitted = time.monotonic()
+        results = [pool.apply_async(_prefork_task, (index, submitted)) for index in range(args.tasks)]
+        outcomes = [result.get() for result in results]
+        elapsed = time.monotonic() - submitted
+    rss = {pid: value for _, pid, value in outcomes}
+    return args.processes, args.tasks / elapsed, [latency for latency, _, _ in outcomes], sum(rss.values())
+
+
+# ---- asyncio：单进程事件循环 + 每后端信号量 ----
+
+
+def _asyncio_child(url: str, args: argparse.Namespace, conn: Connection) -> None:
+    async def main() -> tuple[float, list[float], float]:
+        backend = HttpTTSEngine(url=url, timeout=60, max_connections=args.limit)
+        engine = ConcurrencyLimitedEngine(backend, limit=args.limit)
+        await asyncio.gather(*(engine.synthesize(SynthesisRequest(text="预热")) for _ in range(args.limit)))
+
+        async def one(index: int) -> float:
+            await engine.synthesize(SynthesisRequest(text=_payload(index)["text"]))
+            return time.monotonic() - submitted
+
+        submitted = time.monotonic()
+        latencies = await asyncio.gather(*(one(index) for index in range(args.tasks)))
+        elapsed = time.monotonic() - submitted
+        await backend.aclose()
+        return args.tasks / elapsed, list(latencies), _rss_mb()
+
+    conn.send(asyncio.run(main()))
+    conn.close()
+
+
+def _run_asyncio(url: str, args: argparse.Namespace) -> tuple[int, float, list[float], float]:
+    parent, child = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_asyncio_child, args=(url, args, child))
+    process.start()
+    rate, latencies, rss = parent.recv()
+    process.join()
+    return 1, rate, latencies, rss
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=400)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="后端单次调用的等待时间")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--processes", type=int, default=8, help="prefork 进程数")
+    parser.add_argument("--limit", type=int, default=64, help="asyncio 模式下单个后端的并发上限")
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    url = f"http://127.0.0.1:{sock.getsockname()[1]}/tts"
+    backend = multiprocessing.Process(
+        target=_serve, args=(sock, args.latency_ms / 1000, args.jitter_ms / 1000), daemon=True
+    )
+    backend.start()
+    try:
+        print(f"{'mode':<8} {'procs':>6} {'tasks/s':>9} {'p50 s':>8} {'p95 s':>8} {'rss MiB':>9}")
+        for mode, run in (("prefork", _run_prefork), ("asyncio", _run_asyncio)):
+            procs, rate, latencies, rss = run(url, args)
+            print(
+                f"{mode:<8} {procs:>6} {rate:>9.1f} {_percentile(latencies, 0.5):>8.2f} "
+                f"{_percentile(latencies, 0.95):>8.2f} {rss:>9.0f}"
+            )
+    finally:
+        backend.terminate()
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()